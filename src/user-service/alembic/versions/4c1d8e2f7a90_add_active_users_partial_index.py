@@ -0,0 +1,44 @@
+"""add active users partial index
+
+Revision ID: 4c1d8e2f7a90
+Revises: b3927f7fa288
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4c1d8e2f7a90"
+down_revision: Union[str, Sequence[str], None] = "b3927f7fa288"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в users, но не работает в транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_active_id",
+            "users",
+            ["id"],
+            unique=False,
+            postgresql_where=sa.text("is_banned = false"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_active_id",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
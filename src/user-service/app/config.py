@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,6 +17,23 @@ class Settings(BaseSettings):
     database_url: str
     log_level: str = "INFO"
 
+    # Пул соединений
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0  # ожидание свободного соединения, секунды
+    db_pool_recycle: int = 1800  # пересоздавать соединения старше, секунды
+    db_pool_pre_ping: bool = True  # проверять соединение перед выдачей (лишний запрос)
+    db_echo: bool = False
+    # Кэш подготовленных выражений asyncpg на соединение (0 - для pgbouncer
+    # в режиме transaction)
+    db_statement_cache_size: int = 100
+
+    # Кэш пользователей по Telegram ID
+    user_cache_enabled: bool = True
+    user_cache_size: int = 10_000
+    user_cache_ttl: float = 60.0
+    redis_url: str | None = None
+
     @property
     def is_debug(self) -> bool:
         """Проверяет, включен ли режим отладки"""
@@ -25,3 +43,9 @@ class Settings(BaseSettings):
     def is_production(self) -> bool:
         """Проверяет, включен ли режим продакшн"""
         return self.log_level.upper() == "PRODUCTION"
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Получить настройки приложения (читаются один раз)"""
+    return Settings()
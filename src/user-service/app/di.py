@@ -2,26 +2,45 @@
 Dependency Injection контейнер для user-service
 """
 
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
-from app.config import get_settings
-from app.domain.interfaces import IUserRepository, IUserService
+from app.config import Settings, get_settings
+from app.domain.interfaces import IUserService
 from app.domain.services.user_service import UserService
-
-
+from app.infrastructure.cache.shared import ISharedCache, RedisSharedCache
+from app.infrastructure.cache.user_cache import UserCache
+from app.infrastructure.database.base import build_engine
+from app.infrastructure.database.unit_of_work import UnitOfWork
 
 
 class Container:
-    """DI контейнер для user-service"""
-
-    def __init__(self):
-        self._settings = get_settings()
+    """DI контейнер для user-service
+
+    Контейнер владеет тем, что живет весь процесс: движком с пулом
+    соединений, фабрикой сессий и кэшем пользователей. Сессии, репозитории
+    и сервисы создаются на каждый запрос через unit_of_work() и
+    user_service(): параллельные запросы берут разные соединения из пула и
+    возвращают их по окончании запроса.
+
+    Прием инвалидаций кэша от других экземпляров запускается start() или
+    lifespan(), а если их не вызвали - при первом unit of work внутри
+    цикла событий. `shared_cache` заменяет Redis из настроек (например
+    FakeSharedCache в тестах).
+    """
+
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        shared_cache: Optional[ISharedCache] = None,
+        **engine_params,
+    ):
+        self._settings = settings or get_settings()
 
         # Database
-        self._engine = create_async_engine(
-            self._settings.DATABASE_URL, echo=self._settings.MODE == "DEV"
-        )
+        self._engine = build_engine(self._settings, **engine_params)
         self._session_factory = async_sessionmaker(
             self._engine,
             class_=AsyncSession,
@@ -29,75 +48,78 @@ class Container:
             autoflush=False,  # Для лучшего контроля над транзакциями
         )
 
-        # Repositories
-        self._user_repository: IUserRepository | None = None
-
-        # Services
-        self._user_service: IUserService | None = None
-
-        # Use Cases
-        self._create_user_use_case: CreateUserUseCase | None = None
-        self._get_user_use_case: GetUserUseCase | None = None
-        self._update_user_use_case: UpdateUserUseCase | None = None
-        self._delete_user_use_case: DeleteUserUseCase | None = None
-        self._ban_user_use_case: BanUserUseCase | None = None
-
-    async def session(self) -> AsyncGenerator[AsyncSession, None]:
-        """Получить сессию базы данных"""
+        # Cache
+        self._user_cache: Optional[UserCache] = None
+        if self._settings.user_cache_enabled:
+            shared = shared_cache
+            if shared is None and self._settings.redis_url:
+                shared = RedisSharedCache.from_url(self._settings.redis_url)
+            self._user_cache = UserCache(
+                max_size=self._settings.user_cache_size,
+                ttl=self._settings.user_cache_ttl,
+                shared=shared,
+            )
+        self._cache_listener: Optional[asyncio.Task] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Движок базы данных"""
+        return self._engine
+
+    @property
+    def user_cache(self) -> Optional[UserCache]:
+        """Кэш пользователей процесса"""
+        return self._user_cache
+
+    async def start(self) -> None:
+        """Запустить прием инвалидаций кэша от других экземпляров"""
+        self._start_cache_listener()
+
+    def _start_cache_listener(self) -> None:
+        """Запустить (или перезапустить упавшую) задачу приема инвалидаций"""
+        if self._user_cache is None:
+            return
+        if self._cache_listener is not None and not self._cache_listener.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._cache_listener = loop.create_task(self._user_cache.listen())
+
+    @asynccontextmanager
+    async def lifespan(self, *args) -> AsyncIterator["Container"]:
+        """start() при запуске и dispose() при остановке (FastAPI lifespan)"""
+        await self.start()
+        try:
+            yield self
+        finally:
+            await self.dispose()
+
+    async def dispose(self) -> None:
+        """Остановить фоновые задачи и закрыть пул соединений"""
+        if self._cache_listener is not None:
+            self._cache_listener.cancel()
+            await asyncio.gather(self._cache_listener, return_exceptions=True)
+            self._cache_listener = None
+        await self._engine.dispose()
+
+    def unit_of_work(self) -> UnitOfWork:
+        """Новый unit of work (использовать как async with)"""
+        self._start_cache_listener()
+        return UnitOfWork(self._session_factory, self._user_cache)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Сессия базы данных на время блока"""
         async with self._session_factory() as session:
-            try:
-                yield session
-            finally:
-                await session.close()
-
-    async def user_repository(self) -> IUserRepository:
-        """Получить репозиторий пользователей"""
-        if not self._user_repository:
-            session = await anext(self.session())
-            self._user_repository = UserRepository(session)
-        return self._user_repository
-
-    async def user_service(self) -> IUserService:
-        """Получить сервис пользователей"""
-        if not self._user_service:
-            repository = await self.user_repository()
-            self._user_service = UserService(repository)
-        return self._user_service
-
-    async def create_user_use_case(self) -> CreateUserUseCase:
-        """Получить use case создания пользователя"""
-        if not self._create_user_use_case:
-            service = await self.user_service()
-            self._create_user_use_case = CreateUserUseCase(service)
-        return self._create_user_use_case
-
-    async def get_user_use_case(self) -> GetUserUseCase:
-        """Получить use case получения пользователя"""
-        if not self._get_user_use_case:
-            service = await self.user_service()
-            self._get_user_use_case = GetUserUseCase(service)
-        return self._get_user_use_case
-
-    async def update_user_use_case(self) -> UpdateUserUseCase:
-        """Получить use case обновления пользователя"""
-        if not self._update_user_use_case:
-            service = await self.user_service()
-            self._update_user_use_case = UpdateUserUseCase(service)
-        return self._update_user_use_case
-
-    async def delete_user_use_case(self) -> DeleteUserUseCase:
-        """Получить use case удаления пользователя"""
-        if not self._delete_user_use_case:
-            service = await self.user_service()
-            self._delete_user_use_case = DeleteUserUseCase(service)
-        return self._delete_user_use_case
-
-    async def ban_user_use_case(self) -> BanUserUseCase:
-        """Получить use case бана пользователя"""
-        if not self._ban_user_use_case:
-            service = await self.user_service()
-            self._ban_user_use_case = BanUserUseCase(service)
-        return self._ban_user_use_case
+            yield session
+
+    @asynccontextmanager
+    async def user_service(self) -> AsyncIterator[IUserService]:
+        """Сервис пользователей на время блока (своя сессия)"""
+        async with self.unit_of_work() as uow:
+            yield UserService(uow.users)
 
 
 # Глобальный контейнер
@@ -112,43 +134,20 @@ def get_container() -> Container:
     return _container
 
 
-# FastAPI dependencies
+# FastAPI dependencies: генераторы, по объекту на запрос
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency для получения сессии БД"""
-    async for session in get_container().session():
+    async with get_container().session() as session:
         yield session
 
 
-async def get_user_repository() -> IUserRepository:
-    """FastAPI dependency для получения репозитория пользователей"""
-    return await get_container().user_repository()
+async def get_unit_of_work() -> AsyncGenerator[UnitOfWork, None]:
+    """FastAPI dependency для получения unit of work запроса"""
+    async with get_container().unit_of_work() as uow:
+        yield uow
 
 
-async def get_user_service() -> IUserService:
+async def get_user_service() -> AsyncGenerator[IUserService, None]:
     """FastAPI dependency для получения сервиса пользователей"""
-    return await get_container().user_service()
-
-
-async def get_create_user_use_case() -> CreateUserUseCase:
-    """FastAPI dependency для получения use case создания пользователя"""
-    return await get_container().create_user_use_case()
-
-
-async def get_get_user_use_case() -> GetUserUseCase:
-    """FastAPI dependency для получения use case получения пользователя"""
-    return await get_container().get_user_use_case()
-
-
-async def get_update_user_use_case() -> UpdateUserUseCase:
-    """FastAPI dependency для получения use case обновления пользователя"""
-    return await get_container().update_user_use_case()
-
-
-async def get_delete_user_use_case() -> DeleteUserUseCase:
-    """FastAPI dependency для получения use case удаления пользователя"""
-    return await get_container().delete_user_use_case()
-
-
-async def get_ban_user_use_case() -> BanUserUseCase:
-    """FastAPI dependency для получения use case бана пользователя"""
-    return await get_container().ban_user_use_case()
+    async with get_container().user_service() as service:
+        yield service
@@ -3,7 +3,7 @@ IUserRepository interface - контракт для репозитория по
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import AsyncIterator, Dict, Iterable, Optional, List, Tuple
 from app.domain.models import User
 
 
@@ -16,18 +16,62 @@ class IUserRepository(ABC):
     async def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def get_by_telegram_ids(self, telegram_ids: Iterable[int]) -> Dict[int, User]:
+        """Пользователи по Telegram ID одним запросом (ненайденных нет в словаре)"""
+        pass
+
     @abstractmethod
     async def get_active_users(self, limit: int = 100, offset: int = 0) -> List[User]:
         pass
 
+    @abstractmethod
+    async def get_active_users_after(self, after_id: int = 0, limit: int = 100) -> List[User]:
+        """Страница активных пользователей с ID больше after_id (keyset)"""
+        pass
+
+    @abstractmethod
+    def iter_active_users(
+        self, chunk_size: int = 1000, after_id: int = 0
+    ) -> AsyncIterator[List[User]]:
+        """Поток активных пользователей пачками по chunk_size"""
+        pass
+
     @abstractmethod
     async def create(self, user: User) -> User:
         pass
 
+    @abstractmethod
+    async def get_or_create(self, user: User) -> Tuple[User, bool]:
+        """Создать пользователя или обновить профиль существующего (признак создания)"""
+        pass
+
     @abstractmethod
     async def update(self, user: User) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, use_copy: bool = False
+    ) -> int:
+        """Создать пользователей пачками в текущей транзакции (число созданных)"""
+        pass
+
+    @abstractmethod
+    async def upsert_many(
+        self, users: Iterable[User], batch_size: int = 1000, update_flags: bool = False
+    ) -> int:
+        """Создать пользователей или обновить явно заданные поля профиля существующих
+
+        С update_flags у существующих обновляются и заданные is_banned/is_admin.
+        """
+        pass
+
+    @abstractmethod
+    async def update_many(self, users: Iterable[User], batch_size: int = 1000) -> int:
+        """Обновить явно заданные поля пользователей по telegram_id (число обновленных)"""
+        pass
+
     @abstractmethod
     def _model_to_domain(self, model) -> User:
         """Преобразует ORM модель в доменную модель"""
@@ -44,6 +88,10 @@ class IUserService(ABC):
     async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def get_by_telegram_ids(self, telegram_ids: Iterable[int]) -> Dict[int, User]:
+        pass
+
     @abstractmethod
     async def register_user(
         self,
@@ -54,3 +102,28 @@ class IUserService(ABC):
         language_code: Optional[str],
     ) -> User:
         pass
+
+
+class IUnitOfWork(ABC):
+    """Сессия базы и репозитории одного запроса"""
+
+    users: IUserRepository
+
+    @abstractmethod
+    async def __aenter__(self) -> "IUnitOfWork":
+        pass
+
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Зафиксировать изменения (при исключении - откатить) и вернуть соединение в пул"""
+        pass
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Зафиксировать транзакцию (репозитории сами не коммитят)"""
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        """Откатить транзакцию"""
+        pass
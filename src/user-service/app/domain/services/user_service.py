@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import AsyncIterator, Dict, Iterable, Optional, List
 from app.domain.interfaces import IUserService, IUserRepository
 from app.domain.models import User
 from app.domain.exceptions import UserAlreadyExistsError, UserNotFoundError
@@ -21,6 +21,14 @@ class UserService(IUserService):
         """Получить пользователя по Telegram ID"""
         return await self._user_repository.get_by_telegram_id(telegram_id)
 
+    async def get_user_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID"""
+        return await self.get_by_telegram_id(telegram_id)
+
+    async def get_by_telegram_ids(self, telegram_ids: Iterable[int]) -> Dict[int, User]:
+        """Получить пользователей по списку Telegram ID одним запросом"""
+        return await self._user_repository.get_by_telegram_ids(telegram_ids)
+
     async def create_user(self, telegram_id: int, **kwargs) -> User:
         """Создать нового пользователя"""
         if await self.get_by_telegram_id(telegram_id):
@@ -28,9 +36,32 @@ class UserService(IUserService):
                 f"User with telegram_id {telegram_id} already exists"
             )
 
-        user = User(telegram_id=telegram_id, **kwargs)
+        user = User(tg_id=telegram_id, **kwargs)
         return await self._user_repository.create(user)
 
+    async def register_user(
+        self,
+        tg_id: int,
+        username: Optional[str],
+        first_name: str,
+        last_name: Optional[str],
+        language_code: Optional[str],
+    ) -> User:
+        """Зарегистрировать пользователя (/start) или обновить его профиль
+
+        Один запрос INSERT ... ON CONFLICT: повторный /start не создает дубль
+        и не требует предварительной проверки.
+        """
+        user = User(
+            tg_id=tg_id,
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+            language_code=language_code,
+        )
+        registered, _ = await self._user_repository.get_or_create(user)
+        return registered
+
     async def update_user(self, user_id: int, **kwargs) -> User:
         """Обновить данные пользователя"""
         user = await self.get_user(user_id)  # Вызовет UserNotFoundError если нет
@@ -49,3 +80,13 @@ class UserService(IUserService):
     async def get_active_users(self, limit: int = 100, offset: int = 0) -> List[User]:
         """Получить список активных пользователей"""
         return await self._user_repository.get_active_users(limit, offset)
+
+    async def get_active_users_after(self, after_id: int = 0, limit: int = 100) -> List[User]:
+        """Получить страницу активных пользователей после after_id (keyset)"""
+        return await self._user_repository.get_active_users_after(after_id, limit)
+
+    def iter_active_users(
+        self, chunk_size: int = 1000, after_id: int = 0
+    ) -> AsyncIterator[List[User]]:
+        """Поток активных пользователей пачками (рассылки, пакетные задачи)"""
+        return self._user_repository.iter_active_users(chunk_size, after_id)
@@ -0,0 +1,189 @@
+"""
+Импорт пользователей из CSV или JSONL
+
+Запуск из каталога user-service:
+    python -m app.import_users users.csv [--mode upsert] [--update-flags] [--batch-size 1000] [--copy]
+
+Поля: telegram_id (или tg_id), username, first_name, last_name,
+language_code, is_banned, is_admin. Обязателен только telegram_id:
+существующим пользователям пишутся лишь поля, которые есть в записи.
+Исключение - режим upsert: как и регистрация, он не меняет is_banned/is_admin
+существующих пользователей, пока не задан --update-flags (о пропущенных
+флагах печатается предупреждение). Формат определяется по расширению
+(.csv, .jsonl/.ndjson) или задается --format.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional, TextIO
+from pydantic import ValidationError
+from app.di import Container
+from app.domain.models import User
+from app.infrastructure.repositories.user_repository import FLAG_FIELDS
+
+_TRUE = {"1", "true", "t", "yes", "y"}
+
+# Значения полей, которых нет в записи (для новых пользователей)
+_NEW_USER = {"username": None, "first_name": "", "last_name": None, "language_code": None}
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in _TRUE
+
+
+def _optional(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_user(record: Dict[str, Any]) -> User:
+    """Пользователь из записи файла импорта
+
+    Явно заданными (model_fields_set) считаются только поля, которые есть в
+    записи: update_many и upsert_many не трогают остальные колонки, в том
+    числе is_banned/is_admin (upsert_many меняет флаги только с update_flags).
+    """
+    telegram_id = record.get("telegram_id", record.get("tg_id"))
+    if telegram_id in (None, ""):
+        raise ValueError("telegram_id is required")
+    values: Dict[str, Any] = {"tg_id": int(telegram_id)}
+    for name in ("username", "last_name", "language_code"):
+        if name in record:
+            values[name] = _optional(record[name])
+    if "first_name" in record:
+        values["first_name"] = _optional(record["first_name"]) or ""
+    for name in ("is_banned", "is_admin"):
+        if name in record:
+            values[name] = _flag(record[name])
+    user = User(**{**_NEW_USER, **values})
+    return User.model_construct(_fields_set=set(values), **user.model_dump())
+
+
+def _records(file: TextIO, file_format: str) -> Iterator[Any]:
+    """Записи файла: строки CSV - словарями, строки JSONL - текстом"""
+    if file_format == "csv":
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            yield line
+
+
+def read_users(file: TextIO, file_format: str, errors: TextIO = sys.stderr) -> Iterator[User]:
+    """Пользователи из файла; ошибочные строки пропускаются с сообщением в errors"""
+    for number, record in enumerate(_records(file, file_format), start=1):
+        try:
+            if isinstance(record, str):
+                record = json.loads(record)
+            if not isinstance(record, dict):
+                raise ValueError(f"expected an object, got {type(record).__name__}")
+            user = parse_user(record)
+        except (ValueError, TypeError, ValidationError) as e:
+            print(f"record {number}: skipped: {e}", file=errors)
+            continue
+        yield user
+
+
+async def import_users(
+    container: Container,
+    file: TextIO,
+    file_format: str,
+    mode: str = "upsert",
+    batch_size: int = 1000,
+    use_copy: bool = False,
+    progress: Optional[TextIO] = sys.stderr,
+    update_flags: bool = False,
+    errors: TextIO = sys.stderr,
+) -> Dict[str, float]:
+    """Загрузить пользователей из файла; возвращает число строк и скорость
+
+    update_flags - в режиме upsert обновлять заданные в файле is_banned/is_admin
+    существующих пользователей.
+    """
+    users = read_users(file, file_format, errors)
+    started = time.perf_counter()
+    rows = 0
+    affected = 0
+    warned = False
+    async with container.unit_of_work() as uow:
+        repository = uow.users
+        while batch := list(islice(users, batch_size)):
+            if mode == "create":
+                affected += await repository.create_many(batch, batch_size, use_copy)
+            elif mode == "update":
+                affected += await repository.update_many(batch, batch_size)
+            else:
+                if not update_flags and not warned and any(
+                    user.model_fields_set.intersection(FLAG_FIELDS) for user in batch
+                ):
+                    warned = True
+                    print(
+                        "warning: is_banned/is_admin of existing users are kept in upsert mode, "
+                        "use --update-flags to apply them",
+                        file=errors,
+                    )
+                affected += await repository.upsert_many(batch, batch_size, update_flags)
+            await uow.commit()
+            rows += len(batch)
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                print(f"{rows} rows, {rows / elapsed:.0f} rows/s", file=progress)
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "affected": affected,
+        "seconds": elapsed,
+        "rows_per_s": rows / elapsed if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None)
+    parser.add_argument("--mode", choices=("create", "upsert", "update"), default="upsert")
+    parser.add_argument("--batch-size", type=int, default=1000, help="строк на коммит")
+    parser.add_argument("--copy", action="store_true", help="create через COPY (asyncpg)")
+    parser.add_argument(
+        "--update-flags",
+        action="store_true",
+        help="upsert: обновлять is_banned/is_admin существующих пользователей",
+    )
+    args = parser.parse_args()
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+
+    async def run() -> Dict[str, float]:
+        container = Container()
+        try:
+            with open(args.path, encoding="utf-8", newline="") as file:
+                return await import_users(
+                    container,
+                    file,
+                    file_format,
+                    args.mode,
+                    args.batch_size,
+                    args.copy,
+                    update_flags=args.update_flags,
+                )
+        finally:
+            await container.dispose()
+
+    report = asyncio.run(run())
+    print(
+        f"imported {report['rows']} rows ({report['affected']} affected) "
+        f"in {report['seconds']:.1f} s: {report['rows_per_s']:.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
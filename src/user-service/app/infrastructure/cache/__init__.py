@@ -0,0 +1,14 @@
+from app.infrastructure.cache.shared import (
+    FakeSharedCache,
+    ISharedCache,
+    RedisSharedCache,
+)
+from app.infrastructure.cache.user_cache import CachedUserRepository, UserCache
+
+__all__ = [
+    "CachedUserRepository",
+    "FakeSharedCache",
+    "ISharedCache",
+    "RedisSharedCache",
+    "UserCache",
+]
@@ -0,0 +1,156 @@
+"""
+Общий для всех экземпляров сервиса кэш: Redis или локальная подделка для тестов
+"""
+
+import asyncio
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Tuple
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+
+class ISharedCache(ABC):
+    """Общий кэш с рассылкой инвалидаций между экземплярами сервиса"""
+
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Значения по ключам (отсутствующих нет в словаре)"""
+        pass
+
+    @abstractmethod
+    async def set_many(
+        self, items: Dict[str, bytes], ttl: float, only_if_missing: bool = False
+    ) -> None:
+        """Записать значения со сроком жизни ttl секунд
+
+        С only_if_missing=True существующие значения не перезаписываются (SET NX).
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, keys: List[str]) -> None:
+        """Удалить значения"""
+        pass
+
+    @abstractmethod
+    async def publish_invalidation(self, keys: List[str]) -> None:
+        """Сообщить всем экземплярам, что локальные копии ключей устарели"""
+        pass
+
+    @abstractmethod
+    def invalidations(self) -> AsyncIterator[List[str]]:
+        """Поток инвалидаций от всех экземпляров"""
+        pass
+
+
+class RedisSharedCache(ISharedCache):
+    """Общий кэш в Redis, инвалидации - через pub/sub канал"""
+
+    def __init__(self, client, channel: str = "user-service:cache-invalidation"):
+        if redis_asyncio is None:
+            raise ImportError("redis is not installed")
+        self._client = client
+        self._channel = channel
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSharedCache":
+        """Кэш по URL Redis (`redis://host:6379/0`)"""
+        if redis_asyncio is None:
+            raise ImportError("redis is not installed")
+        return cls(redis_asyncio.from_url(url), **kwargs)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Значения по ключам одним MGET"""
+        if not keys:
+            return {}
+        values = await self._client.mget(keys)
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(
+        self, items: Dict[str, bytes], ttl: float, only_if_missing: bool = False
+    ) -> None:
+        """Записать значения одним конвейером"""
+        if not items:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, ex=max(1, math.ceil(ttl)), nx=only_if_missing)
+            await pipe.execute()
+
+    async def delete(self, keys: List[str]) -> None:
+        """Удалить значения"""
+        if keys:
+            await self._client.delete(*keys)
+
+    async def publish_invalidation(self, keys: List[str]) -> None:
+        """Опубликовать инвалидацию в канал"""
+        if keys:
+            await self._client.publish(self._channel, json.dumps(keys))
+
+    async def invalidations(self) -> AsyncIterator[List[str]]:
+        """Подписка на канал инвалидаций"""
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self._channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(self._channel)
+            await pubsub.aclose()
+
+
+class FakeSharedCache(ISharedCache):
+    """Общий кэш в памяти процесса с тем же поведением, что у Redis (для тестов)"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+        self._subscribers: List[asyncio.Queue] = []
+
+    async def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        now = self._clock()
+        found = {}
+        for key in keys:
+            item = self._data.get(key)
+            if item is None:
+                continue
+            if item[1] <= now:
+                del self._data[key]
+                continue
+            found[key] = item[0]
+        return found
+
+    async def set_many(
+        self, items: Dict[str, bytes], ttl: float, only_if_missing: bool = False
+    ) -> None:
+        now = self._clock()
+        expires = now + max(1, math.ceil(ttl))
+        for key, value in items.items():
+            current = self._data.get(key)
+            if only_if_missing and current is not None and current[1] > now:
+                continue
+            self._data[key] = (value, expires)
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def publish_invalidation(self, keys: List[str]) -> None:
+        for queue in self._subscribers:
+            queue.put_nowait(list(keys))
+
+    async def invalidations(self) -> AsyncIterator[List[str]]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.remove(queue)
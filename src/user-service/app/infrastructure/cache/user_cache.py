@@ -0,0 +1,401 @@
+"""
+Кэш пользователей по Telegram ID: локальный LRU с TTL и общий кэш
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from app.domain.interfaces import IUserRepository
+from app.domain.models import User
+from app.infrastructure.cache.shared import ISharedCache
+
+# Значение в общем кэше для Telegram ID, которого нет в базе
+_MISSING = b"-"
+# Метка недавней инвалидации: читается как промах, но не дает чтению из
+# базы, начатому до инвалидации, записать в общий кэш прежнее значение
+_INVALIDATED = b"?"
+
+
+@dataclass
+class LatencyStats:
+    """Число и время обращений"""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Добавить замер"""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Число, среднее и максимальное время в миллисекундах"""
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+
+
+@dataclass
+class UserCacheStats:
+    """Счетчики кэша пользователей"""
+
+    local_hits: int = 0
+    shared_hits: int = 0
+    negative_hits: int = 0  # попадания по Telegram ID, которого нет в базе
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    latency: Dict[str, LatencyStats] = field(
+        default_factory=lambda: {
+            source: LatencyStats() for source in ("local", "shared", "database")
+        }
+    )
+
+    @property
+    def hit_ratio(self) -> float:
+        """Доля обращений, обслуженных кэшем"""
+        hits = self.local_hits + self.shared_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Текущие значения счетчиков"""
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "hit_ratio": self.hit_ratio,
+            "latency": {source: stats.snapshot() for source, stats in self.latency.items()},
+        }
+
+
+class UserCache:
+    """Кэш пользователей одного процесса перед базой
+
+    Первый уровень - LRU в памяти на `max_size` записей со сроком жизни `ttl`
+    (`negative_ttl` для Telegram ID, которых нет в базе). Второй уровень -
+    необязательный общий кэш (Redis) со сроком `shared_ttl`. Изменения
+    пользователя записываются в оба уровня, а остальным экземплярам сервиса
+    рассылается инвалидация: они сбрасывают локальную копию и перечитывают
+    общий кэш, так что устаревший is_banned не отдается дольше доставки
+    сообщения. Сообщения принимает задача listen().
+
+    Каждая инвалидация увеличивает поколение ключа: значение, прочитанное из
+    базы до инвалидации, в локальный кэш уже не попадет. В общий кэш
+    прочитанные из базы значения пишутся только на место отсутствующих
+    (SET NX), перезаписывают его лишь изменения, а удаление оставляет на
+    `invalidation_ttl` метку инвалидации. Поэтому чтение другого экземпляра,
+    начатое до бана, не вернет в общий кэш is_banned=False.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 60.0,
+        negative_ttl: float = 10.0,
+        shared: Optional[ISharedCache] = None,
+        shared_ttl: float = 300.0,
+        invalidation_ttl: float = 10.0,
+        key_prefix: str = "user:tg:",
+        clock=time.monotonic,
+    ):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._shared = shared
+        self._shared_ttl = shared_ttl
+        self._invalidation_ttl = invalidation_ttl
+        self._key_prefix = key_prefix
+        self._clock = clock
+        self._entries: "OrderedDict[int, Tuple[Optional[User], float]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self.stats = UserCacheStats()
+
+    def _key(self, telegram_id: int) -> str:
+        return f"{self._key_prefix}{telegram_id}"
+
+    def generation(self, telegram_id: int) -> int:
+        """Поколение ключа (растет при каждой инвалидации)"""
+        return self._generations.get(telegram_id, 0)
+
+    def _get_local(self, telegram_id: int) -> Tuple[bool, Optional[User]]:
+        entry = self._entries.get(telegram_id)
+        if entry is None:
+            return False, None
+        user, expires = entry
+        if expires <= self._clock():
+            del self._entries[telegram_id]
+            return False, None
+        self._entries.move_to_end(telegram_id)
+        return True, user
+
+    def _set_local(self, telegram_id: int, user: Optional[User]) -> None:
+        ttl = self._ttl if user is not None else self._negative_ttl
+        self._entries[telegram_id] = (user, self._clock() + ttl)
+        self._entries.move_to_end(telegram_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get_many(self, telegram_ids: Iterable[int]) -> Dict[int, Optional[User]]:
+        """Закэшированные значения (None - известно, что пользователя нет)
+
+        Ключей, которых нет ни на одном уровне, в ответе нет.
+        """
+        started = time.perf_counter()
+        found: Dict[int, Optional[User]] = {}
+        missing: List[int] = []
+        for telegram_id in telegram_ids:
+            hit, user = self._get_local(telegram_id)
+            if hit:
+                found[telegram_id] = user
+            else:
+                missing.append(telegram_id)
+        self.stats.local_hits += len(found)
+        if found:
+            self.stats.latency["local"].observe(time.perf_counter() - started)
+        if not missing or self._shared is None:
+            return found
+
+        started = time.perf_counter()
+        generations = {telegram_id: self.generation(telegram_id) for telegram_id in missing}
+        values = await self._shared.get_many([self._key(telegram_id) for telegram_id in missing])
+        shared_found = 0
+        for telegram_id in missing:
+            value = values.get(self._key(telegram_id))
+            if value is None or value == _INVALIDATED:
+                continue
+            user = None if value == _MISSING else User.model_validate_json(value)
+            found[telegram_id] = user
+            shared_found += 1
+            if generations[telegram_id] == self.generation(telegram_id):
+                self._set_local(telegram_id, user)
+        self.stats.shared_hits += shared_found
+        if shared_found:
+            self.stats.latency["shared"].observe(time.perf_counter() - started)
+        return found
+
+    async def put_many(
+        self,
+        users: Dict[int, Optional[User]],
+        generations: Optional[Dict[int, int]] = None,
+    ) -> None:
+        """Записать значения в оба уровня
+
+        С `generations` это заполнение после чтения из базы: значения, ключи
+        которых успели инвалидировать, пропускаются, а в общем кэше
+        существующие значения не перезаписываются. Без `generations` это
+        запись изменения, она перезаписывает общий кэш.
+        """
+        fill = generations is not None
+        if fill:
+            users = {
+                telegram_id: user
+                for telegram_id, user in users.items()
+                if generations.get(telegram_id) == self.generation(telegram_id)
+            }
+        for telegram_id, user in users.items():
+            self._set_local(telegram_id, user)
+        if self._shared is None or not users:
+            return
+        positive = {
+            self._key(telegram_id): user.model_dump_json().encode()
+            for telegram_id, user in users.items()
+            if user is not None
+        }
+        negative = {
+            self._key(telegram_id): _MISSING for telegram_id, user in users.items() if user is None
+        }
+        await self._shared.set_many(positive, self._shared_ttl, only_if_missing=fill)
+        await self._shared.set_many(negative, self._negative_ttl, only_if_missing=fill)
+
+    def _drop_local(self, telegram_ids: Iterable[int]) -> None:
+        for telegram_id in telegram_ids:
+            self._entries.pop(telegram_id, None)
+            self._generations[telegram_id] = self.generation(telegram_id) + 1
+            self.stats.invalidations += 1
+
+    async def write_through(self, user: User) -> None:
+        """Записать измененного пользователя и сбросить его копии в других экземплярах"""
+        self._drop_local([user.tg_id])
+        await self.put_many({user.tg_id: user})
+        if self._shared is not None:
+            await self._shared.publish_invalidation([self._key(user.tg_id)])
+
+    async def invalidate(self, telegram_ids: Iterable[int]) -> None:
+        """Удалить пользователей из обоих уровней во всех экземплярах"""
+        ids = list(telegram_ids)
+        self._drop_local(ids)
+        if self._shared is not None and ids:
+            keys = [self._key(telegram_id) for telegram_id in ids]
+            await self._shared.set_many(
+                {key: _INVALIDATED for key in keys}, self._invalidation_ttl
+            )
+            await self._shared.publish_invalidation(keys)
+
+    async def listen(self) -> None:
+        """Применять инвалидации других экземпляров (запускается отдельной задачей)"""
+        if self._shared is None:
+            return
+        async for keys in self._shared.invalidations():
+            self._drop_local(
+                int(key[len(self._key_prefix):]) for key in keys if key.startswith(self._key_prefix)
+            )
+
+    def observe_database(self, seconds: float, count: int) -> None:
+        """Учесть чтение промахов из базы"""
+        self.stats.misses += count
+        self.stats.latency["database"].observe(seconds)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedUserRepository(IUserRepository):
+    """Обертка репозитория: чтение по Telegram ID через UserCache
+
+    Репозиторий создается на запрос, кэш общий на процесс. Изменения
+    попадают в кэш только после коммита транзакции (on_commit), так что
+    забаненный пользователь не читается из кэша как активный, а откаченная
+    запись не попадает в кэш. До коммита измененные пользователи читаются
+    мимо кэша.
+    """
+
+    def __init__(self, repository: IUserRepository, cache: UserCache):
+        self._repository = repository
+        self._cache = cache
+        self._written: Dict[int, User] = {}
+        self._invalidated: Set[int] = set()
+
+    def _write(self, user: User) -> None:
+        """Отложить запись пользователя в кэш до коммита"""
+        self._invalidated.discard(user.tg_id)
+        self._written[user.tg_id] = user
+
+    def _invalidate(self, telegram_ids: Iterable[int]) -> None:
+        """Отложить сброс пользователей из кэша до коммита"""
+        for telegram_id in telegram_ids:
+            self._written.pop(telegram_id, None)
+            self._invalidated.add(telegram_id)
+
+    async def on_commit(self) -> None:
+        """Применить к кэшу изменения зафиксированной транзакции"""
+        written, self._written = self._written, {}
+        invalidated, self._invalidated = self._invalidated, set()
+        if invalidated:
+            await self._cache.invalidate(invalidated)
+        for user in written.values():
+            await self._cache.write_through(user)
+
+    def on_rollback(self) -> None:
+        """Забыть изменения откаченной транзакции"""
+        self._written.clear()
+        self._invalidated.clear()
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Получить пользователя по ID"""
+        return await self._repository.get_by_id(user_id)
+
+    async def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID"""
+        users = await self.get_by_telegram_ids([telegram_id])
+        return users.get(telegram_id)
+
+    async def get_by_telegram_ids(self, telegram_ids: Iterable[int]) -> Dict[int, User]:
+        """Получить пользователей по списку Telegram ID (промахи - одним запросом)"""
+        ids = list(dict.fromkeys(telegram_ids))
+        # Незафиксированные изменения видны только этой транзакции
+        pending = (self._written.keys() | self._invalidated).intersection(ids)
+        if pending:
+            ids = [telegram_id for telegram_id in ids if telegram_id not in pending]
+        cached = await self._cache.get_many(ids)
+        self._cache.stats.negative_hits += sum(1 for user in cached.values() if user is None)
+        missing = [telegram_id for telegram_id in ids if telegram_id not in cached]
+        if missing:
+            generations = {telegram_id: self._cache.generation(telegram_id) for telegram_id in missing}
+            started = time.perf_counter()
+            loaded = await self._repository.get_by_telegram_ids(missing)
+            self._cache.observe_database(time.perf_counter() - started, len(missing))
+            fetched = {telegram_id: loaded.get(telegram_id) for telegram_id in missing}
+            await self._cache.put_many(fetched, generations)
+            cached.update(fetched)
+        if pending:
+            cached.update(await self._repository.get_by_telegram_ids(pending))
+        return {telegram_id: user for telegram_id, user in cached.items() if user is not None}
+
+    async def get_active_users(self, limit: int = 100, offset: int = 0) -> List[User]:
+        """Получить список активных пользователей"""
+        return await self._repository.get_active_users(limit, offset)
+
+    async def get_active_users_after(self, after_id: int = 0, limit: int = 100) -> List[User]:
+        """Страница активных пользователей с ID больше after_id"""
+        return await self._repository.get_active_users_after(after_id, limit)
+
+    def iter_active_users(
+        self, chunk_size: int = 1000, after_id: int = 0
+    ) -> AsyncIterator[List[User]]:
+        """Поток активных пользователей пачками по chunk_size"""
+        return self._repository.iter_active_users(chunk_size, after_id)
+
+    async def create(self, user: User) -> User:
+        """Создать пользователя (после коммита заменяет отрицательную запись кэша)"""
+        created = await self._repository.create(user)
+        self._write(created)
+        return created
+
+    async def get_or_create(self, user: User) -> Tuple[User, bool]:
+        """Создать пользователя или обновить профиль и записать результат в кэш"""
+        stored, created = await self._repository.get_or_create(user)
+        self._write(stored)
+        return stored, created
+
+    async def update(self, user: User) -> Optional[User]:
+        """Обновить пользователя и записать результат в кэш"""
+        updated = await self._repository.update(user)
+        if updated is None:
+            self._invalidate([user.tg_id])
+        else:
+            self._write(updated)
+        return updated
+
+    async def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, use_copy: bool = False
+    ) -> int:
+        """Создать пользователей пачками (сбрасывает отрицательные записи кэша)"""
+        return await self._bulk(self._repository.create_many, users, batch_size, use_copy)
+
+    async def upsert_many(
+        self, users: Iterable[User], batch_size: int = 1000, update_flags: bool = False
+    ) -> int:
+        """Создать или обновить пользователей пачками со сбросом кэша"""
+        return await self._bulk(self._repository.upsert_many, users, batch_size, update_flags)
+
+    async def update_many(self, users: Iterable[User], batch_size: int = 1000) -> int:
+        """Обновить пользователей пачками со сбросом кэша"""
+        return await self._bulk(self._repository.update_many, users, batch_size)
+
+    async def _bulk(self, operation, users: Iterable[User], batch_size: int, *args) -> int:
+        """Выполнить массовую операцию по пачкам, сброс кэша - после коммита"""
+        total = 0
+        iterator = iter(users)
+        while batch := list(islice(iterator, batch_size)):
+            self._invalidate(user.tg_id for user in batch)
+            total += await operation(batch, batch_size, *args)
+        return total
+
+    def _model_to_domain(self, model) -> User:
+        """Преобразует ORM модель в доменную модель"""
+        return self._repository._model_to_domain(model)
+
+    def _domain_to_model(self, domain: User):
+        """Преобразует доменную модель в ORM модель"""
+        return self._repository._domain_to_model(domain)
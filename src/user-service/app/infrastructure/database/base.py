@@ -1,24 +1,29 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from app.config import Settings
 from advanced_alchemy.base import BigIntAuditBase
 
-settings = Settings()
 
-# if settings.MODE == "TEST":
-#     DATABASE_URL = settings.TEST_DATABASE_URL
-#     DATABASE_PARAMS = {"poolclass":NullPool}
-
-# else:
-#   TODO: #remove this when not needed
-DATABASE_URL = settings.database_url
-DATABASE_PARAMS = {}
-
-async_engine = create_async_engine(
-    DATABASE_URL, **DATABASE_PARAMS, echo=True, pool_pre_ping=True
-)
-async_session_maker = async_sessionmaker(
-    bind=async_engine, expire_on_commit=False, autoflush=False, autocommit=False
-)
+def build_engine(settings: Settings, url: str | None = None, **params) -> AsyncEngine:
+    """Создать движок с пулом соединений из настроек"""
+    url = url or settings.database_url
+    connect_args = {}
+    if "+asyncpg" in url:
+        # Подготовленные выражения кэшируются на соединении и переживают запрос
+        connect_args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+        if settings.db_statement_cache_size == 0:
+            connect_args["statement_cache_size"] = 0
+    if "poolclass" not in params:
+        params.setdefault("pool_size", settings.db_pool_size)
+        params.setdefault("max_overflow", settings.db_max_overflow)
+        params.setdefault("pool_timeout", settings.db_pool_timeout)
+        params.setdefault("pool_recycle", settings.db_pool_recycle)
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+        **params,
+    )
 
 
 class Base(BigIntAuditBase):
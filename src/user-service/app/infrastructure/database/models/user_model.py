@@ -1,5 +1,5 @@
 from app.infrastructure.database.base import Base
-from sqlalchemy import BigInteger, Column, String, Boolean, Index
+from sqlalchemy import BigInteger, Column, String, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
@@ -17,7 +17,16 @@ class UserModel(Base):
     language_code: Mapped[str | None] = mapped_column(String(10), nullable=True)
     is_banned: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
-    __table_args__ = (Index("idx_user_status", "telegram_id", "is_banned"),)
+    __table_args__ = (
+        Index("idx_user_status", "telegram_id", "is_banned"),
+        # Keyset-обход активных пользователей по id
+        Index(
+            "ix_users_active_id",
+            "id",
+            postgresql_where=text("is_banned = false"),
+            sqlite_where=text("is_banned = 0"),
+        ),
+    )
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, telegram_id={self.telegram_id}, username={self.username})>"
@@ -0,0 +1,85 @@
+"""
+Unit of Work - сессия и репозитории на время одного запроса
+"""
+
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.domain.interfaces import IUnitOfWork, IUserRepository
+from app.infrastructure.cache.user_cache import CachedUserRepository, UserCache
+from app.infrastructure.repositories.batching_repository import BatchingUserRepository
+from app.infrastructure.repositories.user_repository import UserRepository
+
+
+class UnitOfWork(IUnitOfWork):
+    """Своя сессия на каждый запрос
+
+    Соединение берется из пула при первом обращении к базе и возвращается
+    при выходе из контекста, поэтому параллельные запросы не делят одну
+    AsyncSession и не ждут друг друга. Репозиторий пользователей собирается
+    цепочкой: UserRepository -> кэш процесса (если есть) -> пакетная
+    загрузка по Telegram ID в пределах запроса.
+
+    Репозитории не коммитят сами: транзакция фиксируется commit() или при
+    выходе из контекста без исключения, при исключении откатывается. Кэш
+    пользователей обновляется только после коммита.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        user_cache: Optional[UserCache] = None,
+    ):
+        self._session_factory = session_factory
+        self._user_cache = user_cache
+        self._session: Optional[AsyncSession] = None
+        self._cached_users: Optional[CachedUserRepository] = None
+        self.users: BatchingUserRepository
+
+    @property
+    def session(self) -> AsyncSession:
+        """Сессия запроса"""
+        if self._session is None:
+            raise RuntimeError("UnitOfWork is not entered")
+        return self._session
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._session = self._session_factory()
+        users: IUserRepository = UserRepository(self._session)
+        self._cached_users = None
+        if self._user_cache is not None:
+            users = self._cached_users = CachedUserRepository(users, self._user_cache)
+        self.users = BatchingUserRepository(users)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # При исключении close() откатывает транзакцию при возврате
+        # соединения в пул, отдельный rollback был бы лишним запросом
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                self._discard()
+        finally:
+            try:
+                await self._session.close()
+            finally:
+                self._session = None
+
+    async def commit(self) -> None:
+        """Зафиксировать изменения и применить их к кэшу пользователей"""
+        await self.session.commit()
+        if self._cached_users is not None:
+            await self._cached_users.on_commit()
+
+    async def rollback(self) -> None:
+        """Откатить изменения"""
+        try:
+            await self.session.rollback()
+        finally:
+            self._discard()
+
+    def _discard(self) -> None:
+        """Забыть результаты откаченной транзакции в кэшах запроса"""
+        if self._cached_users is not None:
+            self._cached_users.on_rollback()
+        self.users.loader.clear()
@@ -0,0 +1,118 @@
+"""
+Репозиторий пользователей с пакетной загрузкой по Telegram ID
+"""
+
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from app.domain.interfaces import IUserRepository
+from app.domain.models import User
+from app.infrastructure.repositories.dataloader import DataLoader
+
+
+class BatchingUserRepository(IUserRepository):
+    """Обертка репозитория: одиночные get_by_telegram_id одного тика - один запрос
+
+    Создается на один запрос (как и сессия): загрузчик кэширует найденных
+    пользователей до конца запроса, а create/update обновляют этот кэш.
+    """
+
+    def __init__(self, repository: IUserRepository, max_batch_size: int = 1000):
+        self._repository = repository
+        self._loader: DataLoader[int, Optional[User]] = DataLoader(
+            repository.get_by_telegram_ids, max_batch_size=max_batch_size
+        )
+
+    @property
+    def loader(self) -> DataLoader[int, Optional[User]]:
+        """Загрузчик пользователей по Telegram ID"""
+        return self._loader
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Получить пользователя по ID"""
+        return await self._repository.get_by_id(user_id)
+
+    async def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по Telegram ID (запросы одного тика объединяются)"""
+        return await self._loader.load(telegram_id)
+
+    async def get_by_telegram_ids(self, telegram_ids: Iterable[int]) -> Dict[int, User]:
+        """Получить пользователей по списку Telegram ID"""
+        ids = list(dict.fromkeys(telegram_ids))
+        users = await self._loader.load_many(ids)
+        return {
+            telegram_id: user for telegram_id, user in zip(ids, users) if user is not None
+        }
+
+    async def get_active_users(self, limit: int = 100, offset: int = 0) -> List[User]:
+        """Получить список активных пользователей"""
+        return await self._repository.get_active_users(limit, offset)
+
+    async def get_active_users_after(self, after_id: int = 0, limit: int = 100) -> List[User]:
+        """Страница активных пользователей с ID больше after_id"""
+        return await self._repository.get_active_users_after(after_id, limit)
+
+    def iter_active_users(
+        self, chunk_size: int = 1000, after_id: int = 0
+    ) -> AsyncIterator[List[User]]:
+        """Поток активных пользователей пачками по chunk_size"""
+        return self._repository.iter_active_users(chunk_size, after_id)
+
+    async def create(self, user: User) -> User:
+        """Создать пользователя"""
+        created = await self._repository.create(user)
+        self._loader.prime(created.tg_id, created)
+        return created
+
+    async def get_or_create(self, user: User) -> Tuple[User, bool]:
+        """Создать пользователя или обновить профиль существующего"""
+        stored, created = await self._repository.get_or_create(user)
+        self._loader.prime(stored.tg_id, stored)
+        return stored, created
+
+    async def update(self, user: User) -> Optional[User]:
+        """Обновить пользователя
+
+        Кэш загрузчика сбрасывается и до записи, и после нее: загрузка,
+        начатая во время записи, могла закэшировать прежнюю строку.
+        """
+        self._loader.clear(user.tg_id)
+        updated = None
+        try:
+            updated = await self._repository.update(user)
+        finally:
+            if updated is None:
+                self._loader.clear(user.tg_id)
+            else:
+                self._loader.prime(updated.tg_id, updated)
+        return updated
+
+    async def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, use_copy: bool = False
+    ) -> int:
+        """Создать пользователей пачками"""
+        return await self._repository.create_many(users, batch_size, use_copy)
+
+    async def upsert_many(
+        self, users: Iterable[User], batch_size: int = 1000, update_flags: bool = False
+    ) -> int:
+        """Создать или обновить пользователей пачками (кэш загрузчика сбрасывается)"""
+        self._loader.clear()
+        try:
+            return await self._repository.upsert_many(users, batch_size, update_flags)
+        finally:
+            self._loader.clear()
+
+    async def update_many(self, users: Iterable[User], batch_size: int = 1000) -> int:
+        """Обновить пользователей пачками (кэш загрузчика сбрасывается)"""
+        self._loader.clear()
+        try:
+            return await self._repository.update_many(users, batch_size)
+        finally:
+            self._loader.clear()
+
+    def _model_to_domain(self, model) -> User:
+        """Преобразует ORM модель в доменную модель"""
+        return self._repository._model_to_domain(model)
+
+    def _domain_to_model(self, domain: User):
+        """Преобразует доменную модель в ORM модель"""
+        return self._repository._domain_to_model(domain)
@@ -0,0 +1,98 @@
+"""
+DataLoader - объединение одиночных запросов в пакетные
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """Собирает вызовы load() одного тика цикла событий в один вызов batch_load
+
+    Ключи копятся до конца текущей итерации цикла событий, затем уходят в
+    `batch_load` пачками не больше `max_batch_size`. Для ключа, которого нет
+    в ответе, возвращается `default`. Результаты кэшируются на время жизни
+    загрузчика, поэтому загрузчик создается на один запрос.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        default: Optional[V] = None,
+        max_batch_size: int = 1000,
+        cache: bool = True,
+    ):
+        self._batch_load = batch_load
+        self._default = default
+        self._max_batch_size = max_batch_size
+        self._cache_enabled = cache
+        self._cache: Dict[K, asyncio.Future] = {}
+        self._queue: Dict[K, asyncio.Future] = {}
+        self._scheduled = False
+        # Ссылки на выполняющиеся пакеты: цикл событий хранит задачи слабо
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+
+    async def load(self, key: K) -> V:
+        """Значение по ключу"""
+        future = self._cache.get(key) or self._queue.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._queue[key] = future
+            if self._cache_enabled:
+                self._cache[key] = future
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        # Отмена одного ожидающего не отменяет загрузку для остальных
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List[V]:
+        """Значения по ключам в том же порядке"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Положить известное значение в кэш загрузчика"""
+        if not self._cache_enabled:
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._cache[key] = future
+
+    def clear(self, key: Optional[K] = None) -> None:
+        """Забыть значение ключа (без ключа - все значения)"""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, {}
+        self._scheduled = False
+        items = list(queue.items())
+        for start in range(0, len(items), self._max_batch_size):
+            task = asyncio.ensure_future(
+                self._run(dict(items[start:start + self._max_batch_size]))
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[K, asyncio.Future]) -> None:
+        self.batches += 1
+        try:
+            values = await self._batch_load(list(batch))
+        except Exception as e:
+            for key, future in batch.items():
+                # Ошибку не кэшируем: следующий load() повторит запрос
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key, self._default))
@@ -2,16 +2,65 @@
 User Repository - работа с пользователями в базе данных
 """
 
-from typing import Optional, List
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import BigInteger, Boolean, String, column, literal_column, select, update, delete, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from app.domain.models import User
 from app.infrastructure.database.models import UserModel
 from app.domain.interfaces import IUserRepository
 
+# Сколько Telegram ID передается в одном запросе IN
+_IN_BATCH_SIZE = 5000
+
+# Поля профиля Telegram, которые обновляются при повторной регистрации
+PROFILE_FIELDS = ("username", "first_name", "last_name", "language_code")
+
+# Размер пачки массовых операций по умолчанию
+BULK_BATCH_SIZE = 1000
+
+# Флаги, которые регистрация и upsert по умолчанию не меняют
+FLAG_FIELDS = ("is_banned", "is_admin")
+
+# Колонки, которые пишут массовые операции (id назначает база)
+_BULK_COLUMNS = ("telegram_id", *PROFILE_FIELDS, *FLAG_FIELDS)
+
+# Типы колонок для UPDATE ... FROM (VALUES ...)
+_COLUMN_TYPES = {
+    "telegram_id": BigInteger,
+    **{name: String for name in PROFILE_FIELDS},
+    "is_banned": Boolean,
+    "is_admin": Boolean,
+}
+
+
+def _batches(users: Iterable[User], size: int) -> Iterator[List[User]]:
+    """Пачки пользователей по size (вход читается лениво)"""
+    iterator = iter(users)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _by_fields(users: List[User], names: Iterable[str]) -> Dict[Tuple[str, ...], List[User]]:
+    """Пользователи, сгруппированные по явно заданным полям из names (model_fields_set)"""
+    names = tuple(names)
+    groups: Dict[Tuple[str, ...], List[User]] = {}
+    for user in users:
+        fields = tuple(name for name in names if name in user.model_fields_set)
+        groups.setdefault(fields, []).append(user)
+    return groups
+
 
 class UserRepository(IUserRepository):
+    """Пользователи в PostgreSQL
+
+    Методы не фиксируют и не откатывают транзакцию: ей управляет unit of
+    work, которому принадлежит сессия.
+    """
+
     def __init__(self, session: AsyncSession):
         self._session = session
 
@@ -38,6 +87,22 @@ class UserRepository(IUserRepository):
         except SQLAlchemyError as e:
             raise ValueError(f"Error fetching user by telegram_id: {str(e)}")
 
+    async def get_by_telegram_ids(self, telegram_ids: Iterable[int]) -> Dict[int, User]:
+        """Получить пользователей по списку Telegram ID"""
+        ids = list(dict.fromkeys(telegram_ids))
+        users: Dict[int, User] = {}
+        try:
+            for start in range(0, len(ids), _IN_BATCH_SIZE):
+                stmt = select(UserModel).where(
+                    UserModel.telegram_id.in_(ids[start:start + _IN_BATCH_SIZE])
+                )
+                result = await self._session.execute(stmt)
+                for user_model in result.scalars():
+                    users[user_model.telegram_id] = self._model_to_domain(user_model)
+            return users
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error fetching users by telegram_ids: {str(e)}")
+
     async def get_active_users(self, limit: int = 100, offset: int = 0) -> List[User]:
         """Получить список активных пользователей"""
         try:
@@ -54,35 +119,228 @@ class UserRepository(IUserRepository):
         except SQLAlchemyError as e:
             raise ValueError(f"Error fetching active users: {str(e)}")
 
+    async def get_active_users_after(self, after_id: int = 0, limit: int = 100) -> List[User]:
+        """Получить страницу активных пользователей с ID больше after_id
+
+        Keyset-пагинация: стоимость страницы не зависит от ее глубины,
+        следующая страница запрашивается с ID последнего пользователя.
+        """
+        try:
+            stmt = (
+                select(UserModel)
+                .where(UserModel.is_banned == False, UserModel.id > after_id)
+                .order_by(UserModel.id)
+                .limit(limit)
+            )
+            result = await self._session.execute(stmt)
+            return [self._model_to_domain(user) for user in result.scalars()]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error fetching active users: {str(e)}")
+
+    async def iter_active_users(
+        self, chunk_size: int = 1000, after_id: int = 0
+    ) -> AsyncIterator[List[User]]:
+        """Поток активных пользователей пачками по chunk_size
+
+        Строки читаются серверным курсором, поэтому в памяти одна пачка, но
+        транзакция сессии открыта до конца обхода. Для долгой обработки пачек
+        лучше get_active_users_after: с after_id обход продолжается с места
+        остановки.
+        """
+        try:
+            stmt = (
+                select(UserModel)
+                .where(UserModel.is_banned == False, UserModel.id > after_id)
+                .order_by(UserModel.id)
+                .execution_options(yield_per=chunk_size)
+            )
+            result = await self._session.stream(stmt)
+            async for partition in result.scalars().partitions():
+                yield [self._model_to_domain(user) for user in partition]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error streaming active users: {str(e)}")
+
     async def create(self, user: User) -> User:
         """Создать пользователя"""
         try:
-            user_model = UserModel(**user.model_dump(exclude={"id"}))
+            user_model = UserModel(**self._model_values(user))
             self._session.add(user_model)
-            await self._session.commit()
+            await self._session.flush()
             await self._session.refresh(user_model)
             return self._model_to_domain(user_model)
         except SQLAlchemyError as e:
-            await self._session.rollback()
             raise ValueError(f"Error creating user: {str(e)}")
 
+    async def get_or_create(self, user: User) -> Tuple[User, bool]:
+        """Создать пользователя или обновить профиль существующего одним запросом
+
+        INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING: гонки
+        параллельных регистраций нет, флаги is_banned/is_admin существующего
+        пользователя не меняются. Возвращает пользователя и признак создания.
+        """
+        try:
+            values = self._model_values(user)
+            stmt = insert(UserModel).values(**values)
+            stmt = (
+                stmt.on_conflict_do_update(
+                    index_elements=[UserModel.telegram_id],
+                    set_={
+                        **{name: stmt.excluded[name] for name in PROFILE_FIELDS},
+                        "updated_at": datetime.now(timezone.utc),
+                    },
+                )
+                # xmax = 0 только у строки, вставленной этим запросом
+                .returning(UserModel, literal_column("xmax = 0").label("created"))
+                .execution_options(populate_existing=True)
+            )
+            result = await self._session.execute(stmt)
+            user_model, created = result.one()
+            return self._model_to_domain(user_model), bool(created)
+        except SQLAlchemyError as e:
+            raise ValueError(f"Error upserting user: {str(e)}")
+
     async def update(self, user: User) -> Optional[User]:
         """Обновить пользователя"""
         try:
             stmt = (
                 update(UserModel)
                 .where(UserModel.id == user.id)
-                .values(**user.model_dump(exclude={"id"}))
+                .values(**self._model_values(user))
                 .returning(UserModel)
             )
             result = await self._session.execute(stmt)
-            await self._session.commit()
             updated_user = result.scalar_one_or_none()
-            return self._domain_to_model(updated_user) if updated_user else None
+            return self._model_to_domain(updated_user) if updated_user else None
         except SQLAlchemyError as e:
-            await self._session.rollback()
             raise ValueError(f"Error updating user: {str(e)}")
 
+    async def create_many(
+        self,
+        users: Iterable[User],
+        batch_size: int = BULK_BATCH_SIZE,
+        use_copy: bool = False,
+    ) -> int:
+        """Создать пользователей пачками по batch_size в текущей транзакции
+
+        Пачка вставляется одним executemany (insertmanyvalues), с use_copy на
+        asyncpg - через COPY. Повтор telegram_id - ошибка; для повторной
+        загрузки есть upsert_many. Возвращает число созданных пользователей.
+        """
+        created = 0
+        for batch in _batches(users, batch_size):
+            try:
+                if use_copy and await self._driver() == "asyncpg":
+                    await self._copy(batch)
+                else:
+                    await self._session.execute(
+                        insert(UserModel), [self._model_values(user) for user in batch]
+                    )
+            except SQLAlchemyError as e:
+                raise ValueError(f"Error creating users after {created} rows: {str(e)}")
+            created += len(batch)
+        return created
+
+    async def upsert_many(
+        self,
+        users: Iterable[User],
+        batch_size: int = BULK_BATCH_SIZE,
+        update_flags: bool = False,
+    ) -> int:
+        """Создать пользователей или обновить профиль существующих пачками
+
+        Как get_or_create, но executemany на пачку: у существующих
+        пользователей обновляются только явно заданные поля профиля
+        (model_fields_set), is_banned/is_admin - только с update_flags
+        (синхронизация из другой системы). Возвращает число строк.
+        """
+        names = (*PROFILE_FIELDS, *FLAG_FIELDS) if update_flags else PROFILE_FIELDS
+        processed = 0
+        for batch in _batches(users, batch_size):
+            try:
+                for fields, group in _by_fields(batch, names).items():
+                    await self._session.execute(
+                        self._upsert_statement(fields),
+                        [self._model_values(user) for user in group],
+                    )
+            except SQLAlchemyError as e:
+                raise ValueError(f"Error upserting users after {processed} rows: {str(e)}")
+            processed += len(batch)
+        return processed
+
+    @staticmethod
+    def _upsert_statement(fields: Tuple[str, ...]):
+        """INSERT ... ON CONFLICT, обновляющий у существующих только fields"""
+        stmt = insert(UserModel)
+        if not fields:
+            return stmt.on_conflict_do_nothing(index_elements=[UserModel.telegram_id])
+        return stmt.on_conflict_do_update(
+            index_elements=[UserModel.telegram_id],
+            set_={
+                **{name: stmt.excluded[name] for name in fields},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+
+    async def update_many(self, users: Iterable[User], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Обновить пользователей по telegram_id пачками
+
+        Пишутся только явно заданные поля (model_fields_set): пачка - по
+        одному UPDATE ... FROM (VALUES ...) на каждый набор полей.
+        Возвращает число обновленных строк (ненайденные пропускаются).
+        """
+        table = UserModel.__table__
+        updated = 0
+        for batch in _batches(users, batch_size):
+            for fields, group in _by_fields(batch, _BULK_COLUMNS[1:]).items():
+                if not fields:
+                    continue
+                names = ("telegram_id", *fields)
+                rows = values(
+                    *(column(name, _COLUMN_TYPES[name]) for name in names),
+                    name="batch",
+                ).data([
+                    tuple(self._model_values(user)[name] for name in names) for user in group
+                ])
+                stmt = (
+                    update(table)
+                    .where(table.c.telegram_id == rows.c.telegram_id)
+                    .values(
+                        **{name: rows.c[name] for name in fields},
+                        updated_at=datetime.now(timezone.utc),
+                    )
+                )
+                try:
+                    result = await self._session.execute(stmt)
+                except SQLAlchemyError as e:
+                    raise ValueError(f"Error updating users after {updated} rows: {str(e)}")
+                updated += result.rowcount
+        return updated
+
+    async def _driver(self) -> str:
+        connection = await self._session.connection()
+        return connection.dialect.driver
+
+    async def _copy(self, batch: List[User]) -> None:
+        """Вставить пачку через COPY asyncpg в транзакции сессии"""
+        connection = await self._session.connection()
+        raw = await connection.get_raw_connection()
+        now = datetime.now(timezone.utc)
+        records = [
+            (*(self._model_values(user)[name] for name in _BULK_COLUMNS), now, now)
+            for user in batch
+        ]
+        await raw.driver_connection.copy_records_to_table(
+            UserModel.__tablename__,
+            records=records,
+            columns=[*_BULK_COLUMNS, "created_at", "updated_at"],
+        )
+
+    def _model_values(self, user: User) -> Dict[str, Any]:
+        """Значения колонок UserModel из доменной модели (без id)"""
+        values = user.model_dump(exclude={"id", "tg_id"})
+        values["telegram_id"] = user.tg_id
+        return values
+
     def _model_to_domain(self, user_model: UserModel) -> User:
         """Преобразовать SQLAlchemy модель в Pydantic модель"""
         return User(
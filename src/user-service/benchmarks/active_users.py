@@ -0,0 +1,149 @@
+"""
+Постраничный обход активных пользователей: OFFSET против keyset и потока
+
+Нужна база с применёнными миграциями. Переменные окружения - как для
+сервиса, либо URL в --url. Недостающие строки до --rows досоздаются (каждый
+десятый пользователь забанен), а после замера удаляются, если не указан --keep.
+
+Запуск из каталога user-service:
+    python -m benchmarks.active_users [--url postgresql+asyncpg://...] [--rows 1000000]
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.config import Settings
+from app.infrastructure.database.models import UserModel
+from app.infrastructure.repositories.user_repository import UserRepository
+
+# Telegram ID тестовых пользователей начинаются отсюда
+SEED_TELEGRAM_ID = 9_000_000_000_000
+SEED_BATCH = 10_000
+
+
+async def seed_users(sessions: async_sessionmaker, rows: int) -> int:
+    """Досоздать тестовых пользователей до rows строк в таблице"""
+    async with sessions() as session:
+        existing = await session.scalar(select(func.count()).select_from(UserModel))
+        start = await session.scalar(
+            select(func.count()).where(UserModel.telegram_id >= SEED_TELEGRAM_ID)
+        )
+        for offset in range(start, start + max(0, rows - existing), SEED_BATCH):
+            count = min(SEED_BATCH, start + rows - existing - offset)
+            await session.execute(
+                insert(UserModel),
+                [
+                    {
+                        "telegram_id": SEED_TELEGRAM_ID + index,
+                        "username": f"user{index}",
+                        "first_name": "Bench",
+                        "is_banned": index % 10 == 0,
+                        "is_admin": False,
+                    }
+                    for index in range(offset, offset + count)
+                ],
+            )
+            await session.commit()
+        return max(0, rows - existing)
+
+
+async def _median_ms(func: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        times.append(time.perf_counter() - started)
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+async def run(url: str, rows: int, page_size: int, repeat: int, keep: bool) -> Dict[str, Any]:
+    engine = create_async_engine(url)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    started = time.perf_counter()
+    seeded = await seed_users(sessions, rows)
+    report: Dict[str, Any] = {"seeded": seeded, "seed_s": time.perf_counter() - started, "pages": []}
+
+    try:
+        async with sessions() as session:
+            repository = UserRepository(session)
+            active = await session.scalar(
+                select(func.count()).where(UserModel.is_banned == False)
+            )
+            report["active"] = active
+            last_page = max(0, (active - 1) // page_size)
+            depths = sorted({0, 10, 100, 1000, last_page // 2, last_page} & set(range(last_page + 1)))
+            for page in depths:
+                offset = page * page_size
+                after_id = 0
+                if offset:
+                    after_id = await session.scalar(
+                        select(UserModel.id)
+                        .where(UserModel.is_banned == False)
+                        .order_by(UserModel.id)
+                        .offset(offset - 1)
+                        .limit(1)
+                    )
+                offset_ms = await _median_ms(
+                    lambda: repository.get_active_users(page_size, offset), repeat
+                )
+                keyset_ms = await _median_ms(
+                    lambda: repository.get_active_users_after(after_id, page_size), repeat
+                )
+                report["pages"].append({"page": page, "offset_ms": offset_ms, "keyset_ms": keyset_ms})
+
+        async with sessions() as session:
+            repository = UserRepository(session)
+            started = time.perf_counter()
+            streamed = 0
+            chunks: List[float] = []
+            chunk_started = time.perf_counter()
+            async for chunk in repository.iter_active_users(chunk_size=page_size * 10):
+                streamed += len(chunk)
+                chunks.append(time.perf_counter() - chunk_started)
+                chunk_started = time.perf_counter()
+            elapsed = time.perf_counter() - started
+            chunks.sort()
+            report["stream"] = {
+                "users": streamed,
+                "seconds": elapsed,
+                "users_per_s": streamed / elapsed if elapsed else 0.0,
+                "chunk_p50_ms": chunks[len(chunks) // 2] * 1000 if chunks else 0.0,
+                "chunk_max_ms": chunks[-1] * 1000 if chunks else 0.0,
+            }
+    finally:
+        if seeded and not keep:
+            async with sessions() as session:
+                await session.execute(delete(UserModel).where(UserModel.telegram_id >= SEED_TELEGRAM_ID))
+                await session.commit()
+        await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="URL базы (по умолчанию из настроек сервиса)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="не удалять созданные строки")
+    args = parser.parse_args()
+
+    url = args.url or Settings().database_url
+    report = asyncio.run(run(url, args.rows, args.page_size, args.repeat, args.keep))
+    print(f"seeded {report['seeded']} rows in {report['seed_s']:.1f} s, active users: {report['active']}")
+    print(f"{'page':>8}{'offset ms':>12}{'keyset ms':>12}")
+    for row in report["pages"]:
+        print(f"{row['page']:>8}{row['offset_ms']:>12.2f}{row['keyset_ms']:>12.2f}")
+    stream = report["stream"]
+    print(
+        f"stream: {stream['users']} users in {stream['seconds']:.1f} s "
+        f"({stream['users_per_s']:.0f} users/s), chunk p50 {stream['chunk_p50_ms']:.1f} ms, "
+        f"max {stream['chunk_max_ms']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
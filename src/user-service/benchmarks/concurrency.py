@@ -0,0 +1,100 @@
+"""
+Пропускная способность при параллельных запросах: общая сессия против сессии на запрос
+
+Режим shared повторяет старый контейнер: один репозиторий на одной
+AsyncSession, которую параллельные запросы вынуждены занимать по очереди.
+Режим per-request берет на каждый запрос свой UnitOfWork из Container. Кэш
+пользователей выключен, чтобы каждый запрос шел в базу.
+
+Запуск из каталога user-service:
+    python -m benchmarks.concurrency [--url postgresql+asyncpg://...] [--requests 5000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import delete
+from app.config import get_settings
+from app.di import Container
+from app.infrastructure.database.models import UserModel
+from app.infrastructure.repositories.user_repository import UserRepository
+from benchmarks.active_users import SEED_TELEGRAM_ID, seed_users
+
+CONCURRENCY = (1, 2, 4, 8, 16, 32, 64)
+
+
+async def _throughput(
+    request: Callable[[int], Awaitable[Any]],
+    telegram_ids: List[int],
+    concurrency: int,
+) -> float:
+    """Запросов в секунду при concurrency одновременных клиентах"""
+    queue = iter(telegram_ids)
+
+    async def client() -> None:
+        for telegram_id in queue:
+            await request(telegram_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return len(telegram_ids) / (time.perf_counter() - started)
+
+
+async def run(url: Optional[str], rows: int, requests: int, pool_size: int) -> Dict[str, Any]:
+    settings = get_settings().model_copy(
+        update={"user_cache_enabled": False, "db_pool_size": pool_size, "db_max_overflow": 0}
+    )
+    container = Container(settings, url=url)
+    sessions = container._session_factory
+    seeded = await seed_users(sessions, rows)
+    rng = random.Random(0)
+
+    results: Dict[str, Any] = {"rows": rows, "pool_size": pool_size, "shared": {}, "per_request": {}}
+    try:
+        async with container.session() as shared_session:
+            shared_repository = UserRepository(shared_session)
+            lock = asyncio.Lock()
+
+            async def shared(telegram_id: int) -> None:
+                async with lock:
+                    await shared_repository.get_by_telegram_id(telegram_id)
+
+            async def per_request(telegram_id: int) -> None:
+                async with container.unit_of_work() as uow:
+                    await uow.users.get_by_telegram_id(telegram_id)
+
+            # Прогрев пула и кэша подготовленных выражений
+            await _throughput(per_request, [SEED_TELEGRAM_ID] * pool_size * 4, pool_size)
+            for concurrency in CONCURRENCY:
+                ids = [SEED_TELEGRAM_ID + rng.randrange(rows) for _ in range(requests)]
+                results["shared"][concurrency] = await _throughput(shared, ids, concurrency)
+                results["per_request"][concurrency] = await _throughput(per_request, ids, concurrency)
+    finally:
+        if seeded:
+            async with container.session() as session:
+                await session.execute(delete(UserModel).where(UserModel.telegram_id >= SEED_TELEGRAM_ID))
+                await session.commit()
+        await container.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="URL базы (по умолчанию из настроек сервиса)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=5_000, help="запросов на каждый уровень")
+    parser.add_argument("--pool-size", type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.url, args.rows, args.requests, args.pool_size))
+    print(f"{results['rows']} users, pool size {results['pool_size']}")
+    print(f"{'clients':>8}{'shared rps':>14}{'per-request rps':>18}{'speedup':>10}")
+    for concurrency in CONCURRENCY:
+        shared = results["shared"][concurrency]
+        per_request = results["per_request"][concurrency]
+        print(f"{concurrency:>8}{shared:>14.0f}{per_request:>18.0f}{per_request / shared:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Репозиторий пользователей в памяти для тестов
+"""
+
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from app.domain.interfaces import IUserRepository
+from app.domain.models import User
+from app.infrastructure.repositories.user_repository import FLAG_FIELDS, PROFILE_FIELDS
+
+
+class InMemoryUserRepository(IUserRepository):
+    """Пользователи в словаре; считает обращения к get_by_telegram_ids"""
+
+    def __init__(self, users: Iterable[User] = ()):
+        self.users: Dict[int, User] = {}
+        self.batches: List[List[int]] = []
+        self.write_delay = 0.0
+        for user in users:
+            self._store(user)
+
+    def _store(self, user: User) -> User:
+        stored = user.model_copy()
+        if stored.id is None:
+            stored.id = len(self.users) + 1
+        self.users[stored.tg_id] = stored
+        return stored.model_copy()
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        for user in self.users.values():
+            if user.id == user_id:
+                return user.model_copy()
+        return None
+
+    async def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
+        return (await self.get_by_telegram_ids([telegram_id])).get(telegram_id)
+
+    async def get_by_telegram_ids(self, telegram_ids: Iterable[int]) -> Dict[int, User]:
+        ids = list(telegram_ids)
+        self.batches.append(ids)
+        await asyncio.sleep(0)
+        return {
+            telegram_id: self.users[telegram_id].model_copy()
+            for telegram_id in ids
+            if telegram_id in self.users
+        }
+
+    async def get_active_users(self, limit: int = 100, offset: int = 0) -> List[User]:
+        active = [user for user in self.users.values() if not user.is_banned]
+        return active[offset:offset + limit]
+
+    async def get_active_users_after(self, after_id: int = 0, limit: int = 100) -> List[User]:
+        active = sorted(
+            (user for user in self.users.values() if not user.is_banned and user.id > after_id),
+            key=lambda user: user.id,
+        )
+        return active[:limit]
+
+    async def iter_active_users(
+        self, chunk_size: int = 1000, after_id: int = 0
+    ) -> AsyncIterator[List[User]]:
+        while chunk := await self.get_active_users_after(after_id, chunk_size):
+            yield chunk
+            after_id = chunk[-1].id
+
+    async def create(self, user: User) -> User:
+        return self._store(user)
+
+    async def get_or_create(self, user: User) -> Tuple[User, bool]:
+        # Как ON CONFLICT DO UPDATE: существующему обновляется только профиль
+        if user.tg_id not in self.users:
+            return self._store(user), True
+        stored = self.users[user.tg_id]
+        self.users[user.tg_id] = stored.model_copy(update=user.model_dump(include=set(PROFILE_FIELDS)))
+        return self.users[user.tg_id].model_copy(), False
+
+    async def update(self, user: User) -> Optional[User]:
+        if user.tg_id not in self.users:
+            return None
+        await asyncio.sleep(self.write_delay)
+        return self._store(user)
+
+    async def create_many(
+        self, users: Iterable[User], batch_size: int = 1000, use_copy: bool = False
+    ) -> int:
+        return len([self._store(user) for user in users])
+
+    async def upsert_many(
+        self, users: Iterable[User], batch_size: int = 1000, update_flags: bool = False
+    ) -> int:
+        names = (*PROFILE_FIELDS, *FLAG_FIELDS) if update_flags else PROFILE_FIELDS
+        count = 0
+        for user in users:
+            if user.tg_id in self.users:
+                self._merge(user, names)
+            else:
+                self._store(user)
+            count += 1
+        return count
+
+    async def update_many(self, users: Iterable[User], batch_size: int = 1000) -> int:
+        count = 0
+        for user in users:
+            if user.tg_id in self.users:
+                self._merge(user, User.model_fields)
+                count += 1
+        return count
+
+    def _merge(self, user: User, names: Iterable[str]) -> None:
+        """Записать поверх сохраненного только явно заданные поля из names"""
+        fields = user.model_fields_set.intersection(names) - {"id", "tg_id"}
+        stored = self.users[user.tg_id]
+        self.users[user.tg_id] = stored.model_copy(update=user.model_dump(include=fields))
+
+    def _model_to_domain(self, model) -> User:
+        return model
+
+    def _domain_to_model(self, domain: User):
+        return domain
+
+
+def make_user(telegram_id: int, **fields) -> User:
+    """Пользователь с заполненными обязательными полями"""
+    values = {
+        "tg_id": telegram_id,
+        "username": f"user{telegram_id}",
+        "first_name": "Test",
+        "last_name": None,
+        "language_code": "ru",
+    }
+    values.update(fields)
+    return User(**values)
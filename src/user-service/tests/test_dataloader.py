@@ -0,0 +1,110 @@
+"""
+Тесты DataLoader и BatchingUserRepository
+"""
+
+import asyncio
+import gc
+import unittest
+from app.infrastructure.repositories.batching_repository import BatchingUserRepository
+from app.infrastructure.repositories.dataloader import DataLoader
+from tests.fakes import InMemoryUserRepository, make_user
+
+
+class DataLoaderTest(unittest.IsolatedAsyncioTestCase):
+    async def test_loads_of_one_tick_become_one_batch(self):
+        calls = []
+
+        async def batch_load(keys):
+            calls.append(keys)
+            return {key: key * 10 for key in keys if key != 3}
+
+        loader = DataLoader(batch_load)
+        values = await asyncio.gather(*(loader.load(key) for key in (1, 2, 3, 1)))
+
+        self.assertEqual(values, [10, 20, None, 10])
+        self.assertEqual(calls, [[1, 2, 3]])
+        self.assertEqual(loader.batches, 1)
+
+    async def test_batches_are_split_by_max_batch_size(self):
+        calls = []
+
+        async def batch_load(keys):
+            calls.append(keys)
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load, max_batch_size=2)
+        self.assertEqual(await loader.load_many([1, 2, 3]), [1, 2, 3])
+        self.assertEqual(calls, [[1, 2], [3]])
+
+    async def test_cached_keys_are_not_loaded_again(self):
+        calls = []
+
+        async def batch_load(keys):
+            calls.append(keys)
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        await loader.load(1)
+        await loader.load_many([1, 2])
+        self.assertEqual(calls, [[1], [2]])
+
+    async def test_errors_are_not_cached(self):
+        attempts = []
+
+        async def batch_load(keys):
+            attempts.append(keys)
+            if len(attempts) == 1:
+                raise RuntimeError("database is down")
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        with self.assertRaises(RuntimeError):
+            await loader.load(1)
+        self.assertEqual(await loader.load(1), 1)
+
+    async def test_batch_survives_garbage_collection(self):
+        release = asyncio.Event()
+
+        async def batch_load(keys):
+            await release.wait()
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        pending = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        gc.collect()
+        release.set()
+        self.assertEqual(await asyncio.wait_for(pending, 1), 1)
+
+
+class BatchingUserRepositoryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_lookups_of_one_tick_are_one_query(self):
+        inner = InMemoryUserRepository([make_user(1), make_user(2)])
+        repository = BatchingUserRepository(inner)
+
+        users = await asyncio.gather(
+            repository.get_by_telegram_id(1),
+            repository.get_by_telegram_id(2),
+            repository.get_by_telegram_id(3),
+        )
+
+        self.assertEqual([user and user.tg_id for user in users], [1, 2, None])
+        self.assertEqual(inner.batches, [[1, 2, 3]])
+
+    async def test_load_during_update_does_not_keep_old_row(self):
+        inner = InMemoryUserRepository([make_user(1)])
+        inner.write_delay = 0.01
+        repository = BatchingUserRepository(inner)
+
+        update = asyncio.ensure_future(repository.update(make_user(1, is_banned=True)))
+        await asyncio.sleep(0)
+        during = await repository.get_by_telegram_id(1)
+        await update
+
+        self.assertFalse(during.is_banned)
+        self.assertTrue((await repository.get_by_telegram_id(1)).is_banned)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Тесты импорта пользователей из CSV и JSONL
+"""
+
+import io
+import unittest
+from sqlalchemy.dialects import postgresql
+from app.import_users import import_users, parse_user, read_users
+from app.infrastructure.repositories.user_repository import (
+    _BULK_COLUMNS,
+    UserRepository,
+    _by_fields,
+)
+from tests.fakes import InMemoryUserRepository, make_user
+
+
+class RecordingSession:
+    """Сессия, которая запоминает выполненные выражения в SQL PostgreSQL"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+
+class FakeUnitOfWork:
+    def __init__(self, users):
+        self.users = users
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def commit(self):
+        pass
+
+
+class FakeContainer:
+    def __init__(self, users):
+        self.users = users
+
+    def unit_of_work(self):
+        return FakeUnitOfWork(self.users)
+
+
+class ParseUserTest(unittest.TestCase):
+    def test_only_fields_of_record_are_set(self):
+        user = parse_user({"telegram_id": "7", "username": " new "})
+
+        self.assertEqual(user.tg_id, 7)
+        self.assertEqual(user.username, "new")
+        self.assertEqual(user.model_fields_set, {"tg_id", "username"})
+        self.assertFalse(user.is_banned)
+
+    def test_flags_are_set_when_present(self):
+        user = parse_user({"tg_id": 7, "is_banned": "yes", "is_admin": ""})
+
+        self.assertTrue(user.is_banned)
+        self.assertFalse(user.is_admin)
+        self.assertEqual(user.model_fields_set, {"tg_id", "is_banned", "is_admin"})
+
+    def test_telegram_id_is_required(self):
+        with self.assertRaises(ValueError):
+            parse_user({"username": "new"})
+
+
+class ReadUsersTest(unittest.TestCase):
+    def test_bad_jsonl_lines_are_skipped(self):
+        file = io.StringIO('{"telegram_id": 1}\n{broken\n[1, 2]\n\n{"telegram_id": 2}\n')
+        errors = io.StringIO()
+
+        users = list(read_users(file, "jsonl", errors))
+
+        self.assertEqual([user.tg_id for user in users], [1, 2])
+        lines = errors.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("record 2: skipped:"))
+        self.assertIn("expected an object, got list", lines[1])
+
+    def test_csv_rows_without_telegram_id_are_skipped(self):
+        file = io.StringIO("telegram_id,username\n1,a\n,b\n")
+        errors = io.StringIO()
+
+        users = list(read_users(file, "csv", errors))
+
+        self.assertEqual([user.tg_id for user in users], [1])
+        self.assertIn("record 2: skipped: telegram_id is required", errors.getvalue())
+
+
+class PartialWriteTest(unittest.TestCase):
+    def test_users_are_grouped_by_present_fields(self):
+        users = [
+            parse_user({"telegram_id": 1, "username": "a"}),
+            parse_user({"telegram_id": 2, "is_banned": "1"}),
+            parse_user({"telegram_id": 3, "username": "c"}),
+        ]
+
+        groups = _by_fields(users, _BULK_COLUMNS[1:])
+
+        self.assertEqual(
+            {fields: [user.tg_id for user in group] for fields, group in groups.items()},
+            {("username",): [1, 3], ("is_banned",): [2]},
+        )
+
+    def test_upsert_sets_only_present_profile_fields(self):
+        sql = str(UserRepository._upsert_statement(("username",)).compile(dialect=postgresql.dialect()))
+
+        self.assertIn("SET username = excluded.username, updated_at = excluded.updated_at", sql)
+        self.assertNotIn("first_name = excluded", sql)
+
+    def test_upsert_without_profile_fields_keeps_existing_rows(self):
+        sql = str(UserRepository._upsert_statement(()).compile(dialect=postgresql.dialect()))
+
+        self.assertIn("ON CONFLICT (telegram_id) DO NOTHING", sql)
+
+
+class UpsertFlagsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_upsert_updates_flags_only_when_asked(self):
+        users = [parse_user({"telegram_id": 1, "username": "a", "is_banned": "true"})]
+        session = RecordingSession()
+
+        await UserRepository(session).upsert_many(users)
+        await UserRepository(session).upsert_many(users, update_flags=True)
+
+        kept, updated = session.statements
+        self.assertNotIn("is_banned = excluded.is_banned", kept)
+        self.assertIn("username = excluded.username", kept)
+        self.assertIn("is_banned = excluded.is_banned", updated)
+        self.assertNotIn("is_admin = excluded", updated)
+
+
+class ImportUsersTest(unittest.IsolatedAsyncioTestCase):
+    async def test_upsert_applies_ban_with_update_flags(self):
+        repository = InMemoryUserRepository([make_user(1, username="old")])
+        file = io.StringIO('{"telegram_id": 1, "is_banned": true}\n')
+
+        await import_users(FakeContainer(repository), file, "jsonl", progress=None, update_flags=True)
+
+        self.assertTrue(repository.users[1].is_banned)
+        self.assertEqual(repository.users[1].username, "old")
+
+    async def test_upsert_warns_about_ignored_flags(self):
+        repository = InMemoryUserRepository([make_user(1)])
+        file = io.StringIO('{"telegram_id": 1, "is_banned": true}\n{"telegram_id": 2, "is_admin": true}\n')
+        errors = io.StringIO()
+
+        await import_users(FakeContainer(repository), file, "jsonl", progress=None, errors=errors)
+
+        self.assertFalse(repository.users[1].is_banned)
+        self.assertTrue(repository.users[2].is_admin)
+        self.assertEqual(errors.getvalue().count("--update-flags"), 1)
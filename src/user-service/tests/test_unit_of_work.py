@@ -0,0 +1,71 @@
+"""
+Тесты UnitOfWork: транзакция и кэш пользователей на SQLite в файле
+"""
+
+import tempfile
+import unittest
+from sqlalchemy import insert, select
+from sqlalchemy.pool import NullPool
+from app.di import Container
+from app.infrastructure.cache.shared import FakeSharedCache
+from app.infrastructure.database.base import Base
+from app.infrastructure.database.models import UserModel
+from tests.fakes import make_user
+from tests.test_user_cache import test_settings
+
+
+class UnitOfWorkTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.container = Container(
+            test_settings(database_url=f"sqlite+aiosqlite:///{directory.name}/users.db"),
+            shared_cache=FakeSharedCache(),
+            poolclass=NullPool,
+        )
+        # BIGINT ключ на SQLite не автоинкрементный, строка вставляется с id
+        async with self.container._engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(
+                insert(UserModel).values(id=1, telegram_id=1, first_name="Test")
+            )
+
+    async def asyncTearDown(self):
+        await self.container.dispose()
+
+    async def stored_is_banned(self) -> bool:
+        async with self.container.session() as session:
+            return await session.scalar(select(UserModel.is_banned).where(UserModel.id == 1))
+
+    async def test_clean_exit_commits_and_updates_cache(self):
+        async with self.container.unit_of_work() as uow:
+            await uow.users.get_by_telegram_id(1)
+            await uow.users.update(make_user(1, id=1, is_banned=True))
+
+        self.assertTrue(await self.stored_is_banned())
+        cached = await self.container.user_cache.get_many([1])
+        self.assertTrue(cached[1].is_banned)
+
+    async def test_exception_rolls_back_and_keeps_cache(self):
+        async with self.container.unit_of_work() as uow:
+            await uow.users.get_by_telegram_id(1)
+        with self.assertRaises(RuntimeError):
+            async with self.container.unit_of_work() as uow:
+                updated = await uow.users.update(make_user(1, id=1, is_banned=True))
+                self.assertTrue(updated.is_banned)
+                raise RuntimeError
+
+        self.assertFalse(await self.stored_is_banned())
+        cached = await self.container.user_cache.get_many([1])
+        self.assertFalse(cached[1].is_banned)
+
+    async def test_uncommitted_write_is_read_past_cache(self):
+        async with self.container.unit_of_work() as uow:
+            await uow.users.get_by_telegram_id(1)
+            await uow.users.update(make_user(1, id=1, is_banned=True))
+            uow.users.loader.clear()
+            self.assertTrue((await uow.users.get_by_telegram_id(1)).is_banned)
+            await uow.rollback()
+            self.assertFalse((await uow.users.get_by_telegram_id(1)).is_banned)
+
+        self.assertFalse(await self.stored_is_banned())
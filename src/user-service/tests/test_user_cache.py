@@ -0,0 +1,236 @@
+"""
+Тесты кэша пользователей с общим кэшем FakeSharedCache
+"""
+
+import asyncio
+import unittest
+from sqlalchemy.pool import NullPool
+from app.config import Settings
+from app.di import Container
+from app.infrastructure.cache.shared import FakeSharedCache
+from app.infrastructure.cache.user_cache import CachedUserRepository, UserCache
+from tests.fakes import InMemoryUserRepository, make_user
+
+
+class Clock:
+    """Ручные часы для проверки сроков жизни"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_settings(**overrides) -> Settings:
+    values = {
+        "db_host": "localhost",
+        "db_port": 5432,
+        "db_user": "test",
+        "db_pass": "test",
+        "db_name": "test",
+        "db_driver": "sqlite+aiosqlite",
+        "database_url": "sqlite+aiosqlite://",
+    }
+    values.update(overrides)
+    return Settings(_env_file=None, **values)
+
+
+async def wait_for_invalidation(cache: UserCache, telegram_id: int, generation: int) -> None:
+    """Дождаться, пока listen() применит инвалидацию ключа"""
+    for _ in range(100):
+        if cache.generation(telegram_id) > generation:
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("invalidation was not delivered")
+
+
+class FakeSharedCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def test_values_expire(self):
+        clock = Clock()
+        shared = FakeSharedCache(clock)
+        await shared.set_many({"a": b"1"}, ttl=5)
+        self.assertEqual(await shared.get_many(["a", "b"]), {"a": b"1"})
+        clock.now += 5
+        self.assertEqual(await shared.get_many(["a"]), {})
+
+    async def test_only_if_missing_keeps_existing_value(self):
+        shared = FakeSharedCache()
+        await shared.set_many({"a": b"new"}, ttl=5)
+        await shared.set_many({"a": b"old", "b": b"2"}, ttl=5, only_if_missing=True)
+        self.assertEqual(await shared.get_many(["a", "b"]), {"a": b"new", "b": b"2"})
+
+    async def test_invalidations_reach_every_subscriber(self):
+        shared = FakeSharedCache()
+        first = shared.invalidations()
+        second = shared.invalidations()
+        receive = [asyncio.ensure_future(anext(first)), asyncio.ensure_future(anext(second))]
+        await asyncio.sleep(0)
+        await shared.publish_invalidation(["user:tg:1"])
+        self.assertEqual(await asyncio.gather(*receive), [["user:tg:1"], ["user:tg:1"]])
+        await first.aclose()
+        await second.aclose()
+
+
+class CachedUserRepositoryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_reads_go_to_database_once(self):
+        database = InMemoryUserRepository([make_user(1)])
+        cache = UserCache(shared=FakeSharedCache())
+        repository = CachedUserRepository(database, cache)
+
+        self.assertEqual((await repository.get_by_telegram_id(1)).tg_id, 1)
+        self.assertIsNone(await repository.get_by_telegram_id(2))
+        self.assertEqual((await repository.get_by_telegram_id(1)).tg_id, 1)
+        self.assertIsNone(await repository.get_by_telegram_id(2))
+
+        self.assertEqual(database.batches, [[1], [2]])
+        self.assertEqual(cache.stats.local_hits, 2)
+        self.assertEqual(cache.stats.negative_hits, 1)
+
+    async def test_other_instance_reads_shared_cache(self):
+        shared = FakeSharedCache()
+        database = InMemoryUserRepository([make_user(1)])
+        await CachedUserRepository(database, UserCache(shared=shared)).get_by_telegram_id(1)
+
+        other = UserCache(shared=shared)
+        self.assertEqual((await CachedUserRepository(database, other).get_by_telegram_id(1)).tg_id, 1)
+        self.assertEqual(len(database.batches), 1)
+        self.assertEqual(other.stats.shared_hits, 1)
+
+    async def test_update_writes_through(self):
+        database = InMemoryUserRepository([make_user(1)])
+        repository = CachedUserRepository(database, UserCache(shared=FakeSharedCache()))
+        await repository.get_by_telegram_id(1)
+
+        await repository.update(make_user(1, is_banned=True))
+        # до коммита свое изменение читается из базы, а не из кэша
+        self.assertTrue((await repository.get_by_telegram_id(1)).is_banned)
+        self.assertEqual(len(database.batches), 2)
+
+        await repository.on_commit()
+        self.assertTrue((await repository.get_by_telegram_id(1)).is_banned)
+        self.assertEqual(len(database.batches), 2)
+
+    async def test_rolled_back_update_does_not_reach_cache(self):
+        database = InMemoryUserRepository([make_user(1)])
+        cache = UserCache(shared=FakeSharedCache())
+        repository = CachedUserRepository(database, cache)
+        await repository.get_by_telegram_id(1)
+
+        await repository.update(make_user(1, is_banned=True))
+        repository.on_rollback()
+        await repository.on_commit()
+
+        self.assertFalse((await cache.get_many([1]))[1].is_banned)
+        self.assertEqual(cache.stats.invalidations, 0)
+
+    async def test_create_replaces_negative_entry(self):
+        database = InMemoryUserRepository()
+        repository = CachedUserRepository(database, UserCache(shared=FakeSharedCache()))
+        self.assertIsNone(await repository.get_by_telegram_id(1))
+
+        await repository.create(make_user(1))
+        await repository.on_commit()
+
+        self.assertEqual((await repository.get_by_telegram_id(1)).tg_id, 1)
+
+    async def test_bulk_update_invalidates_cached_users(self):
+        database = InMemoryUserRepository([make_user(1), make_user(2)])
+        repository = CachedUserRepository(database, UserCache(shared=FakeSharedCache()))
+        await repository.get_by_telegram_ids([1, 2])
+
+        await repository.update_many([make_user(1, is_admin=True), make_user(2, is_admin=True)])
+        await repository.on_commit()
+
+        users = await repository.get_by_telegram_ids([1, 2])
+        self.assertTrue(all(user.is_admin for user in users.values()))
+        self.assertEqual(len(database.batches), 2)
+
+
+class InvalidationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_ban_drops_local_copy_in_other_instance(self):
+        shared = FakeSharedCache()
+        database = InMemoryUserRepository([make_user(1)])
+        cache_a = UserCache(shared=shared)
+        cache_b = UserCache(shared=shared)
+        listener = asyncio.ensure_future(cache_b.listen())
+        await asyncio.sleep(0)
+        try:
+            repository_b = CachedUserRepository(database, cache_b)
+            self.assertFalse((await repository_b.get_by_telegram_id(1)).is_banned)
+            generation = cache_b.generation(1)
+
+            repository_a = CachedUserRepository(database, cache_a)
+            await repository_a.update(make_user(1, is_banned=True))
+            await repository_a.on_commit()
+            await wait_for_invalidation(cache_b, 1, generation)
+
+            self.assertTrue((await repository_b.get_by_telegram_id(1)).is_banned)
+        finally:
+            listener.cancel()
+
+    async def test_container_starts_listener_with_first_unit_of_work(self):
+        shared = FakeSharedCache()
+        container = Container(test_settings(), shared_cache=shared, poolclass=NullPool)
+        try:
+            async with container.unit_of_work():
+                pass
+            await asyncio.sleep(0)
+            cache = container.user_cache
+            await cache.put_many({1: make_user(1)})
+            generation = cache.generation(1)
+
+            await UserCache(shared=shared).invalidate([1])
+            await wait_for_invalidation(cache, 1, generation)
+
+            self.assertEqual(await cache.get_many([1]), {})
+        finally:
+            await container.dispose()
+
+    async def test_lifespan_starts_and_stops_listener(self):
+        container = Container(test_settings(), shared_cache=FakeSharedCache(), poolclass=NullPool)
+        async with container.lifespan():
+            self.assertIsNotNone(container._cache_listener)
+            self.assertFalse(container._cache_listener.done())
+        self.assertIsNone(container._cache_listener)
+
+
+class SharedFillRaceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_late_read_fill_does_not_overwrite_ban(self):
+        shared = FakeSharedCache()
+        database = InMemoryUserRepository([make_user(1)])
+        cache_a = UserCache(shared=shared)
+        cache_b = UserCache(shared=shared)
+
+        # Экземпляр B прочитал строку из базы до бана...
+        stale = await database.get_by_telegram_ids([1])
+        generations = {1: cache_b.generation(1)}
+        # ...экземпляр A забанил пользователя...
+        banned = await database.update(make_user(1, is_banned=True))
+        await cache_a.write_through(banned)
+        # ...и только потом B записывает прочитанное в кэш
+        await cache_b.put_many({1: stale[1]}, generations)
+
+        cache_c = UserCache(shared=shared)
+        self.assertTrue((await cache_c.get_many([1]))[1].is_banned)
+
+    async def test_read_fill_after_invalidation_is_not_shared(self):
+        shared = FakeSharedCache()
+        database = InMemoryUserRepository([make_user(1)])
+        cache_a = UserCache(shared=shared)
+        cache_b = UserCache(shared=shared)
+
+        stale = await database.get_by_telegram_ids([1])
+        generations = {1: cache_b.generation(1)}
+        await database.update(make_user(1, is_banned=True))
+        await cache_a.invalidate([1])
+        await cache_b.put_many({1: stale[1]}, generations)
+
+        cache_c = UserCache(shared=shared)
+        self.assertEqual(await cache_c.get_many([1]), {})
+        repository = CachedUserRepository(database, cache_c)
+        self.assertTrue((await repository.get_by_telegram_id(1)).is_banned)
+
+
+if __name__ == "__main__":
+    unittest.main()
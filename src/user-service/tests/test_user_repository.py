@@ -0,0 +1,147 @@
+"""
+Тесты UserRepository и регистрации: keyset-пагинация на SQLite, get_or_create
+на PostgreSQL (если задан USER_SERVICE_TEST_DATABASE_URL) и UserService
+"""
+
+import os
+import tempfile
+import unittest
+from sqlalchemy import insert, text, update
+from sqlalchemy.pool import NullPool
+from app.di import Container
+from app.domain.services.user_service import UserService
+from app.infrastructure.database.base import Base
+from app.infrastructure.database.models import UserModel
+from app.infrastructure.repositories.user_repository import UserRepository
+from tests.fakes import InMemoryUserRepository, make_user
+from tests.test_user_cache import test_settings
+
+# PostgreSQL для тестов get_or_create (sql с xmax): postgresql+asyncpg://...
+POSTGRES_URL = os.environ.get("USER_SERVICE_TEST_DATABASE_URL")
+
+
+class ActiveUsersPaginationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.container = Container(
+            test_settings(database_url=f"sqlite+aiosqlite:///{directory.name}/users.db"),
+            poolclass=NullPool,
+        )
+        # BIGINT ключ на SQLite не автоинкрементный, строки вставляются с id
+        async with self.container._engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(insert(UserModel), [
+                {"id": user_id, "telegram_id": user_id, "first_name": "Test", "is_banned": user_id % 4 == 0}
+                for user_id in range(1, 11)
+            ])
+
+    async def asyncTearDown(self):
+        await self.container.dispose()
+
+    async def execute(self, statement) -> None:
+        async with self.container.session() as session:
+            await session.execute(statement)
+            await session.commit()
+
+    async def test_pages_survive_bans_and_inserts(self):
+        seen = []
+        after_id = 0
+        async with self.container.session() as session:
+            repository = UserRepository(session)
+            page = await repository.get_active_users_after(after_id, limit=3)
+            while page:
+                seen.extend(user.id for user in page)
+                after_id = page[-1].id
+                if after_id == 3:
+                    # Между страницами: бан уже прочитанного и еще не прочитанного,
+                    # новый пользователь в конце
+                    await self.execute(
+                        update(UserModel).where(UserModel.id.in_([2, 6])).values(is_banned=True)
+                    )
+                    await self.execute(insert(UserModel).values(id=11, telegram_id=11, first_name="New"))
+                await session.commit()
+                page = await repository.get_active_users_after(after_id, limit=3)
+
+        self.assertEqual(seen, [1, 2, 3, 5, 7, 9, 10, 11])
+
+    async def test_stream_resumes_after_id(self):
+        async with self.container.session() as session:
+            repository = UserRepository(session)
+            chunks = [
+                [user.id for user in chunk]
+                async for chunk in repository.iter_active_users(chunk_size=2, after_id=3)
+            ]
+
+        self.assertEqual(chunks, [[5, 6], [7, 9], [10]])
+
+
+@unittest.skipUnless(POSTGRES_URL, "USER_SERVICE_TEST_DATABASE_URL is not set")
+class GetOrCreateTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.container = Container(
+            test_settings(database_url=POSTGRES_URL, user_cache_enabled=False), poolclass=NullPool
+        )
+        async with self.container._engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(text("TRUNCATE users RESTART IDENTITY"))
+
+    async def asyncTearDown(self):
+        await self.container.dispose()
+
+    async def test_second_call_returns_existing_user(self):
+        async with self.container.unit_of_work() as uow:
+            created, is_new = await uow.users.get_or_create(make_user(1))
+        async with self.container.unit_of_work() as uow:
+            existing, again = await uow.users.get_or_create(make_user(1))
+
+        self.assertEqual((is_new, again), (True, False))
+        self.assertEqual(existing.id, created.id)
+
+    async def test_profile_is_refreshed_and_flags_are_kept(self):
+        async with self.container.unit_of_work() as uow:
+            user, _ = await uow.users.get_or_create(make_user(1, username="old"))
+            user.is_banned = True
+            user.is_admin = True
+            await uow.users.update(user)
+
+        async with self.container.user_service() as service:
+            registered = await service.register_user(1, "new", "Renamed", None, "en")
+
+        self.assertEqual(registered.id, user.id)
+        self.assertEqual(
+            (registered.username, registered.first_name, registered.language_code),
+            ("new", "Renamed", "en"),
+        )
+        self.assertTrue(registered.is_banned)
+        self.assertTrue(registered.is_admin)
+
+    async def test_register_creates_user(self):
+        async with self.container.user_service() as service:
+            registered = await service.register_user(2, None, "Test", None, None)
+
+        async with self.container.unit_of_work() as uow:
+            stored = await uow.users.get_by_telegram_id(2)
+        self.assertEqual(stored.id, registered.id)
+        self.assertFalse(stored.is_banned)
+
+
+class RegisterUserTest(unittest.IsolatedAsyncioTestCase):
+    async def test_new_user_is_created(self):
+        repository = InMemoryUserRepository()
+
+        registered = await UserService(repository).register_user(1, "name", "Test", None, "ru")
+
+        self.assertIsNotNone(registered.id)
+        self.assertEqual(repository.users[1].username, "name")
+
+    async def test_repeated_start_refreshes_profile_and_keeps_ban(self):
+        repository = InMemoryUserRepository([make_user(1, username="old", is_banned=True)])
+        service = UserService(repository)
+
+        registered = await service.register_user(1, "new", "Renamed", None, "en")
+
+        self.assertEqual(registered.id, repository.users[1].id)
+        self.assertEqual((registered.username, registered.first_name), ("new", "Renamed"))
+        self.assertTrue(registered.is_banned)
+        self.assertEqual(len(repository.users), 1)
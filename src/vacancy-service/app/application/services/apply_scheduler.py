@@ -0,0 +1,421 @@
+"""
+Планировщик массовых откликов: дневные лимиты, приоритеты и справедливая очередь
+"""
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from itertools import count
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+from app.domain.interfaces import IApplyJobStore, ISeenVacancyIndex, VacancyMark
+from app.domain.models import ApplyJob
+from app.infrastructure.http.interfaces import IHttpClient
+from app.infrastructure.http.timing import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Лимиты откликов hh.ru считаются по московскому времени
+MSK = timezone(timedelta(hours=3))
+
+HH_DAILY_APPLY_LIMIT = 200
+
+# Время ожидания отклика в очереди: от секунд до суток
+QUEUE_WAIT_BUCKETS = (1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0, 14400.0, 43200.0, 86400.0)
+
+ApplyFunc = Callable[[ApplyJob], Awaitable[None]]
+
+
+class QuotaExceededError(Exception):
+    """hh.ru отклонил отклик: дневной лимит пользователя исчерпан"""
+    pass
+
+
+def _hh_error_values(error: Exception) -> List[str]:
+    """Значения ошибок из ответа hh.ru (`{"errors": [{"value": ...}]}`)"""
+    response = getattr(error, "response", None)
+    if response is None or response.status_code != 403:
+        return []
+    try:
+        errors = response.json().get("errors") or []
+    except ValueError:
+        return []
+    return [str(item.get("value")) for item in errors if isinstance(item, dict)]
+
+
+def negotiation_sender(
+    client: IHttpClient,
+    auth_headers: Callable[[int], Awaitable[Dict[str, str]]],
+    url: str = "/negotiations"
+) -> ApplyFunc:
+    """Отправка отклика через POST /negotiations hh.ru
+
+    `auth_headers` возвращает заголовки авторизации пользователя. Повторный
+    отклик на ту же вакансию (`already_applied`) считается успешным: после
+    перезапуска сервиса прерванные отклики отправляются снова.
+    """
+
+    async def send(job: ApplyJob) -> None:
+        form = {"vacancy_id": job.vacancy_id, "resume_id": job.resume_id}
+        if job.message:
+            form["message"] = job.message
+        headers = dict(await auth_headers(job.user_id))
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            await client.post(url, data=urlencode(form), headers=headers)
+        except Exception as error:
+            values = _hh_error_values(error)
+            if "already_applied" in values:
+                return
+            if "limit_exceeded" in values:
+                raise QuotaExceededError(job.user_id) from error
+            raise
+
+    return send
+
+
+@dataclass
+class _UserQueue:
+    """Очередь откликов пользователя и его место в справедливой очереди"""
+
+    weight: float = 1.0
+    daily_limit: Optional[int] = None
+    jobs: List[Tuple[float, int, ApplyJob]] = field(default_factory=list)  # (-score, seq, job)
+    used: int = 0  # отправлено за день вместе с отправляемыми
+    in_flight: int = 0
+    finish: float = 0.0  # виртуальное время окончания последнего отклика
+    queued: bool = False  # пользователь стоит в очереди готовых
+    exhausted: bool = False  # hh.ru сообщил об исчерпанном лимите
+
+
+@dataclass
+class ApplySchedulerStats:
+    """Счетчики планировщика откликов"""
+
+    submitted: int = 0
+    duplicates: int = 0
+    applied: int = 0
+    failed: int = 0
+    retried: int = 0
+    quota_rejected: int = 0
+    store_errors: int = 0  # записи в хранилище, не удавшиеся после всех попыток
+    worker_errors: int = 0
+    queue_wait: Histogram = field(default_factory=lambda: Histogram(QUEUE_WAIT_BUCKETS))
+    completions: Deque[float] = field(default_factory=deque)  # время отправки для скорости
+
+    def throughput(self, window: float = 60.0, now: Optional[float] = None) -> float:
+        """Отправленных откликов в секунду за последние `window` секунд"""
+        now = time.monotonic() if now is None else now
+        while self.completions and self.completions[0] < now - window:
+            self.completions.popleft()
+        return len(self.completions) / window
+
+
+class ApplyScheduler:
+    """Отправляет отклики пулом из `workers` задач с учетом лимитов и справедливости
+
+    У каждого пользователя своя очередь, упорядоченная по оценке совпадения.
+    Между пользователями работает справедливая очередь с весами (start-time
+    fair queuing): пользователь с весом 2 получает вдвое больше отправок, чем
+    с весом 1, а пользователь с тысячами откликов не задерживает остальных
+    дольше, чем на одну отправку на каждого. Пользователь, исчерпавший
+    дневной лимит (свой или по ответу hh.ru), выходит из очереди до
+    следующих суток по `quota_tz`.
+
+    Отклики сохраняются в `store` до отправки, так что очередь переживает
+    перезапуск. Ошибка отправки повторяется через `retry_delay` секунд, после
+    `max_attempts` попыток отклик отбрасывается. Записи в хранилище после
+    отправки делаются до `store_attempts` раз и не останавливают воркер:
+    если запись не удалась, отклик остается в хранилище и после перезапуска
+    отправляется снова (повтор hh.ru считает `already_applied`).
+    """
+
+    def __init__(
+        self,
+        apply: ApplyFunc,
+        store: IApplyJobStore,
+        workers: int = 4,
+        daily_limit: int = HH_DAILY_APPLY_LIMIT,
+        max_attempts: int = 3,
+        retry_delay: float = 60.0,
+        store_attempts: int = 3,
+        seen_index: Optional[ISeenVacancyIndex] = None,
+        quota_tz: timezone = MSK,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ):
+        self._apply = apply
+        self._store = store
+        self._workers = workers
+        self._daily_limit = daily_limit
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self._store_attempts = store_attempts
+        self._seen_index = seen_index
+        self._quota_tz = quota_tz
+        self._clock = clock
+
+        self._users: Dict[int, _UserQueue] = {}
+        self._ready: List[Tuple[float, int, int]] = []  # (виртуальное время начала, seq, user_id)
+        self._virtual_time = 0.0
+        self._seq = count()
+        self._day: Optional[date] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Dict[int, asyncio.TimerHandle] = {}
+        self._persisting = 0  # записи в хранилище, которые еще выполняются
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self.stats = ApplySchedulerStats()
+
+    def _today(self) -> date:
+        return self._clock().astimezone(self._quota_tz).date()
+
+    def _seconds_until_next_day(self) -> float:
+        now = self._clock().astimezone(self._quota_tz)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), self._quota_tz)
+        return max((midnight - now).total_seconds(), 0.0)
+
+    def _user(self, user_id: int) -> _UserQueue:
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = _UserQueue()
+        return user
+
+    def set_user(self, user_id: int, weight: float = 1.0, daily_limit: Optional[int] = None) -> None:
+        """Вес пользователя в справедливой очереди и его дневной лимит"""
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        user = self._user(user_id)
+        user.weight = weight
+        user.daily_limit = daily_limit
+        self._activate(user_id, user)
+
+    def _has_quota(self, user: _UserQueue) -> bool:
+        limit = self._daily_limit if user.daily_limit is None else user.daily_limit
+        return not user.exhausted and user.used < limit
+
+    def _activate(self, user_id: int, user: _UserQueue) -> None:
+        """Поставить пользователя в очередь готовых, если ему есть что отправить"""
+        if user.queued or not user.jobs or not self._has_quota(user):
+            return
+        start = max(self._virtual_time, user.finish)
+        heapq.heappush(self._ready, (start, next(self._seq), user_id))
+        user.queued = True
+        self._idle.clear()
+        self._wakeup.set()
+
+    def _enqueue(self, job: ApplyJob) -> None:
+        user = self._user(job.user_id)
+        heapq.heappush(user.jobs, (-job.score, next(self._seq), job))
+        self._activate(job.user_id, user)
+
+    def _roll_day(self) -> None:
+        """Сбросить дневные лимиты с началом новых суток"""
+        today = self._today()
+        if today == self._day:
+            return
+        self._day = today
+        for user_id, user in self._users.items():
+            user.used = user.in_flight
+            user.exhausted = False
+            self._activate(user_id, user)
+
+    def _pop(self) -> Optional[ApplyJob]:
+        """Следующий отклик: пользователь с наименьшим виртуальным временем"""
+        while self._ready:
+            start, _, user_id = heapq.heappop(self._ready)
+            user = self._users[user_id]
+            user.queued = False
+            if not user.jobs or not self._has_quota(user):
+                continue
+            _, _, job = heapq.heappop(user.jobs)
+            self._virtual_time = start
+            user.finish = start + 1.0 / user.weight
+            user.used += 1
+            user.in_flight += 1
+            self._activate(user_id, user)
+            return job
+        return None
+
+    def _check_idle(self) -> None:
+        if not self._ready and not self._retries and not self._persisting and not any(
+            user.in_flight for user in self._users.values()
+        ):
+            self._idle.set()
+
+    async def _next_job(self) -> ApplyJob:
+        while True:
+            self._roll_day()
+            job = self._pop()
+            if job is not None:
+                return job
+            self._check_idle()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._seconds_until_next_day() + 1)
+            except asyncio.TimeoutError:
+                pass
+
+    def _retry_later(self, job: ApplyJob) -> None:
+        def requeue() -> None:
+            del self._retries[job.job_id]
+            self._enqueue(job)
+
+        self._retries[job.job_id] = asyncio.get_running_loop().call_later(self._retry_delay, requeue)
+
+    async def _run(self, job: ApplyJob) -> None:
+        user = self._users[job.user_id]
+        waited = (self._clock() - job.created_at).total_seconds()
+        self.stats.queue_wait.observe(max(waited, 0.0))
+        try:
+            await self._apply(job)
+        except QuotaExceededError:
+            # Лимит по hh.ru исчерпан раньше нашего счетчика: отклик ждет следующих суток
+            user.in_flight -= 1
+            user.exhausted = True
+            self.stats.quota_rejected += 1
+            self._enqueue(job)
+            return
+        except Exception:
+            user.in_flight -= 1
+            user.used -= 1
+            job.attempts += 1
+            if job.attempts >= self._max_attempts:
+                self.stats.failed += 1
+                self._activate(job.user_id, user)
+                await self._persist("remove", job, lambda: self._store.remove(job))
+            else:
+                self.stats.retried += 1
+                self._retry_later(job)
+                self._activate(job.user_id, user)
+                await self._persist("update", job, lambda: self._store.update(job))
+            return
+
+        user.in_flight -= 1
+        self.stats.applied += 1
+        self.stats.completions.append(time.monotonic())
+        day = self._day or self._today()
+        await self._persist("complete", job, lambda: self._store.complete(job, day))
+        if self._seen_index is not None:
+            await self._persist("mark applied", job, lambda: self._seen_index.mark(
+                job.user_id, [job.vacancy_id], VacancyMark.APPLIED
+            ))
+
+    async def _persist(self, action: str, job: ApplyJob, call: Callable[[], Awaitable[Any]]) -> None:
+        """Записать состояние отклика, повторяя при ошибке; ошибка не пробрасывается"""
+        self._persisting += 1
+        try:
+            for attempt in range(self._store_attempts):
+                try:
+                    await call()
+                    return
+                except Exception:
+                    if attempt + 1 >= self._store_attempts:
+                        self.stats.store_errors += 1
+                        logger.exception("Apply job %s: %s failed", job.job_id, action)
+                        return
+                await asyncio.sleep(0.1 * 2 ** attempt)
+        finally:
+            self._persisting -= 1
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await self._next_job()
+                try:
+                    await self._run(job)
+                finally:
+                    self._check_idle()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Воркер не должен пропадать из пула из-за ошибки одного отклика
+                self.stats.worker_errors += 1
+                logger.exception("Apply worker error")
+
+    async def start(self) -> None:
+        """Загрузить очередь и использованные лимиты из хранилища и запустить пул"""
+        if self._tasks:
+            return
+        self._day = self._today()
+        for user_id, used in (await self._store.used_quota(self._day)).items():
+            self._user(user_id).used = used
+        for job in await self._store.pending():
+            self._enqueue(job)
+        self._check_idle()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def submit(self, jobs: Iterable[ApplyJob]) -> List[ApplyJob]:
+        """Поставить отклики в очередь (стоящие в очереди и отправленные пропускаются)"""
+        jobs = list(jobs)
+        accepted = await self._store.add(jobs)
+        self.stats.submitted += len(accepted)
+        self.stats.duplicates += len(jobs) - len(accepted)
+        # До запуска отклики попадут в очередь из хранилища в start
+        if self._tasks:
+            for job in accepted:
+                self._enqueue(job)
+        return accepted
+
+    async def join(self) -> None:
+        """Дождаться, пока не останется откликов, которые можно отправить сегодня"""
+        await self._idle.wait()
+
+    async def stop(self) -> None:
+        """Остановить пул; неотправленные отклики остаются в хранилище"""
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def backlog(self) -> Dict[int, int]:
+        """Число ожидающих откликов по пользователям"""
+        return {user_id: len(user.jobs) for user_id, user in self._users.items() if user.jobs}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Счетчики, очередь и скорость отправки"""
+        stats = self.stats
+        users = self._users.values()
+        return {
+            "submitted": stats.submitted,
+            "duplicates": stats.duplicates,
+            "applied": stats.applied,
+            "failed": stats.failed,
+            "retried": stats.retried,
+            "quota_rejected": stats.quota_rejected,
+            "store_errors": stats.store_errors,
+            "worker_errors": stats.worker_errors,
+            "backlog": sum(len(user.jobs) for user in users),
+            "in_flight": sum(user.in_flight for user in users),
+            "retry_pending": len(self._retries),
+            "users_waiting": sum(1 for user in users if user.jobs and self._has_quota(user)),
+            "users_out_of_quota": sum(1 for user in users if user.jobs and not self._has_quota(user)),
+            "applied_per_second": stats.throughput(),
+            "queue_wait_p50": stats.queue_wait.quantile(0.5),
+            "queue_wait_p95": stats.queue_wait.quantile(0.95),
+        }
+
+    def render_prometheus(self, prefix: str = "apply_scheduler") -> str:
+        """Счетчики и гистограмма ожидания в текстовом формате Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+        for name in ("submitted", "duplicates", "applied", "failed", "retried", "quota_rejected",
+                     "store_errors", "worker_errors"):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {snapshot[name]}")
+        for name in ("backlog", "in_flight", "retry_pending", "users_waiting", "users_out_of_quota",
+                     "applied_per_second"):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {snapshot[name]}")
+        histogram = self.stats.queue_wait
+        lines.append(f"# TYPE {prefix}_queue_wait_seconds histogram")
+        for bound, total in histogram.cumulative():
+            lines.append(f'{prefix}_queue_wait_seconds_bucket{{le="{bound}"}} {total}')
+        lines.append(f"{prefix}_queue_wait_seconds_sum {histogram.sum!r}")
+        lines.append(f"{prefix}_queue_wait_seconds_count {histogram.count}")
+        return "\n".join(lines) + "\n"
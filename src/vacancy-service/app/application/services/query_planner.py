@@ -0,0 +1,275 @@
+"""
+Объединение одинаковых поисков разных пользователей в один запрос к hh.ru
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from app.application.services.search_poller import IncrementalSearchPoller, search_key
+from app.application.services.vacancy_scoring import get_default_scorer
+from app.domain.interfaces import IVacancyScorer
+from app.domain.models import SavedSearch, VacancyFilter
+
+logger = logging.getLogger(__name__)
+
+# Параметры, которые проверяются локально, а не отправляются в hh.ru: чем
+# меньше параметров уходит в запрос, тем больше пользователей его разделяют
+LOCAL_PARAMS = ("salary", "currency", "only_with_salary", "experience", "schedule", "employment")
+
+# Параметры постраничной выдачи и опроса задает сам запрос
+_IGNORED_PARAMS = ("page", "per_page", "date_from", "date_to", "order_by")
+
+
+def _canonical_value(value: Any) -> Any:
+    """Значение параметра в каноническом виде (None - параметр не задан)"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        values = sorted({_canonical_value(item) for item in value} - {None})
+        if not values:
+            return None
+        return values[0] if len(values) == 1 else values
+    if value is None:
+        return None
+    text = " ".join(str(value).split())
+    return text or None
+
+
+def canonicalize_search(
+    params: Dict[str, Any],
+    local_params: Sequence[str] = LOCAL_PARAMS
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Разделить параметры поиска на запрос к hh.ru и локальные фильтры
+
+    Пустые значения отбрасываются, пробелы схлопываются, списки сортируются
+    без повторов, а одиночный список становится значением. Регистр не
+    меняется: в языке запросов hh.ru операторы AND/OR/NOT пишутся заглавными.
+    """
+    upstream: Dict[str, Any] = {}
+    local: Dict[str, Any] = {}
+    for name, value in params.items():
+        if name in _IGNORED_PARAMS:
+            continue
+        value = _canonical_value(value)
+        if value is None:
+            continue
+        (local if name in local_params else upstream)[name] = value
+    return dict(sorted(upstream.items())), local
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, list) else [value]
+
+
+def _parse_salary(value: Any) -> Optional[int]:
+    """Зарплата из параметра поиска (None, если не задана или не число)"""
+    try:
+        salary = int(value)
+    except (TypeError, ValueError):
+        return None
+    return salary if salary > 0 else None
+
+
+def local_filter(filter_id: int, local: Dict[str, Any], keywords: Sequence[str] = ()) -> VacancyFilter:
+    """Фильтр вакансий по локальным параметрам поиска
+
+    Нечисловая зарплата не ограничивает выбор, как и отсутствующая.
+    """
+    return VacancyFilter(
+        user_id=filter_id,
+        salary_min=_parse_salary(local.get("salary")),
+        currency=local.get("currency", "RUR"),
+        allow_no_salary=local.get("only_with_salary") != "true",
+        schedules=_as_list(local.get("schedule")),
+        experiences=_as_list(local.get("experience")),
+        employments=_as_list(local.get("employment")),
+        keywords=list(keywords),
+    )
+
+
+@dataclass
+class PlannedQuery:
+    """Один запрос к hh.ru и поиски пользователей, которые его разделяют"""
+
+    key: str
+    params: Dict[str, Any]
+    searches: List[SavedSearch] = field(default_factory=list)
+    filters: List[VacancyFilter] = field(default_factory=list)
+
+
+class QueryPlanner:
+    """Группирует сохраненные поиски по каноническому запросу к hh.ru"""
+
+    def __init__(self, url: str = "/vacancies", local_params: Sequence[str] = LOCAL_PARAMS):
+        self._url = url
+        self._local_params = tuple(local_params)
+
+    def plan(self, searches: Iterable[SavedSearch]) -> List[PlannedQuery]:
+        """Различные запросы с поисками и их локальными фильтрами"""
+        queries: Dict[str, PlannedQuery] = {}
+        for search in searches:
+            upstream, local = canonicalize_search(search.params, self._local_params)
+            key = search_key(self._url, upstream)
+            query = queries.get(key)
+            if query is None:
+                query = queries[key] = PlannedQuery(key=key, params=upstream)
+            # id фильтра - его номер в запросе, у пользователя может быть
+            # несколько поисков, попавших в один запрос
+            query.filters.append(local_filter(len(query.searches), local, search.keywords))
+            query.searches.append(search)
+        return list(queries.values())
+
+
+@dataclass
+class FanInStats:
+    """Счетчики объединения поисков"""
+
+    cycles: int = 0
+    searches: int = 0
+    upstream_queries: int = 0
+    failed_queries: int = 0
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Во сколько раз запросов к hh.ru меньше, чем поисков"""
+        return self.searches / self.upstream_queries if self.upstream_queries else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """Текущие значения счетчиков"""
+        return {
+            "cycles": self.cycles,
+            "searches": self.searches,
+            "upstream_queries": self.upstream_queries,
+            "failed_queries": self.failed_queries,
+            "dedup_ratio": self.dedup_ratio,
+        }
+
+
+class SearchFanIn:
+    """Выполняет каждый различный запрос один раз за цикл и раздает результаты
+
+    Запросы опрашиваются инкрементально через `poller`, не больше
+    `concurrency` одновременно. Найденные вакансии отбираются и ранжируются
+    для каждого поиска локально, по его фильтру, так что число запросов к
+    hh.ru растет с числом различных запросов, а не пользователей. `top_k`
+    ограничивает число вакансий на поиск (None - все подходящие).
+
+    Отметка опроса общая для запроса, поэтому поиск, впервые попавший в уже
+    опрашиваемый запрос, получает вакансии разовым поиском целиком
+    (`poller.fetch_all`), без отметки. Подписчики запросов помнятся в памяти
+    процесса: после перезапуска каждый запрос один раз ищется целиком.
+
+    Ошибка одного запроса не прерывает цикл: она пишется в лог, поиски
+    запроса получают пустой результат, а новые подписчики остаются новыми до
+    следующего цикла.
+    """
+
+    def __init__(
+        self,
+        poller: IncrementalSearchPoller,
+        scorer: Optional[IVacancyScorer] = None,
+        planner: Optional[QueryPlanner] = None,
+        concurrency: int = 4,
+        top_k: Optional[int] = None
+    ):
+        self._poller = poller
+        self._scorer = scorer or get_default_scorer()
+        self._planner = planner or QueryPlanner()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._top_k = top_k
+        self._subscribers: Dict[str, Set[str]] = {}  # ключ запроса -> подписи его поисков
+        self.stats = FanInStats()
+
+    @staticmethod
+    def _subscriber(search: SavedSearch, search_filter: VacancyFilter) -> str:
+        """Подпись поиска в запросе: пользователь и локальный фильтр"""
+        return f"{search.user_id}:{search_filter.model_dump_json(exclude={'user_id'})}"
+
+    async def _fetch(
+        self,
+        query: PlannedQuery,
+        has_new: bool
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[List[Dict[str, Any]]]]:
+        """Новые вакансии запроса и все вакансии для новых подписчиков
+
+        None - загрузка не удалась. Если опрос оказался полной сверкой, его
+        результат подходит и новым подписчикам.
+        """
+        async with self._semaphore:
+            try:
+                result = await self._poller.poll(query.params)
+            except Exception:
+                self.stats.failed_queries += 1
+                logger.exception("Search query %s failed", query.key)
+                return None, None
+            if not has_new or result.full_resync:
+                return result.items, result.items
+            try:
+                backlog = await self._poller.fetch_all(query.params)
+            except Exception:
+                self.stats.failed_queries += 1
+                logger.exception("Full search for new subscribers of %s failed", query.key)
+                return result.items, None
+        return result.items, backlog.items
+
+    def _rank(
+        self,
+        items: List[Dict[str, Any]],
+        filters: List[VacancyFilter]
+    ) -> Dict[int, List[Tuple[Dict[str, Any], float]]]:
+        """Подходящие вакансии с оценками по id фильтра"""
+        if not items or not filters:
+            return {}
+        by_id = {str(item["id"]): item for item in items}
+        ranked = self._scorer.score(items, filters, self._top_k or len(items))
+        return {
+            filter_id: [(by_id[vacancy_id], score) for vacancy_id, score in matches]
+            for filter_id, matches in ranked.items()
+        }
+
+    async def run_cycle(self, searches: Sequence[SavedSearch]) -> Dict[int, List[Dict[str, Any]]]:
+        """Новые вакансии по пользователям, по убыванию оценки среди всех их поисков"""
+        plan = self._planner.plan(searches)
+        self.stats.cycles += 1
+        self.stats.searches += len(searches)
+        self.stats.upstream_queries += len(plan)
+
+        subscribers = [
+            [self._subscriber(search, search_filter)
+             for search, search_filter in zip(query.searches, query.filters)]
+            for query in plan
+        ]
+        new = [
+            [subscriber not in self._subscribers.get(query.key, ()) for subscriber in names]
+            for query, names in zip(plan, subscribers)
+        ]
+        results = await asyncio.gather(
+            *(self._fetch(query, any(is_new)) for query, is_new in zip(plan, new))
+        )
+
+        known: Dict[str, Set[str]] = {}
+        best: Dict[int, Dict[str, Tuple[Dict[str, Any], float]]] = {
+            search.user_id: {} for search in searches
+        }
+        for query, names, is_new, (items, backlog) in zip(plan, subscribers, new, results):
+            # Новые подписчики остаются новыми, пока не получат поиск целиком
+            known[query.key] = {
+                name for name, flag in zip(names, is_new) if not flag or backlog is not None
+            }
+            old_filters = [f for f, flag in zip(query.filters, is_new) if not flag]
+            new_filters = [f for f, flag in zip(query.filters, is_new) if flag]
+            ranked = self._rank(items or [], old_filters)
+            ranked.update(self._rank(backlog or [], new_filters))
+            for search, search_filter in zip(query.searches, query.filters):
+                vacancies = best[search.user_id]
+                for item, score in ranked.get(search_filter.user_id, ()):
+                    vacancy_id = str(item["id"])
+                    if vacancy_id not in vacancies or vacancies[vacancy_id][1] < score:
+                        vacancies[vacancy_id] = (item, score)
+        self._subscribers = known
+        return {
+            user_id: [item for item, _ in sorted(vacancies.values(), key=lambda pair: -pair[1])]
+            for user_id, vacancies in best.items()
+        }
@@ -0,0 +1,226 @@
+"""
+Инкрементальный опрос сохраненных поисков hh.ru
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.domain.interfaces import ISearchWatermarkStore
+from app.domain.models import PollResult, SearchWatermark
+from app.infrastructure.http.interfaces import IHttpClient
+from app.infrastructure.http.keys import normalize_request_key
+from app.infrastructure.http.pagination import HH_MAX_RESULTS, fetch_all_pages
+
+# Параметры, которыми управляет сам опрос
+_POLLER_PARAMS = ("date_from", "date_to", "order_by", "page", "per_page")
+
+HH_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+
+def parse_published_at(value: Optional[str]) -> Optional[datetime]:
+    """Разобрать дату публикации hh.ru (`2025-09-01T10:00:00+0300`)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, HH_DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def search_key(url: str, params: Dict[str, Any]) -> str:
+    """Ключ сохраненного поиска: URL и параметры без управляющих опросом"""
+    return normalize_request_key(
+        url, {name: value for name, value in params.items() if name not in _POLLER_PARAMS}
+    )
+
+
+class IncrementalSearchPoller:
+    """Опрашивает сохраненный поиск, запрашивая только новые вакансии
+
+    Для каждого поиска хранится отметка: самая поздняя дата публикации из
+    полученных и id вакансий, опубликованных не раньше чем за `overlap` до
+    нее. Следующий опрос запрашивает вакансии с `date_from` = отметка минус
+    `overlap` (запас на расхождение часов и задержку индексации hh.ru) и
+    отбрасывает уже виденные id у границы, так что стоимость опроса зависит
+    от числа новых вакансий, а не от числа всех совпадений.
+
+    Раз в `full_resync_interval` и при первом опросе поиск выполняется
+    целиком, без `date_from`: это подбирает вакансии, опубликованные задним
+    числом. Полная сверка возвращает все найденные вакансии с
+    `full_resync=True`; уже обработанные отсеивает индекс просмотренных.
+
+    hh.ru отдает не больше 2000 вакансий на поиск, новые первыми. Если
+    найдено больше, опрос продолжается окнами с `date_to` = самая ранняя
+    полученная публикация, пока не дойдет до прежней отметки, поэтому
+    вакансии за обрезкой не теряются при сдвиге отметки.
+    """
+
+    def __init__(
+        self,
+        client: IHttpClient,
+        store: ISearchWatermarkStore,
+        url: str = "/vacancies",
+        full_resync_interval: timedelta = timedelta(hours=24),
+        overlap: timedelta = timedelta(minutes=5),
+        per_page: int = 100,
+        concurrency: int = 4,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ):
+        self._client = client
+        self._store = store
+        self._url = url
+        self._full_resync_interval = full_resync_interval
+        self._overlap = overlap
+        self._per_page = per_page
+        self._concurrency = concurrency
+        self._clock = clock
+
+    def _needs_full_resync(self, watermark: Optional[SearchWatermark], now: datetime) -> bool:
+        return (
+            watermark is None
+            or watermark.published_at is None
+            or watermark.last_full_sync is None
+            or now - watermark.last_full_sync >= self._full_resync_interval
+        )
+
+    async def poll(
+        self,
+        params: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        force_full: bool = False
+    ) -> PollResult:
+        """Опросить поиск и сдвинуть его отметку"""
+        key = search_key(self._url, params)
+        now = self._clock()
+        watermark = await self._store.get(key)
+        full = force_full or self._needs_full_resync(watermark, now)
+
+        since = None
+        if watermark is not None and watermark.published_at is not None:
+            since = watermark.published_at - self._overlap
+        query = {name: value for name, value in params.items() if name not in _POLLER_PARAMS}
+        query["order_by"] = "publication_time"
+        if not full:
+            query["date_from"] = since.strftime(HH_DATETIME_FORMAT)
+        items, truncated = await self._collect(query, headers, since)
+
+        if full:
+            new_items = items
+        else:
+            boundary = set(watermark.boundary_ids)
+            new_items = [item for item in items if str(item.get("id")) not in boundary]
+
+        await self._store.save(self._advance(key, watermark, items, full, now))
+        return PollResult(
+            search_key=key,
+            items=new_items,
+            full_resync=full,
+            fetched=len(items),
+            truncated=truncated
+        )
+
+    async def fetch_all(
+        self,
+        params: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> PollResult:
+        """Выполнить поиск целиком, не трогая отметку
+
+        Для нового подписчика поиска, который уже опрашивается: ему нужны и
+        вакансии, опубликованные до отметки.
+        """
+        query = {name: value for name, value in params.items() if name not in _POLLER_PARAMS}
+        query["order_by"] = "publication_time"
+        items, truncated = await self._collect(query, headers, None)
+        return PollResult(
+            search_key=search_key(self._url, params),
+            items=items,
+            full_resync=True,
+            fetched=len(items),
+            truncated=truncated
+        )
+
+    async def _collect(
+        self,
+        query: Dict[str, Any],
+        headers: Optional[Dict[str, str]],
+        since: Optional[datetime]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Вакансии поиска окнами по `date_to` до `since` и признак обрезки"""
+        items: List[Dict[str, Any]] = []
+        fetched_ids = set()
+        until: Optional[datetime] = None
+        while True:
+            window, found = await self._fetch_window(query, headers)
+            for item in window:
+                vacancy_id = str(item.get("id"))
+                if vacancy_id not in fetched_ids:
+                    fetched_ids.add(vacancy_id)
+                    items.append(item)
+            truncated = found > HH_MAX_RESULTS
+            if not truncated or since is None:
+                break
+            dates = [parse_published_at(item.get("published_at")) for item in window]
+            oldest = min((date for date in dates if date is not None), default=None)
+            if oldest is None or (until is not None and oldest >= until):
+                # Окно не сдвигается (больше 2000 вакансий в одну секунду)
+                break
+            if oldest <= since:
+                truncated = False
+                break
+            until = oldest
+            query["date_to"] = until.strftime(HH_DATETIME_FORMAT)
+        return items, truncated
+
+    async def _fetch_window(
+        self,
+        query: Dict[str, Any],
+        headers: Optional[Dict[str, str]]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Загрузить все доступные страницы одного окна поиска и `found`"""
+        items: List[Dict[str, Any]] = []
+        found = 0
+        pages = fetch_all_pages(
+            self._client,
+            self._url,
+            query,
+            headers=headers,
+            per_page=self._per_page,
+            concurrency=self._concurrency
+        )
+        first = True
+        async for page in pages:
+            if first:
+                found = int(page.get("found") or 0)
+                first = False
+            items.extend(page.get("items", []))
+        return items, found
+
+    def _advance(
+        self,
+        key: str,
+        watermark: Optional[SearchWatermark],
+        items: List[Dict[str, Any]],
+        full: bool,
+        now: datetime
+    ) -> SearchWatermark:
+        """Новая отметка по полученным вакансиям"""
+        published = [
+            (parse_published_at(item.get("published_at")), str(item.get("id")))
+            for item in items
+        ]
+        dates = [date for date, _ in published if date is not None]
+        latest = watermark.published_at if watermark is not None else None
+        if dates and (latest is None or max(dates) > latest):
+            latest = max(dates)
+
+        # Окно запроса начинается не позже новой границы, поэтому все
+        # вакансии у границы есть среди полученных
+        boundary = watermark.boundary_ids if watermark is not None and not items else []
+        if items and latest is not None:
+            edge = latest - self._overlap
+            boundary = [vacancy_id for date, vacancy_id in published if date is not None and date >= edge]
+        return SearchWatermark(
+            search_key=key,
+            published_at=latest,
+            boundary_ids=list(dict.fromkeys(boundary)),
+            last_full_sync=now if full else watermark.last_full_sync
+        )
@@ -0,0 +1,377 @@
+"""
+Оценка вакансий по фильтрам пользователей: построчная и векторизованная (NumPy)
+"""
+import math
+import re
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from app.domain.interfaces import IVacancyScorer
+from app.domain.models import VacancyFilter
+from app.infrastructure.storage.fulltext import strip_html
+
+if TYPE_CHECKING:
+    from app.infrastructure.http.compact import CompactVacancy
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_TOKEN = re.compile(r"\w+")
+
+# Оценка хранится в миллионных долях, чтобы обе реализации ранжировали одинаково
+_SCALE = 1_000_000
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова текста в нижнем регистре"""
+    return _TOKEN.findall(text.lower())
+
+
+class VacancyFeatures(NamedTuple):
+    """Поля вакансии, по которым работают фильтры"""
+
+    id: str
+    area: Optional[str]
+    schedule: Optional[str]
+    experience: Optional[str]
+    employment: Optional[str]
+    salary_top: Optional[float]
+    currency: Optional[str]
+    tokens: FrozenSet[str]
+
+    @classmethod
+    def from_vacancy(cls, vacancy: Dict[str, Any]) -> "VacancyFeatures":
+        """Извлечь признаки из вакансии в формате hh.ru"""
+        salary = vacancy.get("salary") or {}
+        bounds = [value for value in (salary.get("from"), salary.get("to")) if value is not None]
+        snippet = vacancy.get("snippet") or {}
+        text = " ".join(filter(None, (
+            vacancy.get("name"),
+            snippet.get("requirement"),
+            snippet.get("responsibility"),
+            strip_html(vacancy.get("description")),
+            " ".join(skill.get("name", "") for skill in vacancy.get("key_skills") or []),
+        )))
+        return cls(
+            id=str(vacancy["id"]),
+            area=(vacancy.get("area") or {}).get("id"),
+            schedule=(vacancy.get("schedule") or {}).get("id"),
+            experience=(vacancy.get("experience") or {}).get("id"),
+            employment=(vacancy.get("employment") or {}).get("id"),
+            salary_top=float(max(bounds)) if bounds else None,
+            currency=salary.get("currency"),
+            tokens=frozenset(tokenize(text)),
+        )
+
+    @classmethod
+    def from_compact(cls, vacancy: "CompactVacancy") -> "VacancyFeatures":
+        """Извлечь признаки из компактной вакансии"""
+        salary = vacancy.salary
+        bounds = [] if salary is None else [
+            value for value in (salary.lower, salary.upper) if value is not None
+        ]
+        snippet = vacancy.snippet
+        text = " ".join(filter(None, (
+            vacancy.name,
+            snippet and snippet.requirement,
+            snippet and snippet.responsibility,
+            strip_html(vacancy.description),
+            " ".join(skill.name for skill in vacancy.key_skills),
+        )))
+        return cls(
+            id=str(vacancy.id),
+            area=vacancy.area and vacancy.area.id,
+            schedule=vacancy.schedule and vacancy.schedule.id,
+            experience=vacancy.experience and vacancy.experience.id,
+            employment=vacancy.employment and vacancy.employment.id,
+            salary_top=float(max(bounds)) if bounds else None,
+            currency=salary and salary.currency,
+            tokens=frozenset(tokenize(text)),
+        )
+
+
+def _keyword_tokens(keywords: Iterable[str]) -> List[FrozenSet[str]]:
+    return [tokens for tokens in (frozenset(tokenize(keyword)) for keyword in keywords) if tokens]
+
+
+def _micro_score(keyword_ratio: float, salary_ratio: float) -> int:
+    """Оценка: 1 + доля совпавших ключевых слов + половина запаса по зарплате"""
+    return math.floor((1.0 + keyword_ratio + 0.5 * salary_ratio) * _SCALE + 0.5)
+
+
+class NaiveVacancyScorer(IVacancyScorer):
+    """Построчная оценка: каждая вакансия проверяется по каждому фильтру
+
+    Эталон для векторизованной реализации и запасной вариант без NumPy.
+    """
+
+    def score(
+        self,
+        vacancies: Sequence[Dict[str, Any]],
+        filters: Sequence[VacancyFilter],
+        top_k: int = 50
+    ) -> Dict[int, List[Tuple[str, float]]]:
+        """Лучшие `top_k` подходящих вакансий для каждого пользователя"""
+        features = [VacancyFeatures.from_vacancy(vacancy) for vacancy in vacancies]
+        return self.score_features(features, filters, top_k)
+
+    def score_features(
+        self,
+        features: Sequence[VacancyFeatures],
+        filters: Sequence[VacancyFilter],
+        top_k: int = 50
+    ) -> Dict[int, List[Tuple[str, float]]]:
+        """То же, что score(), по уже извлеченным признакам"""
+        return {item.user_id: self._score_one(features, item, top_k) for item in filters}
+
+    @staticmethod
+    def _score_one(
+        features: Sequence[VacancyFeatures],
+        item: VacancyFilter,
+        top_k: int
+    ) -> List[Tuple[str, float]]:
+        areas, schedules = set(item.areas), set(item.schedules)
+        experiences, employments = set(item.experiences), set(item.employments)
+        required = _keyword_tokens(item.required_keywords)
+        excluded = _keyword_tokens(item.excluded_keywords)
+        preferred = _keyword_tokens(item.keywords)
+        ranked = []
+        for index, vacancy in enumerate(features):
+            if areas and vacancy.area not in areas:
+                continue
+            if schedules and vacancy.schedule not in schedules:
+                continue
+            if experiences and vacancy.experience not in experiences:
+                continue
+            if employments and vacancy.employment not in employments:
+                continue
+            salary_ratio = 0.0
+            if item.salary_min is not None:
+                if vacancy.salary_top is None:
+                    if not item.allow_no_salary:
+                        continue
+                elif vacancy.currency != item.currency or vacancy.salary_top < item.salary_min:
+                    continue
+                else:
+                    salary_ratio = min(1.0, (vacancy.salary_top - item.salary_min) / item.salary_min)
+            if not all(tokens <= vacancy.tokens for tokens in required):
+                continue
+            if any(tokens <= vacancy.tokens for tokens in excluded):
+                continue
+            keyword_ratio = 0.0
+            if preferred:
+                keyword_ratio = sum(tokens <= vacancy.tokens for tokens in preferred) / len(preferred)
+            ranked.append((-_micro_score(keyword_ratio, salary_ratio), index, vacancy.id))
+        ranked.sort()
+        return [(vacancy_id, -score / _SCALE) for score, _, vacancy_id in ranked[:top_k]]
+
+
+class VectorizedVacancyScorer(IVacancyScorer):
+    """Оценка страницы вакансий сразу по всем фильтрам на массивах NumPy
+
+    Категориальные поля вакансий кодируются целыми числами, фильтры по ним -
+    матрицами допустимых кодов пользователь x код. Ключевые слова хранятся
+    разреженно: для каждого слова - вектор вакансий, где оно есть, и список
+    пользователей, которым оно важно, так что работа пропорциональна числу
+    пар пользователь-слово, а не словарю целиком. Пользователи обрабатываются
+    блоками по `chunk_size`, чтобы матрицы пользователь x вакансия оставались
+    небольшими. Результат совпадает с NaiveVacancyScorer.
+    """
+
+    def __init__(self, chunk_size: int = 256):
+        if np is None:
+            raise ImportError("numpy is not installed")
+        self._chunk_size = chunk_size
+
+    def score(
+        self,
+        vacancies: Sequence[Dict[str, Any]],
+        filters: Sequence[VacancyFilter],
+        top_k: int = 50
+    ) -> Dict[int, List[Tuple[str, float]]]:
+        """Лучшие `top_k` подходящих вакансий для каждого пользователя"""
+        features = [VacancyFeatures.from_vacancy(vacancy) for vacancy in vacancies]
+        return self.score_features(features, filters, top_k)
+
+    def score_features(
+        self,
+        features: Sequence[VacancyFeatures],
+        filters: Sequence[VacancyFilter],
+        top_k: int = 50
+    ) -> Dict[int, List[Tuple[str, float]]]:
+        """То же, что score(), по уже извлеченным признакам"""
+        if not features:
+            return {item.user_id: [] for item in filters}
+        page = _VacancyArrays(features, filters)
+        result: Dict[int, List[Tuple[str, float]]] = {}
+        for start in range(0, len(filters), self._chunk_size):
+            chunk = filters[start:start + self._chunk_size]
+            for item, ranked in zip(chunk, page.rank(chunk, top_k)):
+                result[item.user_id] = ranked
+        return result
+
+
+class _VacancyArrays:
+    """Признаки страницы вакансий в виде массивов"""
+
+    def __init__(self, features: Sequence[VacancyFeatures], filters: Sequence[VacancyFilter]):
+        self.size = len(features)
+        self.ids = np.array([vacancy.id for vacancy in features], dtype=object)
+        self.codes: Dict[str, Tuple[Any, Dict[Optional[str], int]]] = {}
+        for field in ("area", "schedule", "experience", "employment", "currency"):
+            vocabulary: Dict[Optional[str], int] = {}
+            codes = np.array(
+                [vocabulary.setdefault(getattr(vacancy, field), len(vocabulary)) for vacancy in features],
+                dtype=np.intp
+            )
+            self.codes[field] = (codes, vocabulary)
+        self.salary_top = np.array(
+            [np.nan if vacancy.salary_top is None else vacancy.salary_top for vacancy in features]
+        )
+
+        # Вектор вакансий для каждого слова из ключевых слов фильтров
+        wanted = set()
+        for item in filters:
+            for keyword in (*item.required_keywords, *item.excluded_keywords, *item.keywords):
+                wanted.update(tokenize(keyword))
+        postings: Dict[str, List[int]] = {token: [] for token in wanted}
+        for index, vacancy in enumerate(features):
+            for token in vacancy.tokens & wanted:
+                postings[token].append(index)
+        self._token_vectors: Dict[str, Any] = {}
+        for token, indexes in postings.items():
+            vector = np.zeros(self.size, dtype=bool)
+            vector[indexes] = True
+            self._token_vectors[token] = vector
+        self._keyword_vectors: Dict[FrozenSet[str], Any] = {}
+
+    def _keyword_vector(self, tokens: FrozenSet[str]):
+        vector = self._keyword_vectors.get(tokens)
+        if vector is None:
+            vector = np.logical_and.reduce([self._token_vectors[token] for token in tokens])
+            self._keyword_vectors[tokens] = vector
+        return vector
+
+    def _allowed(self, field: str, chunk: Sequence[VacancyFilter], values_of) -> Any:
+        """Матрица пользователь x вакансия: значение поля допустимо"""
+        codes, vocabulary = self.codes[field]
+        allowed = np.zeros((len(chunk), len(vocabulary)), dtype=bool)
+        for row, item in enumerate(chunk):
+            values = values_of(item)
+            if not values:
+                allowed[row] = True
+                continue
+            for value in values:
+                code = vocabulary.get(value)
+                if code is not None:
+                    allowed[row, code] = True
+        return allowed[:, codes]
+
+    def _keyword_counts(self, chunk: Sequence[VacancyFilter], *weighted):
+        """Матрица пользователь x вакансия: взвешенное число ключевых слов фильтра в вакансии
+
+        `weighted` - пары (функция, возвращающая ключевые слова фильтра, вес).
+        Разреженная матрица пользователь x слово умножается на матрицу
+        слово x вакансия, в которой только слова этого блока фильтров.
+        """
+        columns: Dict[FrozenSet[str], int] = {}
+        rows: List[int] = []
+        cells: List[int] = []
+        weights: List[float] = []
+        for keywords_of, weight in weighted:
+            for row, item in enumerate(chunk):
+                for tokens in _keyword_tokens(keywords_of(item)):
+                    rows.append(row)
+                    cells.append(columns.setdefault(tokens, len(columns)))
+                    weights.append(weight)
+        if not rows:
+            return None
+        incidence = np.zeros((len(chunk), len(columns)), dtype=np.float32)
+        np.add.at(incidence, (rows, cells), weights)
+        vectors = np.empty((len(columns), self.size), dtype=np.float32)
+        for tokens, column in columns.items():
+            vectors[column] = self._keyword_vector(tokens)
+        return incidence @ vectors
+
+    def rank(self, chunk: Sequence[VacancyFilter], top_k: int) -> List[List[Tuple[str, float]]]:
+        """Лучшие `top_k` вакансий для каждого фильтра блока
+
+        Маски по категориальным полям считаются на матрицах пользователь x
+        вакансия, остальные проверки и оценка - только для прошедших их пар.
+        Ключ ранжирования - оценка в миллионных долях, умноженная на число
+        вакансий, плюс обратный номер вакансии: при равной оценке выше
+        вакансия, стоящая раньше.
+        """
+        eligible = self._allowed("area", chunk, lambda item: item.areas)
+        eligible &= self._allowed("schedule", chunk, lambda item: item.schedules)
+        eligible &= self._allowed("experience", chunk, lambda item: item.experiences)
+        eligible &= self._allowed("employment", chunk, lambda item: item.employments)
+        rows, cols = np.nonzero(eligible)
+
+        salary_min = np.array(
+            [np.nan if item.salary_min is None else float(item.salary_min) for item in chunk]
+        )[rows]
+        allow_no_salary = np.array([item.allow_no_salary for item in chunk])[rows]
+        currency_codes, currencies = self.codes["currency"]
+        user_currency = np.array([currencies.get(item.currency, -1) for item in chunk])[rows]
+        vacancy_top = self.salary_top[cols]
+        no_filter, no_salary = np.isnan(salary_min), np.isnan(vacancy_top)
+        with np.errstate(invalid="ignore"):
+            salary_ok = (user_currency == currency_codes[cols]) & (vacancy_top >= salary_min)
+        keep = no_filter | (no_salary & allow_no_salary) | salary_ok
+
+        # Обязательные слова считаются с весом 1, исключенные - с весом,
+        # перекрывающим любое число обязательных
+        penalty = -float(1 + max(len(item.required_keywords) for item in chunk))
+        counts = self._keyword_counts(
+            chunk,
+            (lambda item: item.required_keywords, 1.0),
+            (lambda item: item.excluded_keywords, penalty)
+        )
+        if counts is not None:
+            needed = np.array([len(_keyword_tokens(item.required_keywords)) for item in chunk])
+            keep &= counts[rows, cols] >= needed[rows]
+        rows, cols, salary_min, vacancy_top = rows[keep], cols[keep], salary_min[keep], vacancy_top[keep]
+
+        # Подходящая пара с фильтром по зарплате и зарплатой в вакансии
+        # уже прошла проверку валюты и нижней границы
+        with np.errstate(invalid="ignore"):
+            salary_ratio = np.where(
+                np.isnan(salary_min) | np.isnan(vacancy_top),
+                0.0,
+                np.minimum(1.0, (vacancy_top - salary_min) / salary_min)
+            )
+
+        preferred = np.array([len(_keyword_tokens(item.keywords)) for item in chunk], dtype=float)[rows]
+        hits = self._keyword_counts(chunk, (lambda item: item.keywords, 1.0))
+        keyword_ratio = np.zeros(len(rows))
+        if hits is not None:
+            keyword_ratio = np.where(
+                preferred > 0, hits[rows, cols].astype(float) / np.maximum(preferred, 1.0), 0.0
+            )
+
+        micro = np.floor((1.0 + keyword_ratio + 0.5 * salary_ratio) * _SCALE + 0.5).astype(np.int64)
+        keys = micro * self.size + (self.size - 1 - cols)
+
+        # Одна сортировка целых чисел: по пользователю, внутри - по убыванию ключа
+        span = micro.max(initial=0) * self.size + self.size
+        ordered = np.sort(rows * span + (span - 1 - keys))
+        rows = ordered // span
+        keys = span - 1 - ordered % span
+        bounds = np.searchsorted(rows, np.arange(len(chunk) + 1))
+        keep = np.arange(len(rows)) - bounds[rows] < top_k
+        rows, keys = rows[keep], keys[keep]
+        ids = self.ids[self.size - 1 - keys % self.size].tolist()
+        scores = (keys // self.size / _SCALE).tolist()
+        bounds = np.searchsorted(rows, np.arange(len(chunk) + 1)).tolist()
+        return [
+            list(zip(ids[bounds[row]:bounds[row + 1]], scores[bounds[row]:bounds[row + 1]]))
+            for row in range(len(chunk))
+        ]
+
+
+def get_default_scorer() -> IVacancyScorer:
+    """Векторизованная оценка, если установлен NumPy, иначе построчная"""
+    if np is not None:
+        return VectorizedVacancyScorer()
+    return NaiveVacancyScorer()
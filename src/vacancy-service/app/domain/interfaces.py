@@ -0,0 +1,155 @@
+"""
+Интерфейсы доменного слоя vacancy-service
+"""
+from abc import ABC, abstractmethod
+from enum import IntEnum
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.domain.models import ApplyJob, SearchWatermark, VacancyFilter
+
+
+class VacancyMark(IntEnum):
+    """Отметка вакансии у пользователя (отметка только повышается)"""
+
+    SEEN = 1
+    APPLIED = 2
+
+
+class ISeenVacancyIndex(ABC):
+    """Индекс просмотренных и откликнутых вакансий пользователя
+
+    id вакансий во всех интерфейсах домена - строки, как в ответах hh.ru
+    (и в ApplyJob.vacancy_id, SearchWatermark.boundary_ids).
+    """
+
+    @abstractmethod
+    async def contains(
+        self,
+        user_id: int,
+        vacancy_id: str,
+        at_least: VacancyMark = VacancyMark.SEEN
+    ) -> bool:
+        """Есть ли у вакансии отметка не ниже `at_least`"""
+        pass
+
+    @abstractmethod
+    async def filter_unseen(
+        self,
+        user_id: int,
+        vacancy_ids: Iterable[str],
+        at_least: VacancyMark = VacancyMark.SEEN
+    ) -> List[str]:
+        """Оставить вакансии без отметки `at_least` (порядок сохраняется)"""
+        pass
+
+    @abstractmethod
+    async def mark(
+        self,
+        user_id: int,
+        vacancy_ids: Iterable[str],
+        mark: VacancyMark = VacancyMark.SEEN
+    ) -> None:
+        """Отметить вакансии"""
+        pass
+
+    @abstractmethod
+    async def count(self, user_id: int) -> int:
+        """Число отмеченных вакансий пользователя"""
+        pass
+
+
+class ISearchWatermarkStore(ABC):
+    """Хранилище отметок сохраненных поисков"""
+
+    @abstractmethod
+    async def get(self, search_key: str) -> Optional[SearchWatermark]:
+        """Отметка поиска (None, если поиск еще не опрашивался)"""
+        pass
+
+    @abstractmethod
+    async def save(self, watermark: SearchWatermark) -> None:
+        """Сохранить отметку"""
+        pass
+
+
+class IVacancySearchIndex(ABC):
+    """Локальный полнотекстовый индекс вакансий"""
+
+    @abstractmethod
+    async def index(self, vacancies: Iterable[Dict[str, Any]]) -> int:
+        """Добавить или обновить вакансии в формате hh.ru, вернуть их число"""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        vacancy_ids: Optional[Iterable[str]] = None,
+        limit: int = 50
+    ) -> List[str]:
+        """id вакансий по запросу, лучшие совпадения первыми
+
+        `vacancy_ids` ограничивает поиск заданными вакансиями.
+        """
+        pass
+
+    @abstractmethod
+    async def remove(self, vacancy_ids: Iterable[str]) -> None:
+        """Удалить вакансии из индекса"""
+        pass
+
+
+class IVacancyScorer(ABC):
+    """Оценка вакансий по фильтрам пользователей"""
+
+    @abstractmethod
+    def score(
+        self,
+        vacancies: Sequence[Dict[str, Any]],
+        filters: Sequence[VacancyFilter],
+        top_k: int = 50
+    ) -> Dict[int, List[Tuple[str, float]]]:
+        """Лучшие `top_k` подходящих вакансий для каждого пользователя
+
+        Возвращает user_id -> [(vacancy_id, score)] по убыванию оценки.
+        """
+        pass
+
+
+class IApplyJobStore(ABC):
+    """Хранилище ожидающих откликов и использованных дневных лимитов"""
+
+    @abstractmethod
+    async def add(self, jobs: Iterable[ApplyJob]) -> List[ApplyJob]:
+        """Поставить отклики в очередь
+
+        Возвращает принятые отклики с job_id; отклик пользователя на вакансию,
+        уже стоящую в очереди или уже отправленную, пропускается.
+        """
+        pass
+
+    @abstractmethod
+    async def pending(self) -> List[ApplyJob]:
+        """Все ожидающие отклики"""
+        pass
+
+    @abstractmethod
+    async def update(self, job: ApplyJob) -> None:
+        """Сохранить изменения отклика (число попыток)"""
+        pass
+
+    @abstractmethod
+    async def complete(self, job: ApplyJob, day: date) -> None:
+        """Удалить отправленный отклик из очереди, запомнить вакансию как
+        отправленную и учесть отклик в лимите пользователя за день"""
+        pass
+
+    @abstractmethod
+    async def remove(self, job: ApplyJob) -> None:
+        """Удалить отклик без учета в лимите"""
+        pass
+
+    @abstractmethod
+    async def used_quota(self, day: date) -> Dict[int, int]:
+        """Число отправленных за день откликов по пользователям"""
+        pass
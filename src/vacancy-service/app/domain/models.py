@@ -0,0 +1,67 @@
+"""
+Domain models для Vacancy Service
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class SearchWatermark(BaseModel):
+    """Отметка, до которой сохраненный поиск уже обработан"""
+
+    search_key: str
+    published_at: Optional[datetime] = None  # самая поздняя публикация из полученных
+    boundary_ids: List[str] = Field(default_factory=list)  # id вакансий у границы
+    last_full_sync: Optional[datetime] = None
+
+
+class PollResult(BaseModel):
+    """Результат опроса сохраненного поиска"""
+
+    search_key: str
+    items: List[Dict[str, Any]]  # новые вакансии (при полной сверке - все найденные)
+    full_resync: bool = False
+    fetched: int = 0  # сколько вакансий получено от hh.ru
+    truncated: bool = False  # часть найденного не получена из-за лимита hh.ru на поиск
+
+
+class VacancyFilter(BaseModel):
+    """Критерии пользователя для отбора вакансий
+
+    Пустой список допустимых значений (areas, schedules, ...) не ограничивает
+    выбор. Ключевое слово из нескольких слов совпадает, если в вакансии есть
+    все его слова.
+    """
+
+    user_id: int
+    salary_min: Optional[int] = Field(default=None, gt=0)
+    currency: str = "RUR"
+    allow_no_salary: bool = True
+    areas: List[str] = Field(default_factory=list)
+    schedules: List[str] = Field(default_factory=list)
+    experiences: List[str] = Field(default_factory=list)
+    employments: List[str] = Field(default_factory=list)
+    required_keywords: List[str] = Field(default_factory=list)  # должны быть все
+    excluded_keywords: List[str] = Field(default_factory=list)  # не должно быть ни одного
+    keywords: List[str] = Field(default_factory=list)  # повышают оценку
+
+
+class SavedSearch(BaseModel):
+    """Сохраненный поиск пользователя в параметрах hh.ru API"""
+
+    user_id: int
+    params: Dict[str, Any]
+    keywords: List[str] = Field(default_factory=list)  # повышают оценку при локальном отборе
+
+
+class ApplyJob(BaseModel):
+    """Отклик пользователя на вакансию в очереди массового отклика"""
+
+    job_id: Optional[int] = None  # назначает хранилище при постановке в очередь
+    user_id: int
+    vacancy_id: str
+    resume_id: str
+    message: Optional[str] = None  # сопроводительное письмо
+    score: float = 0.0  # оценка совпадения: у пользователя первыми идут лучшие
+    attempts: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
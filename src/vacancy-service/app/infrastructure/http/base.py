@@ -1,9 +1,17 @@
 """
 Базовый класс для HTTP клиентов
 """
+import time
 from typing import Any, Dict, Optional
 from urllib.parse import urljoin
+from app.infrastructure.http.codecs import JsonCodec, get_default_codec
 from app.infrastructure.http.interfaces import IHttpClient
+from app.infrastructure.http.rate_limit import (
+    RateLimiter,
+    parse_retry_after,
+    rate_limit_key,
+)
+from app.infrastructure.http.timing import PhaseTimings
 
 
 class BaseHttpClient(IHttpClient):
@@ -13,11 +21,22 @@ class BaseHttpClient(IHttpClient):
         self,
         base_url: str = "",
         default_headers: Optional[Dict[str, str]] = None,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        codec: Optional[JsonCodec] = None,
+        timings: Optional[PhaseTimings] = None
     ):
         self._base_url = base_url.rstrip("/")
         self._default_headers = default_headers or {}
         self._timeout = timeout
+        self._rate_limiter = rate_limiter
+        self._codec = codec or get_default_codec()
+        self._timings = timings
+
+    @property
+    def timings(self) -> Optional[PhaseTimings]:
+        """Гистограммы времени фаз запросов (None, если сбор отключен)"""
+        return self._timings
 
     def _build_url(self, path: str) -> str:
         """Построить полный URL"""
@@ -38,3 +57,56 @@ class BaseHttpClient(IHttpClient):
     def _get_timeout(self, timeout: Optional[float] = None) -> float:
         """Получить таймаут"""
         return timeout if timeout is not None else self._timeout
+
+    def _encode_json(self, value: Any) -> bytes:
+        """Закодировать тело запроса кодеком клиента"""
+        return self._codec.dumps(value)
+
+    def _decode_json(self, content: bytes, route: Optional[str] = None) -> Any:
+        """Декодировать тело ответа кодеком клиента (пустое тело - пустой dict)
+
+        С `route` и включенным сбором время декодирования пишется в фазу decode.
+        """
+        if not content:
+            return {}
+        if self._timings is None or route is None:
+            return self._codec.loads(content)
+        started = time.perf_counter()
+        try:
+            return self._codec.loads(content)
+        finally:
+            self._timings.observe(route, "decode", time.perf_counter() - started)
+
+    async def _acquire_rate_limit(self, url: str, headers: Dict[str, str]) -> Optional[float]:
+        """Дождаться своей очереди в ограничителе частоты; вернуть время отправки"""
+        if self._rate_limiter is None:
+            return None
+        await self._rate_limiter.acquire(*rate_limit_key(url, headers))
+        return self._rate_limiter.now()
+
+    def _should_retry_throttled(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        status_code: int,
+        retry_after: Optional[str],
+        attempt: int,
+        sent_at: Optional[float] = None
+    ) -> bool:
+        """Сообщить ограничителю результат запроса и решить, повторять ли его
+
+        Ответ 429 снижает скорость и повторяется, пока не исчерпан лимит
+        повторов ограничителя; скорость восстанавливают только успешные
+        ответы (2xx/3xx), ошибки 4xx/5xx ее не меняют. `sent_at` - результат
+        _acquire_rate_limit: 429 на запросы, ушедшие до снижения скорости,
+        снижают ее один раз.
+        """
+        if self._rate_limiter is None:
+            return False
+        host, token = rate_limit_key(url, headers)
+        if status_code != 429:
+            if 200 <= status_code < 400:
+                self._rate_limiter.on_success(host, token)
+            return False
+        self._rate_limiter.on_throttled(host, token, parse_retry_after(retry_after), sent_at)
+        return attempt < self._rate_limiter.max_throttle_retries
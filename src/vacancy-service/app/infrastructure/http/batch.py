@@ -0,0 +1,37 @@
+"""
+Пакетное выполнение GET запросов с ограничением параллельности
+"""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+from app.infrastructure.http.interfaces import BatchResult
+
+
+async def iter_batch(
+    fetch: Callable[[str], Awaitable[Any]],
+    urls: Iterable[str],
+    concurrency: int = 10
+) -> AsyncIterator[BatchResult]:
+    """Выполнить `fetch` для всех URL, не больше `concurrency` одновременно
+
+    Результаты выдаются в порядке завершения, ошибки возвращаются в
+    BatchResult.error. При выходе из цикла незавершенные запросы отменяются.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, url: str) -> BatchResult:
+        async with semaphore:
+            try:
+                return BatchResult(index=index, url=url, data=await fetch(url))
+            except Exception as exc:
+                return BatchResult(index=index, url=url, error=exc)
+
+    tasks = [asyncio.ensure_future(run(index, url)) for index, url in enumerate(urls)]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,201 @@
+"""
+Кеширующий декоратор HTTP клиента (TTL + LRU + ревалидация по ETag)
+"""
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+from urllib.parse import urlsplit
+from app.infrastructure.http.decorators import HttpClientDecorator
+from app.infrastructure.http.interfaces import (
+    ConditionalResponse,
+    IConditionalHttpClient,
+    IHttpClient,
+)
+from app.infrastructure.http.keys import normalize_request_key
+
+
+@dataclass
+class CacheEntry:
+    """Закешированный ответ"""
+
+    data: Union[Dict[str, Any], bytes]
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def can_revalidate(self) -> bool:
+        """Есть ли у ответа валидаторы для условного запроса"""
+        return bool(self.etag or self.last_modified)
+
+
+@dataclass
+class CacheStats:
+    """Счетчики кеша"""
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    revalidations_not_modified: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Доля запросов, обслуженных без загрузки тела ответа"""
+        served = self.hits + self.revalidations_not_modified
+        total = self.hits + self.misses + self.revalidations
+        return served / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """Текущие значения счетчиков"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "revalidations_not_modified": self.revalidations_not_modified,
+            "evictions": self.evictions,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+class CachingHttpClient(HttpClientDecorator):
+    """Кеширует ответы GET запросов вложенного клиента
+
+    TTL задается по префиксу пути (`route_ttls`, выбирается самый длинный
+    совпавший префикс), маршруты без TTL не кешируются. Устаревшая запись с
+    ETag/Last-Modified ревалидируется условным запросом: ответ 304 продлевает
+    запись без загрузки тела. Заголовки из `vary_headers` входят в ключ, их
+    нужно указать для ответов, зависящих от пользователя (например
+    Authorization). Сырые (raw=True) и декодированные ответы кешируются
+    отдельно.
+    """
+
+    def __init__(
+        self,
+        inner: IHttpClient,
+        route_ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 0.0,
+        max_entries: int = 1024,
+        vary_headers: Iterable[str] = (),
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(inner)
+        self._route_ttls = sorted(
+            (route_ttls or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._vary_headers = tuple(vary_headers)
+        self._clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.stats = CacheStats()
+
+    def _ttl_for(self, url: str) -> float:
+        """TTL для маршрута запроса"""
+        path = urlsplit(url).path or "/"
+        if not path.startswith("/"):
+            path = f"/{path}"
+        for prefix, ttl in self._route_ttls:
+            if path.startswith(prefix):
+                return ttl
+        return self._default_ttl
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        """Сохранить запись, вытеснив самые давно использованные"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Удалить записи с указанным путем (или весь кеш)"""
+        if url is None:
+            self._entries.clear()
+            return
+        path = urlsplit(url).path or "/"
+        for key in [key for key in self._entries if self._key_path(key) == path]:
+            del self._entries[key]
+
+    @staticmethod
+    def _key_path(key: str) -> str:
+        """Путь запроса из ключа кеша (без суффикса vary заголовков)"""
+        return urlsplit(key.split("|", 1)[0]).path
+
+    async def _fetch(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+        timeout: Optional[float],
+        stale: Optional[CacheEntry] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        """Загрузить ответ, по возможности условным запросом"""
+        if not isinstance(self._inner, IConditionalHttpClient):
+            data = await self._inner.get(
+                url, params=params, headers=headers, timeout=timeout, raw=raw
+            )
+            return ConditionalResponse(not_modified=False, data=data)
+        return await self._inner.get_conditional(
+            url,
+            params=params,
+            headers=headers,
+            timeout=timeout,
+            etag=stale.etag if stale else None,
+            last_modified=stale.last_modified if stale else None,
+            raw=raw
+        )
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """GET запрос через кеш"""
+        ttl = self._ttl_for(url)
+        if ttl <= 0:
+            return await self._inner.get(
+                url, params=params, headers=headers, timeout=timeout, raw=raw
+            )
+
+        key = normalize_request_key(url, params, headers, self._vary_headers)
+        if raw:
+            key = f"{key}|raw"
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is not None and entry.expires_at > now:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return copy.deepcopy(entry.data)
+
+        stale = entry if entry is not None and entry.can_revalidate else None
+        if stale is not None:
+            self.stats.revalidations += 1
+        else:
+            self.stats.misses += 1
+
+        response = await self._fetch(url, params, headers, timeout, stale, raw)
+        if response.not_modified and stale is not None:
+            self.stats.revalidations_not_modified += 1
+            stale.expires_at = self._clock() + ttl
+            stale.etag = response.etag or stale.etag
+            stale.last_modified = response.last_modified or stale.last_modified
+            self._store(key, stale)
+            return copy.deepcopy(stale.data)
+
+        data = response.data
+        if data is None:
+            data = b"" if raw else {}
+        self._store(key, CacheEntry(
+            data=copy.deepcopy(data),
+            expires_at=self._clock() + ttl,
+            etag=response.etag,
+            last_modified=response.last_modified
+        ))
+        return data
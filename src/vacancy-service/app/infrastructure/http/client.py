@@ -1,27 +1,91 @@
 """
 HTTPX реализация HTTP клиента
 """
-from typing import Any, Dict, Optional, Union
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Union
 import httpx
 from app.infrastructure.http.base import BaseHttpClient
+from app.infrastructure.http.batch import iter_batch
+from app.infrastructure.http.codecs import JsonCodec
+from app.infrastructure.http.hedging import HedgingPolicy
+from app.infrastructure.http.interfaces import (
+    BatchResult,
+    ConditionalResponse,
+    IConditionalHttpClient,
+)
+from app.infrastructure.http.json_stream import iter_json_items
+from app.infrastructure.http.pool import (
+    HttpClientPool,
+    PoolConfig,
+    PoolMetrics,
+    create_async_client,
+)
+from app.infrastructure.http.rate_limit import RateLimiter
+from app.infrastructure.http.timing import PhaseTimings, combine_traces, route_label
 
 
-class HttpxClient(BaseHttpClient):
-    """Реализация HTTP клиента на базе HTTPX"""
+class HttpxClient(BaseHttpClient, IConditionalHttpClient):
+    """Реализация HTTP клиента на базе HTTPX
+
+    С `pool` клиент берет общий HTTPX клиент пула для своего base URL и не
+    закрывает его при выходе. Без `pool` создается собственный клиент с
+    настройками `pool_config`. Проверка сертификатов задается пулом, поэтому
+    `verify_ssl`, расходящийся с настройками пула, - ошибка; `timeout`
+    применяется к каждому запросу клиента. С `rate_limiter` запросы ждут своей очереди, а
+    ответы 429 повторяются после паузы вместо немедленной ошибки. Тела
+    кодируются и декодируются кодеком `codec` (по умолчанию самым быстрым из
+    установленных). С `hedging` медленные GET запросы (включая условные и
+    пакетные) дублируются. С `timings` время фаз каждого запроса (ожидание
+    пула, соединение, TLS, TTFB, чтение тела, декодирование) пишется в
+    гистограммы по маршрутам.
+    """
 
     def __init__(
         self,
         base_url: str = "",
         default_headers: Optional[Dict[str, str]] = None,
         timeout: float = 30.0,
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        pool: Optional[HttpClientPool] = None,
+        pool_config: Optional[PoolConfig] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        codec: Optional[JsonCodec] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        timings: Optional[PhaseTimings] = None
     ):
-        super().__init__(base_url, default_headers, timeout)
-        self._client = httpx.AsyncClient(
-            verify=verify_ssl,
-            timeout=timeout,
-            follow_redirects=True
-        )
+        super().__init__(base_url, default_headers, timeout, rate_limiter, codec, timings)
+        self._hedging = hedging
+        self._metrics: Optional[PoolMetrics]
+        if pool is not None:
+            if pool_config is not None:
+                raise ValueError("pool_config can't be combined with a shared pool")
+            if verify_ssl != pool.config(self._base_url).verify_ssl:
+                raise ValueError(
+                    "verify_ssl conflicts with the shared pool config; "
+                    "configure it with HttpClientPool.configure()"
+                )
+            self._client = pool.client(self._base_url)
+            self._metrics = pool.metrics(self._base_url)
+            self._owns_client = False
+        else:
+            if pool_config is not None and verify_ssl != pool_config.verify_ssl:
+                raise ValueError("verify_ssl conflicts with pool_config.verify_ssl")
+            config = pool_config or PoolConfig(verify_ssl=verify_ssl, timeout=timeout)
+            self._client = create_async_client(config)
+            self._metrics = (
+                PoolMetrics(config.max_connections) if config.collect_metrics else None
+            )
+            self._owns_client = True
+
+    @property
+    def metrics(self) -> Optional[PoolMetrics]:
+        """Метрики пула соединений клиента"""
+        return self._metrics
+
+    @property
+    def hedging(self) -> Optional[HedgingPolicy]:
+        """Политика хеджирования GET запросов"""
+        return self._hedging
 
     async def __aenter__(self):
         """Поддержка контекстного менеджера"""
@@ -29,24 +93,191 @@ class HttpxClient(BaseHttpClient):
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Закрыть клиент при выходе из контекста"""
-        await self._client.aclose()
+        await self.close()
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        allow_not_modified: bool = False,
+        stream: bool = False
+    ) -> httpx.Response:
+        """Выполнить запрос и проверить статус ответа
+
+        При stream=True тело ответа не читается, ответ нужно закрыть вызовом
+        `aclose()`.
+        """
+        full_url = self._build_url(url)
+        merged_headers = self._merge_headers(headers)
+        if json is not None:
+            data = self._encode_json(json)
+            merged_headers.setdefault("Content-Type", "application/json")
+        attempt = 0
+        while True:
+            sent_at = await self._acquire_rate_limit(full_url, merged_headers)
+            request = self._client.build_request(
+                method,
+                full_url,
+                params=params,
+                content=data,
+                headers=merged_headers,
+                timeout=self._get_timeout(timeout)
+            )
+            timer = None
+            if self._timings is not None:
+                timer = self._timings.start(method, request.url.path)
+            if self._metrics is None:
+                if timer is not None:
+                    request.extensions["trace"] = timer.trace
+                response = await self._client.send(request, stream=stream)
+            else:
+                with self._metrics.track() as tracker:
+                    request.extensions["trace"] = combine_traces(
+                        tracker.trace, timer and timer.trace
+                    )
+                    response = await self._client.send(request, stream=stream)
+            if not self._should_retry_throttled(
+                full_url,
+                merged_headers,
+                response.status_code,
+                response.headers.get("Retry-After"),
+                attempt,
+                sent_at
+            ):
+                break
+            await response.aclose()
+            attempt += 1
+        if not (allow_not_modified and response.status_code == 304):
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError:
+                await response.aclose()
+                raise
+        return response
+
+    async def _send_get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET запрос с прочитанным телом, с хеджированием, если оно включено
+
+        Через этот метод идут и обычные, и условные GET, поэтому хеджирование
+        работает и под кешем, который ревалидирует записи условными запросами.
+        """
+        if self._hedging is None:
+            return await self._send("GET", url, **kwargs)
+        return await self._hedging.run(lambda: self._send("GET", url, **kwargs))
+
+    def _decode_response(self, response: httpx.Response) -> Any:
+        """Декодировать тело ответа с учетом времени декодирования"""
+        route = None
+        if self._timings is not None:
+            route = route_label(response.request.method, response.request.url.path)
+        return self._decode_json(response.content, route)
 
     async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """GET запрос (raw=True - вернуть тело ответа без декодирования)"""
+        response = await self._send_get(url, params=params, headers=headers, timeout=timeout)
+        return response.content if raw else self._decode_response(response)
+
+    async def get_many(
+        self,
+        urls: Iterable[str],
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        concurrency: int = 10,
+        raw: bool = False
+    ) -> AsyncIterator[BatchResult]:
+        """Пакет GET запросов: результаты выдаются по мере готовности"""
+        async for result in iter_batch(
+            lambda url: self.get(
+                url, params=params, headers=headers, timeout=timeout, raw=raw
+            ),
+            urls,
+            concurrency
+        ):
+            yield result
+
+    @asynccontextmanager
+    async def get_stream(
         self,
         url: str,
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
         timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """GET запрос"""
-        response = await self._client.get(
-            self._build_url(url),
+    ) -> AsyncIterator[httpx.Response]:
+        """GET запрос без чтения тела: ответ читается потоком внутри блока"""
+        response = await self._send(
+            "GET", url, params=params, headers=headers, timeout=timeout, stream=True
+        )
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def iter_items(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        key: str = "items",
+        meta: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """GET запрос, выдающий элементы массива `key` по мере загрузки
+
+        Элементы декодируются по одному, пока тело еще скачивается, так что в
+        памяти одновременно находится один элемент, а не вся страница. Прочие
+        поля ответа (`found`, `pages`, ...) записываются в `meta`, если он
+        передан, после окончания ответа.
+        """
+        async with self.get_stream(url, params=params, headers=headers, timeout=timeout) as response:
+            async for item in iter_json_items(response.aiter_bytes(), key, meta):
+                yield item
+
+    async def get_conditional(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        """GET запрос с If-None-Match/If-Modified-Since"""
+        conditional_headers = dict(headers or {})
+        if etag:
+            conditional_headers["If-None-Match"] = etag
+        if last_modified:
+            conditional_headers["If-Modified-Since"] = last_modified
+        response = await self._send_get(
+            url,
             params=params,
-            headers=self._merge_headers(headers),
-            timeout=self._get_timeout(timeout)
+            headers=conditional_headers,
+            timeout=timeout,
+            allow_not_modified=True
+        )
+        if response.status_code == 304:
+            data = None
+        else:
+            data = response.content if raw else self._decode_response(response)
+        return ConditionalResponse(
+            not_modified=response.status_code == 304,
+            data=data,
+            etag=response.headers.get("ETag", etag),
+            last_modified=response.headers.get("Last-Modified", last_modified)
         )
-        response.raise_for_status()
-        return response.json()
 
     async def post(
         self,
@@ -54,18 +285,14 @@ class HttpxClient(BaseHttpClient):
         json: Optional[Dict[str, Any]] = None,
         data: Optional[Union[str, bytes]] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """POST запрос"""
-        response = await self._client.post(
-            self._build_url(url),
-            json=json,
-            content=data,
-            headers=self._merge_headers(headers),
-            timeout=self._get_timeout(timeout)
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """POST запрос (raw=True - вернуть тело ответа без декодирования)"""
+        response = await self._send(
+            "POST", url, json=json, data=data, headers=headers, timeout=timeout
         )
-        response.raise_for_status()
-        return response.json()
+        return response.content if raw else self._decode_response(response)
 
     async def put(
         self,
@@ -73,34 +300,29 @@ class HttpxClient(BaseHttpClient):
         json: Optional[Dict[str, Any]] = None,
         data: Optional[Union[str, bytes]] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """PUT запрос"""
-        response = await self._client.put(
-            self._build_url(url),
-            json=json,
-            content=data,
-            headers=self._merge_headers(headers),
-            timeout=self._get_timeout(timeout)
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """PUT запрос (raw=True - вернуть тело ответа без декодирования)"""
+        response = await self._send(
+            "PUT", url, json=json, data=data, headers=headers, timeout=timeout
         )
-        response.raise_for_status()
-        return response.json()
+        return response.content if raw else self._decode_response(response)
 
     async def delete(
         self,
         url: str,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """DELETE запрос"""
-        response = await self._client.delete(
-            self._build_url(url),
-            headers=self._merge_headers(headers),
-            timeout=self._get_timeout(timeout)
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """DELETE запрос (raw=True - вернуть тело ответа без декодирования)"""
+        response = await self._send(
+            "DELETE", url, headers=headers, timeout=timeout
         )
-        response.raise_for_status()
-        return response.json()
-        
+        return response.content if raw else self._decode_response(response)
+
     async def close(self):
-        """Закрыть клиент"""
-        await self._client.aclose()
+        """Закрыть клиент (общий клиент пула закрывается самим пулом)"""
+        if self._owns_client:
+            await self._client.aclose()
@@ -0,0 +1,130 @@
+"""
+Объединение одинаковых одновременных GET запросов (single-flight)
+"""
+import asyncio
+import copy
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
+from app.infrastructure.http.decorators import HttpClientDecorator
+from app.infrastructure.http.interfaces import ConditionalResponse, IHttpClient
+from app.infrastructure.http.keys import normalize_request_key
+
+
+@dataclass
+class CoalescingStats:
+    """Счетчики объединения запросов"""
+
+    leaders: int = 0
+    coalesced: int = 0
+    abandoned: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Текущие значения счетчиков"""
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
+
+
+class _Flight:
+    """Выполняющийся запрос и число ожидающих его вызовов"""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class CoalescingHttpClient(HttpClientDecorator):
+    """Выполняет один запрос на все одновременные GET с одинаковым ключом
+
+    Каждый вызов получает собственную копию результата, исключение запроса
+    получают все ожидающие. Отмена одного вызова не затрагивает остальных,
+    запрос отменяется, только когда его перестали ждать все. Таймаут берется
+    у вызова, запустившего запрос. Заголовки из `vary_headers` входят в ключ.
+    Условные запросы объединяются отдельно, с учетом валидаторов, чтобы
+    кеш поверх этого клиента тоже получал single-flight.
+    """
+
+    def __init__(self, inner: IHttpClient, vary_headers: Iterable[str] = ()):
+        super().__init__(inner)
+        self._vary_headers = tuple(vary_headers)
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = CoalescingStats()
+
+    def _start(self, key: str, call: Callable[[], Awaitable[Any]]) -> _Flight:
+        """Запустить запрос, к которому присоединятся следующие вызовы"""
+        task = asyncio.ensure_future(call())
+        flight = _Flight(task)
+        self._flights[key] = flight
+
+        def _finish(done: "asyncio.Task[Any]") -> None:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if not done.cancelled():
+                # Исключение уже доставлено ожидающим, помечаем его полученным
+                done.exception()
+
+        task.add_done_callback(_finish)
+        return flight
+
+    async def _coalesce(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Присоединиться к выполняющемуся запросу с ключом `key` или запустить его"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._start(key, call)
+            self.stats.leaders += 1
+        else:
+            self.stats.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Больше никто не ждет: отменяем запрос и не даем новым
+                # вызовам присоединиться к отменяемой задаче
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                self.stats.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+        return copy.deepcopy(result)
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """GET запрос, объединенный с одинаковыми выполняющимися запросами"""
+        key = normalize_request_key(url, params, headers, self._vary_headers)
+        return await self._coalesce(
+            f"{key}|raw" if raw else key,
+            lambda: self._inner.get(
+                url, params=params, headers=headers, timeout=timeout, raw=raw
+            )
+        )
+
+    async def get_conditional(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        """Условный GET запрос, объединенный с такими же (с теми же валидаторами)"""
+        key = normalize_request_key(url, params, headers, self._vary_headers)
+        return await self._coalesce(
+            f"{key}|conditional|{etag or ''}|{last_modified or ''}|{int(raw)}",
+            lambda: super(CoalescingHttpClient, self).get_conditional(
+                url, params, headers, timeout, etag, last_modified, raw
+            )
+        )
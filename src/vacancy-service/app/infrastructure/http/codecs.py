@@ -0,0 +1,112 @@
+"""
+JSON кодеки для HTTP клиентов: orjson/msgspec при наличии, иначе stdlib
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JsonCodec(ABC):
+    """Интерфейс JSON кодека"""
+
+    name: str = ""
+
+    @abstractmethod
+    def loads(self, content: bytes) -> Any:
+        """Декодировать JSON из байтов"""
+        pass
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Закодировать значение в JSON байты"""
+        pass
+
+
+class StdlibJsonCodec(JsonCodec):
+    """Кодек на стандартном модуле json"""
+
+    name = "json"
+
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonCodec(JsonCodec):
+    """Кодек на orjson"""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+
+    def loads(self, content: bytes) -> Any:
+        return orjson.loads(content)
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+
+class MsgspecCodec(JsonCodec):
+    """Кодек на msgspec.json"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("msgspec is not installed")
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, content: bytes) -> Any:
+        return self._decoder.decode(content)
+
+    def dumps(self, value: Any) -> bytes:
+        return self._encoder.encode(value)
+
+
+CODECS: Dict[str, Type[JsonCodec]] = {
+    StdlibJsonCodec.name: StdlibJsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+
+def available_codecs() -> Dict[str, JsonCodec]:
+    """Все кодеки, доступные в текущем окружении"""
+    codecs: Dict[str, JsonCodec] = {}
+    for name, codec_class in CODECS.items():
+        try:
+            codecs[name] = codec_class()
+        except ImportError:
+            continue
+    return codecs
+
+
+_default_codec: Optional[JsonCodec] = None
+
+
+def get_default_codec() -> JsonCodec:
+    """Самый быстрый доступный кодек: orjson, затем msgspec, затем stdlib"""
+    global _default_codec
+    if _default_codec is None:
+        if orjson is not None:
+            _default_codec = OrjsonCodec()
+        elif msgspec is not None:
+            _default_codec = MsgspecCodec()
+        else:
+            _default_codec = StdlibJsonCodec()
+    return _default_codec
@@ -0,0 +1,146 @@
+"""
+Компактное представление вакансий hh.ru на msgspec (extra `msgspec`)
+
+Модуль импортируется только при установленном msgspec, поэтому остальной
+код ссылается на него лениво или под TYPE_CHECKING.
+"""
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+from app.infrastructure.http.interfaces import IHttpClient
+
+try:
+    import msgspec
+except ImportError as error:
+    raise ImportError("Compact vacancies need msgspec (extra `msgspec`)") from error
+
+
+class Ref(msgspec.Struct, frozen=True, gc=False):
+    """Ссылка на справочник hh.ru (регион, график, занятость, опыт)
+
+    Хранится только id; одинаковые ссылки разделяют один объект.
+    """
+
+    id: str
+
+
+class Salary(msgspec.Struct, gc=False):
+    """Вилка зарплаты
+
+    Границы - float: hh.ru обычно отдает целые, но дробная граница не должна
+    отклонять всю страницу (целые значения float тоже принимает).
+    """
+
+    lower: Optional[float] = msgspec.field(default=None, name="from")
+    upper: Optional[float] = msgspec.field(default=None, name="to")
+    currency: Optional[str] = None
+    gross: Optional[bool] = None
+
+
+class Employer(msgspec.Struct, gc=False):
+    """Работодатель"""
+
+    id: Optional[str] = None
+    name: str = ""
+
+
+class Snippet(msgspec.Struct, gc=False):
+    """Фрагменты требований и обязанностей из поиска"""
+
+    requirement: Optional[str] = None
+    responsibility: Optional[str] = None
+
+
+class KeySkill(msgspec.Struct, frozen=True, gc=False):
+    """Ключевой навык"""
+
+    name: str
+
+
+class CompactVacancy(msgspec.Struct, gc=False):
+    """Вакансия hh.ru только с полями, которые использует сервис
+
+    Остальные поля ответа пропускаются при декодировании и не занимают
+    память. Объекты не отслеживаются сборщиком циклов (gc=False): ссылок
+    на самих себя у них нет.
+    """
+
+    id: str
+    name: str = ""
+    area: Optional[Ref] = None
+    salary: Optional[Salary] = None
+    schedule: Optional[Ref] = None
+    experience: Optional[Ref] = None
+    employment: Optional[Ref] = None
+    employer: Optional[Employer] = None
+    snippet: Optional[Snippet] = None
+    published_at: Optional[str] = None
+    alternate_url: Optional[str] = None
+    description: Optional[str] = None  # есть только в карточке вакансии
+    key_skills: Tuple[KeySkill, ...] = ()
+
+
+class CompactSearchPage(msgspec.Struct, gc=False):
+    """Страница поиска вакансий"""
+
+    items: List[CompactVacancy] = msgspec.field(default_factory=list)
+    found: int = 0
+    pages: int = 0
+    page: int = 0
+    per_page: int = 0
+
+
+# Общие объекты справочных ссылок: значений в справочниках hh.ru немного
+_refs: Dict[str, Ref] = {}
+
+
+def _intern_ref(ref: Optional[Ref]) -> Optional[Ref]:
+    if ref is None:
+        return None
+    return _refs.setdefault(ref.id, ref)
+
+
+def intern_vacancy(vacancy: CompactVacancy) -> CompactVacancy:
+    """Заменить справочные ссылки и валюту общими объектами"""
+    vacancy.area = _intern_ref(vacancy.area)
+    vacancy.schedule = _intern_ref(vacancy.schedule)
+    vacancy.experience = _intern_ref(vacancy.experience)
+    vacancy.employment = _intern_ref(vacancy.employment)
+    if vacancy.salary is not None and vacancy.salary.currency is not None:
+        vacancy.salary.currency = sys.intern(vacancy.salary.currency)
+    return vacancy
+
+
+_page_decoder = msgspec.json.Decoder(CompactSearchPage)
+_vacancy_decoder = msgspec.json.Decoder(CompactVacancy)
+
+
+def decode_search_page(content: bytes) -> CompactSearchPage:
+    """Страница поиска из тела ответа (`client.get(..., raw=True)`)"""
+    page = _page_decoder.decode(content)
+    for vacancy in page.items:
+        intern_vacancy(vacancy)
+    return page
+
+
+def decode_vacancy(content: bytes) -> CompactVacancy:
+    """Карточка вакансии из тела ответа"""
+    return intern_vacancy(_vacancy_decoder.decode(content))
+
+
+async def get_search_page(
+    client: IHttpClient,
+    url: str = "/vacancies",
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> CompactSearchPage:
+    """Загрузить страницу поиска через `client` (со всеми его декораторами)"""
+    return decode_search_page(await client.get(url, params=params, headers=headers, raw=True))
+
+
+async def get_vacancy(
+    client: IHttpClient,
+    vacancy_id: str,
+    headers: Optional[Dict[str, str]] = None
+) -> CompactVacancy:
+    """Загрузить карточку вакансии через `client` (со всеми его декораторами)"""
+    return decode_vacancy(await client.get(f"/vacancies/{vacancy_id}", headers=headers, raw=True))
@@ -0,0 +1,132 @@
+"""
+Базовый декоратор HTTP клиента
+"""
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Union
+from app.infrastructure.http.batch import iter_batch
+from app.infrastructure.http.interfaces import (
+    BatchResult,
+    ConditionalResponse,
+    IConditionalHttpClient,
+    IHttpClient,
+)
+
+
+class HttpClientDecorator(IConditionalHttpClient):
+    """Декоратор, делегирующий все запросы вложенному клиенту
+
+    Наследники переопределяют только те методы, поведение которых меняют,
+    поэтому декораторы можно собирать в цепочку в любом порядке.
+    """
+
+    def __init__(self, inner: IHttpClient):
+        self._inner = inner
+
+    @property
+    def inner(self) -> IHttpClient:
+        """Вложенный клиент"""
+        return self._inner
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """GET запрос"""
+        return await self._inner.get(
+            url, params=params, headers=headers, timeout=timeout, raw=raw
+        )
+
+    async def get_many(
+        self,
+        urls: Iterable[str],
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        concurrency: int = 10,
+        raw: bool = False
+    ) -> AsyncIterator[BatchResult]:
+        """Пакет GET запросов, каждый из которых проходит через get() декоратора"""
+        async for result in iter_batch(
+            lambda url: self.get(
+                url, params=params, headers=headers, timeout=timeout, raw=raw
+            ),
+            urls,
+            concurrency
+        ):
+            yield result
+
+    async def get_conditional(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        """Условный GET запрос
+
+        Если вложенный клиент не умеет условные запросы, выполняется обычный GET.
+        """
+        if isinstance(self._inner, IConditionalHttpClient):
+            return await self._inner.get_conditional(
+                url,
+                params=params,
+                headers=headers,
+                timeout=timeout,
+                etag=etag,
+                last_modified=last_modified,
+                raw=raw
+            )
+        data = await self._inner.get(
+            url, params=params, headers=headers, timeout=timeout, raw=raw
+        )
+        return ConditionalResponse(not_modified=False, data=data)
+
+    async def post(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """POST запрос"""
+        return await self._inner.post(
+            url, json=json, data=data, headers=headers, timeout=timeout, raw=raw
+        )
+
+    async def put(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """PUT запрос"""
+        return await self._inner.put(
+            url, json=json, data=data, headers=headers, timeout=timeout, raw=raw
+        )
+
+    async def delete(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """DELETE запрос"""
+        return await self._inner.delete(url, headers=headers, timeout=timeout, raw=raw)
+
+    async def close(self):
+        """Закрыть вложенный клиент"""
+        close = getattr(self._inner, "close", None)
+        if close is not None:
+            await close()
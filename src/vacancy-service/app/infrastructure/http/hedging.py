@@ -0,0 +1,147 @@
+"""
+Хеджирование идемпотентных запросов для снижения хвостовых задержек
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Скользящее окно последних задержек с вычислением перцентилей
+
+    Отсортированная копия окна пересчитывается раз в `refresh_every`
+    замеров, а не на каждый запрос.
+    """
+
+    def __init__(self, window: int = 1000, refresh_every: int = 50):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._sorted: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        """Добавить замер"""
+        self._samples.append(latency)
+        self._since_refresh += 1
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Перцентиль задержки (None, если замеров еще нет)"""
+        if not self._samples:
+            return None
+        if self._since_refresh >= self._refresh_every or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._since_refresh = 0
+        index = min(len(self._sorted) - 1, int(len(self._sorted) * percent / 100))
+        return self._sorted[index]
+
+
+@dataclass
+class HedgingStats:
+    """Счетчики хеджирования"""
+
+    requests: int = 0
+    hedges_fired: int = 0
+    hedges_won: int = 0
+    budget_denied: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Текущие значения счетчиков"""
+        return {
+            "requests": self.requests,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "budget_denied": self.budget_denied,
+        }
+
+
+class HedgingPolicy:
+    """Отправляет дублирующий запрос, если ответа нет дольше перцентиля задержки
+
+    Задержка перед дублем - `percentile` недавних задержек в пределах
+    [min_delay, max_delay]; пока замеров меньше `min_samples`, используется
+    `initial_delay`. Дубли ограничены бюджетом: не больше `budget_ratio` от
+    числа запросов (плюс небольшой запас `burst`). Первый успешный ответ
+    возвращается, проигравший запрос отменяется. Пока основной запрос держит
+    HTTP/1.1 соединение, дубль уходит через другое соединение пула.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 0.05,
+        max_delay: float = 2.0,
+        initial_delay: float = 1.0,
+        min_samples: int = 20,
+        budget_ratio: float = 0.05,
+        burst: float = 5.0
+    ):
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._initial_delay = initial_delay
+        self._min_samples = min_samples
+        self._budget_ratio = budget_ratio
+        self._burst = burst
+        self._balance = burst
+        self.latencies = LatencyTracker()
+        self.stats = HedgingStats()
+
+    def delay(self) -> float:
+        """Сколько ждать ответа перед отправкой дубля"""
+        if len(self.latencies) < self._min_samples:
+            return self._initial_delay
+        value = self.latencies.percentile(self._percentile) or self._initial_delay
+        return min(self._max_delay, max(self._min_delay, value))
+
+    def _try_spend(self) -> bool:
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Выполнить запрос с хеджированием"""
+        self.stats.requests += 1
+        self._balance = min(self._burst, self._balance + self._budget_ratio)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(call())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay())
+            if not done:
+                if not self._try_spend():
+                    self.stats.budget_denied += 1
+                else:
+                    tasks.append(asyncio.ensure_future(call()))
+                    self.stats.hedges_fired += 1
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    exc = task.exception()
+                    if exc is None:
+                        if task is not primary:
+                            self.stats.hedges_won += 1
+                        self.latencies.record(time.perf_counter() - started)
+                        return task.result()
+                    if task is primary or error is None:
+                        error = exc
+            raise error or asyncio.CancelledError()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Помечаем ошибку проигравшего запроса полученной
+                    task.exception()
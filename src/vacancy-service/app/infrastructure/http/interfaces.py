@@ -2,10 +2,26 @@
 Интерфейсы для HTTP клиентов
 """
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Union
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Union
 from urllib.parse import urljoin
 
 
+@dataclass
+class BatchResult:
+    """Результат одного запроса из пакета get_many"""
+
+    index: int
+    url: str
+    data: Optional[Union[Dict[str, Any], bytes]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Запрос выполнен без ошибки"""
+        return self.error is None
+
+
 class IHttpClient(ABC):
     """Интерфейс для HTTP клиента"""
     
@@ -15,9 +31,27 @@ class IHttpClient(ABC):
         url: str,
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """GET запрос"""
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """GET запрос (raw=True - вернуть тело ответа без декодирования)"""
+        pass
+
+    @abstractmethod
+    def get_many(
+        self,
+        urls: Iterable[str],
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        concurrency: int = 10,
+        raw: bool = False
+    ) -> AsyncIterator[BatchResult]:
+        """Пакет GET запросов: результаты выдаются по мере готовности
+
+        Ошибка отдельного запроса возвращается в BatchResult.error и не
+        прерывает остальные. С raw=True в BatchResult.data лежат байты тела.
+        """
         pass
 
     @abstractmethod
@@ -27,9 +61,10 @@ class IHttpClient(ABC):
         json: Optional[Dict[str, Any]] = None,
         data: Optional[Union[str, bytes]] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """POST запрос"""
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """POST запрос (raw=True - вернуть тело ответа без декодирования)"""
         pass
 
     @abstractmethod
@@ -39,9 +74,10 @@ class IHttpClient(ABC):
         json: Optional[Dict[str, Any]] = None,
         data: Optional[Union[str, bytes]] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """PUT запрос"""
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """PUT запрос (raw=True - вернуть тело ответа без декодирования)"""
         pass
 
     @abstractmethod
@@ -49,7 +85,40 @@ class IHttpClient(ABC):
         self,
         url: str,
         headers: Optional[Dict[str, str]] = None,
-        timeout: Optional[float] = None
-    ) -> Dict[str, Any]:
-        """DELETE запрос"""
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """DELETE запрос (raw=True - вернуть тело ответа без декодирования)"""
+        pass
+
+
+@dataclass
+class ConditionalResponse:
+    """Результат условного GET запроса"""
+
+    not_modified: bool
+    data: Optional[Union[Dict[str, Any], bytes]] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class IConditionalHttpClient(IHttpClient):
+    """HTTP клиент с поддержкой условных GET запросов (ETag/Last-Modified)"""
+
+    @abstractmethod
+    async def get_conditional(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        """GET запрос с If-None-Match/If-Modified-Since
+
+        При ответе 304 возвращает not_modified=True без данных. С raw=True в
+        data лежат байты тела без декодирования.
+        """
         pass
@@ -0,0 +1,293 @@
+"""
+Потоковый разбор массива элементов из JSON ответа
+"""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+_WHITESPACE = " \t\n\r"
+
+# Поиск конца значения: скобки и кавычки вне строк, кавычки и escape в строке,
+# разделители после числа или литерала
+_STRUCTURAL = re.compile(r'[][{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[\s,\]}]')
+
+# Состояния разбора
+_START = "start"
+_KEY = "key"
+_VALUE = "value"
+_SEPARATOR = "separator"
+_ITEMS = "items"
+_DONE = "done"
+
+
+class IncompleteJson(Exception):
+    """В буфере пока недостаточно данных для очередного значения"""
+
+
+class JsonItemsParser:
+    """Инкрементальный парсер: выдает элементы массива `key` верхнего уровня
+
+    Конец очередного значения ищется по мере поступления чанков: каждый чанк
+    просматривается один раз с учетом глубины вложенности и строк, а
+    `json.JSONDecoder.raw_decode` вызывается один раз, когда значение пришло
+    целиком. Пока значение не закончилось, чанки копятся списком и
+    склеиваются один раз, так что разбор линеен по размеру ответа. Элементы
+    удаляются из буфера сразу после декодирования. Остальные поля объекта
+    верхнего уровня (`found`, `pages`, ...) собираются в `meta`. Память
+    ограничена размером одного элемента и одного чанка.
+    """
+
+    def __init__(self, key: str = "items", max_buffer: int = 64 * 1024 * 1024):
+        self._key = key
+        self._max_buffer = max_buffer
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._current_key: Optional[str] = None
+        self._final = False
+        self.meta: Dict[str, Any] = {}
+
+        # Значение, конец которого ищется: позиции в буфере с учетом _pending
+        self._value_start = -1
+        self._value_end = -1
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._scalar = False
+        self._pending: List[str] = []  # чанки после буфера, пока значение не закончилось
+        self._pending_size = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Добавить очередной чанк и вернуть полностью полученные элементы"""
+        text = self._utf8.decode(chunk)
+        if self._value_start >= 0 and self._value_end < 0:
+            # Значение уже просмотрено до конца полученных данных
+            end = self._scan(text, 0)
+            offset = self._scanned
+            self._scanned += len(text)
+            if end is None:
+                self._pending.append(text)
+                self._pending_size += len(text)
+                self._check_size()
+                return []
+            self._value_end = offset + end
+        self._pending.append(text)
+        self._join()
+        self._check_size()
+        return self._drain()
+
+    def close(self) -> List[Any]:
+        """Завершить разбор и вернуть оставшиеся элементы"""
+        self._pending.append(self._utf8.decode(b"", final=True))
+        self._join()
+        self._final = True
+        items = self._drain()
+        self._skip_whitespace()
+        if self._state != _DONE:
+            raise ValueError("Unexpected end of JSON stream")
+        if self._pos < len(self._buffer):
+            raise ValueError("Extra data after JSON object")
+        return items
+
+    def _join(self) -> None:
+        """Склеить накопленные чанки с буфером"""
+        if self._pending:
+            self._buffer = "".join((self._buffer, *self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def _check_size(self) -> None:
+        if len(self._buffer) + self._pending_size - self._pos > self._max_buffer:
+            raise ValueError("JSON value exceeds stream buffer limit")
+
+    def _scan(self, text: str, pos: int) -> Optional[int]:
+        """Продолжить поиск конца значения в `text` с позиции `pos`
+
+        Возвращает позицию сразу после значения или None, если в `text` его
+        конца нет; состояние (глубина, строка, escape) сохраняется для
+        следующего куска. Конец числа или литерала - первый разделитель.
+        """
+        if self._scalar:
+            match = _SCALAR_END.search(text, pos)
+            return None if match is None else match.start()
+        if self._escape:
+            if pos >= len(text):
+                return None
+            pos += 1
+            self._escape = False
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    return None
+                pos = match.end()
+                if match.group() == "\\":
+                    if pos >= len(text):
+                        self._escape = True
+                        return None
+                    pos += 1
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    return pos
+            else:
+                match = _STRUCTURAL.search(text, pos)
+                if match is None:
+                    return None
+                pos = match.end()
+                char = match.group()
+                if char == '"':
+                    self._in_string = True
+                elif char in "[{":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth <= 0:
+                        return pos
+
+    def _find_value_end(self) -> int:
+        """Позиция конца значения, начинающегося в текущей позиции
+
+        Просматривает только данные, полученные после прошлого вызова.
+        Значение, которое еще не закончилось, - IncompleteJson. Число или
+        литерал, заканчивающиеся ровно на конце буфера, тоже считаются
+        неполными (например `12` может оказаться началом `123`).
+        """
+        if self._value_start != self._pos:
+            self._value_start = self._pos
+            self._value_end = -1
+            self._scanned = self._pos
+            self._depth = 0
+            self._in_string = False
+            self._escape = False
+            self._scalar = self._buffer[self._pos] not in '[{"'
+        if self._value_end < 0:
+            end = self._scan(self._buffer, self._scanned)
+            self._scanned = len(self._buffer)
+            if end is not None:
+                self._value_end = end
+            elif self._final and self._scalar:
+                self._value_end = len(self._buffer)
+            elif self._final:
+                raise ValueError("Unexpected end of JSON stream")
+            else:
+                raise IncompleteJson()
+        return self._value_end
+
+    def _skip_whitespace(self) -> None:
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            if self._final:
+                raise ValueError("Unexpected end of JSON stream")
+            raise IncompleteJson()
+        return self._buffer[self._pos]
+
+    def _decode_value(self) -> Any:
+        """Декодировать значение с текущей позиции, когда оно получено целиком"""
+        self._peek()
+        self._find_value_end()
+        # Значение закончилось, raw_decode сам остановится на его конце
+        value, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+        self._value_start = -1
+        return value
+
+    def _step(self) -> Optional[List[Any]]:
+        """Сделать один шаг разбора
+
+        Возвращает список с элементом массива, если он получен. При нехватке
+        данных бросает IncompleteJson, не меняя состояние: позиция
+        восстанавливается в `_drain`.
+        """
+        if self._state == _START:
+            if self._peek() != "{":
+                raise ValueError("JSON stream must contain an object")
+            self._pos += 1
+            self._state = _KEY
+        elif self._state == _KEY:
+            if self._peek() == "}":
+                self._pos += 1
+                self._state = _DONE
+                return None
+            key = self._decode_value()
+            if not isinstance(key, str) or self._peek() != ":":
+                raise ValueError("Malformed JSON object key")
+            self._pos += 1
+            if key == self._key and self._peek() == "[":
+                self._pos += 1
+                self._state = _ITEMS
+            else:
+                self._current_key = key
+                self._state = _VALUE
+        elif self._state == _VALUE:
+            self.meta[self._current_key] = self._decode_value()
+            self._state = _SEPARATOR
+        elif self._state == _SEPARATOR:
+            char = self._peek()
+            self._pos += 1
+            if char == ",":
+                self._state = _KEY
+            elif char == "}":
+                self._state = _DONE
+            else:
+                raise ValueError(f"Unexpected character {char!r} in JSON stream")
+        elif self._state == _ITEMS:
+            char = self._peek()
+            if char == "]":
+                self._pos += 1
+                self._state = _SEPARATOR
+            elif char == ",":
+                self._pos += 1
+            else:
+                return [self._decode_value()]
+        return None
+
+    def _drain(self) -> List[Any]:
+        items: List[Any] = []
+        while self._state != _DONE:
+            position = self._pos
+            try:
+                step = self._step()
+            except IncompleteJson:
+                self._pos = position
+                break
+            if step:
+                items.extend(step)
+        # Отбрасываем уже разобранную часть буфера
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            if self._value_start >= 0:
+                self._value_start -= self._pos
+                self._scanned -= self._pos
+                if self._value_end >= 0:
+                    self._value_end -= self._pos
+            self._pos = 0
+        return items
+
+
+async def iter_json_items(
+    chunks: AsyncIterator[bytes],
+    key: str = "items",
+    meta: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Any]:
+    """Выдавать элементы массива `key` по мере поступления чанков
+
+    Если передан `meta`, в него записываются остальные поля ответа.
+    """
+    parser = JsonItemsParser(key)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
+    if meta is not None:
+        meta.update(parser.meta)
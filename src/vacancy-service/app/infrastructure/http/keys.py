@@ -0,0 +1,57 @@
+"""
+Нормализация запросов для ключей кеша и объединения запросов
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def _param_value(value: Any) -> str:
+    """Привести значение параметра к строке так же, как это делает HTTPX"""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return ""
+    return str(value)
+
+
+def normalize_request_key(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    vary_headers: Iterable[str] = ()
+) -> str:
+    """Построить ключ запроса по URL, параметрам и значимым заголовкам
+
+    Схема и хост приводятся к нижнему регистру, параметры из query string и
+    `params` объединяются и сортируются по имени (порядок повторяющихся
+    значений сохраняется), так что `?b=2&a=1` и `params={"a": 1, "b": 2}`
+    дают одинаковый ключ.
+    """
+    parts = urlsplit(url)
+    pairs: List[Tuple[str, str]] = parse_qsl(parts.query, keep_blank_values=True)
+    for name, value in (params or {}).items():
+        if isinstance(value, (list, tuple)):
+            pairs.extend((name, _param_value(item)) for item in value)
+        else:
+            pairs.append((name, _param_value(value)))
+    pairs.sort(key=lambda pair: pair[0])
+
+    key = urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or "/",
+        urlencode(pairs),
+        ""
+    ))
+    if vary_headers and headers:
+        lowered = {name.lower(): value for name, value in headers.items()}
+        varying = [
+            f"{name.lower()}={lowered[name.lower()]}"
+            for name in vary_headers
+            if name.lower() in lowered
+        ]
+        if varying:
+            key = f"{key}|{'|'.join(varying)}"
+    return key
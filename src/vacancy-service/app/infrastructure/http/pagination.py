@@ -0,0 +1,76 @@
+"""
+Параллельная загрузка всех страниц поиска hh.ru
+"""
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from app.infrastructure.http.interfaces import IHttpClient
+
+# hh.ru отдает не больше 2000 результатов на один поиск
+HH_MAX_RESULTS = 2000
+
+
+async def fetch_all_pages(
+    client: IHttpClient,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    per_page: int = 100,
+    concurrency: int = 4,
+    max_results: int = HH_MAX_RESULTS
+) -> AsyncIterator[Dict[str, Any]]:
+    """Выдавать страницы ответа по порядку, загружая следующие параллельно
+
+    Первая страница загружается отдельно, из нее берется `pages`. Остальные
+    загружаются скользящим окном из `concurrency` запросов: как только
+    выдана очередная страница, запускается следующая. Ограничение частоты
+    соблюдается, если оно настроено у `client`. При выходе из цикла
+    незавершенные запросы отменяются.
+    """
+    base_params = dict(params or {})
+    base_params["per_page"] = per_page
+
+    async def fetch(page: int) -> Dict[str, Any]:
+        return await client.get(
+            url, params={**base_params, "page": page}, headers=headers, timeout=timeout
+        )
+
+    first = await fetch(0)
+    yield first
+
+    last_page = min(int(first.get("pages") or 1), -(-max_results // per_page))
+    next_page = 1
+    window: Deque["asyncio.Task[Dict[str, Any]]"] = deque()
+    try:
+        while next_page < last_page or window:
+            while next_page < last_page and len(window) < concurrency:
+                window.append(asyncio.ensure_future(fetch(next_page)))
+                next_page += 1
+            yield await window.popleft()
+    finally:
+        for task in window:
+            task.cancel()
+        if window:
+            await asyncio.gather(*window, return_exceptions=True)
+
+
+async def fetch_all_items(
+    client: IHttpClient,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    per_page: int = 100,
+    concurrency: int = 4,
+    max_results: int = HH_MAX_RESULTS
+) -> AsyncIterator[Dict[str, Any]]:
+    """Выдавать элементы `items` всех страниц по порядку"""
+    pages = fetch_all_pages(
+        client, url, params, headers, timeout, per_page, concurrency, max_results
+    )
+    async with aclosing(pages):
+        async for page in pages:
+            for item in page.get("items", []):
+                yield item
@@ -0,0 +1,195 @@
+"""
+Общий пул HTTPX клиентов с метриками соединений
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+import httpx
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Настройки пула соединений для одного base URL"""
+
+    http2: bool = False
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    verify_ssl: bool = True
+    timeout: float = 30.0
+    collect_metrics: bool = True
+
+    def limits(self) -> httpx.Limits:
+        """Лимиты пула в формате HTTPX"""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+def create_async_client(config: PoolConfig) -> httpx.AsyncClient:
+    """Создать HTTPX клиент по настройкам пула
+
+    Для http2=True нужен пакет h2 (extra `http2`).
+    """
+    return httpx.AsyncClient(
+        http2=config.http2,
+        limits=config.limits(),
+        verify=config.verify_ssl,
+        timeout=config.timeout,
+        follow_redirects=True
+    )
+
+
+class _RequestTracker:
+    """Отслеживает один запрос через trace-расширение httpcore"""
+
+    def __init__(self, metrics: "PoolMetrics"):
+        self._metrics = metrics
+        self._started = time.perf_counter()
+        self._acquired = False
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """Первое событие соединения означает, что запрос получил его из пула"""
+        if self._acquired:
+            return
+        if event_name == "connection.connect_tcp.started":
+            self._acquire(reused=False)
+        elif event_name.endswith(".send_request_headers.started"):
+            self._acquire(reused=True)
+
+    def _acquire(self, reused: bool) -> None:
+        self._acquired = True
+        self._metrics._record_acquire(time.perf_counter() - self._started, reused)
+
+
+@dataclass
+class PoolMetrics:
+    """Счетчики использования пула соединений"""
+
+    max_connections: int
+    requests_total: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    pool_wait_seconds_total: float = 0.0
+    pool_wait_seconds_max: float = 0.0
+
+    @property
+    def occupancy(self) -> float:
+        """Доля занятых соединений от лимита пула"""
+        return self.in_flight / self.max_connections if self.max_connections else 0.0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Доля запросов, ушедших в уже открытое соединение"""
+        acquired = self.connections_opened + self.connections_reused
+        return self.connections_reused / acquired if acquired else 0.0
+
+    @property
+    def pool_wait_seconds_avg(self) -> float:
+        """Среднее время ожидания соединения из пула"""
+        acquired = self.connections_opened + self.connections_reused
+        return self.pool_wait_seconds_total / acquired if acquired else 0.0
+
+    @contextmanager
+    def track(self) -> Iterator[_RequestTracker]:
+        """Учесть запрос как выполняющийся на время блока"""
+        self.requests_total += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield _RequestTracker(self)
+        finally:
+            self.in_flight -= 1
+
+    def _record_acquire(self, wait: float, reused: bool) -> None:
+        if reused:
+            self.connections_reused += 1
+        else:
+            self.connections_opened += 1
+        self.pool_wait_seconds_total += wait
+        self.pool_wait_seconds_max = max(self.pool_wait_seconds_max, wait)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Текущие значения счетчиков"""
+        return {
+            "requests_total": self.requests_total,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "occupancy": self.occupancy,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.reuse_ratio,
+            "pool_wait_seconds_total": self.pool_wait_seconds_total,
+            "pool_wait_seconds_avg": self.pool_wait_seconds_avg,
+            "pool_wait_seconds_max": self.pool_wait_seconds_max,
+        }
+
+
+class HttpClientPool:
+    """Процессный реестр HTTPX клиентов: один клиент и пул на base URL"""
+
+    def __init__(self, default_config: Optional[PoolConfig] = None):
+        self._default_config = default_config or PoolConfig()
+        self._configs: Dict[str, PoolConfig] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+
+    @staticmethod
+    def _key(base_url: str) -> str:
+        return base_url.rstrip("/")
+
+    def configure(self, base_url: str, config: PoolConfig) -> None:
+        """Задать настройки пула для base URL до первого использования"""
+        key = self._key(base_url)
+        if key in self._clients:
+            raise ValueError(f"Pool for {key!r} is already in use")
+        self._configs[key] = config
+
+    def config(self, base_url: str) -> PoolConfig:
+        """Настройки пула для base URL"""
+        return self._configs.get(self._key(base_url), self._default_config)
+
+    def client(self, base_url: str) -> httpx.AsyncClient:
+        """Получить общий клиент для base URL (создается при первом обращении)"""
+        key = self._key(base_url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            config = self.config(key)
+            client = create_async_client(config)
+            self._clients[key] = client
+        return client
+
+    def metrics(self, base_url: str) -> Optional[PoolMetrics]:
+        """Метрики пула для base URL (None, если сбор отключен)"""
+        key = self._key(base_url)
+        config = self.config(key)
+        if not config.collect_metrics:
+            return None
+        return self._metrics.setdefault(key, PoolMetrics(config.max_connections))
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Метрики всех пулов по base URL"""
+        return {key: metrics.snapshot() for key, metrics in self._metrics.items()}
+
+    async def aclose(self) -> None:
+        """Закрыть все клиенты пула"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+# Глобальный пул
+_pool: Optional[HttpClientPool] = None
+
+
+def get_http_pool() -> HttpClientPool:
+    """Получить глобальный пул HTTP клиентов"""
+    global _pool
+    if _pool is None:
+        _pool = HttpClientPool()
+    return _pool
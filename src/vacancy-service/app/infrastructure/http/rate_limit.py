@@ -0,0 +1,255 @@
+"""
+Ограничение частоты запросов: token bucket на хост и OAuth токен с AIMD
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Разобрать заголовок Retry-After (секунды или HTTP дата) в секунды"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (moment - now).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket с адаптивной скоростью (additive increase / multiplicative decrease)
+
+    Ожидающие вызовы встают в очередь на asyncio.Lock и обслуживаются по
+    порядку, ожидание не блокирует цикл событий. Скорость снижается не чаще
+    раза на всплеск перегрузки: 429 на запрос, отправленный до последнего
+    снижения, ее уже не снижает.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: float,
+        max_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self._decrease_factor = decrease_factor
+        self._increase_step = increase_step
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._decreased_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _delay(self, now: float) -> float:
+        """Сколько ждать до следующего токена"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> float:
+        """Взять токен, дождавшись его при необходимости; вернуть время ожидания"""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                delay = self._delay(self._clock())
+                if delay <= 0:
+                    self._tokens -= 1
+                    return waited
+                await self._sleep(delay)
+                waited += delay
+
+    def throttle(self, retry_after: Optional[float] = None, sent_at: Optional[float] = None) -> None:
+        """Снизить скорость после 429 и приостановиться на Retry-After
+
+        `sent_at` - время отправки запроса по часам bucket'а (None - только
+        что). Если запрос ушел до последнего снижения, скорость не меняется.
+        """
+        now = self._clock()
+        if (now if sent_at is None else sent_at) >= self._decreased_at:
+            self.rate = max(self.min_rate, self.rate * self._decrease_factor)
+            self._decreased_at = now
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def recover(self) -> None:
+        """Аддитивно вернуть скорость после успешного ответа"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self._increase_step)
+
+
+@dataclass
+class RateLimiterStats:
+    """Счетчики ограничителя частоты"""
+
+    acquired: int = 0
+    queue_depth: int = 0
+    peak_queue_depth: int = 0
+    throttle_seconds_total: float = 0.0
+    throttled_responses: int = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        """Текущие значения счетчиков"""
+        return {
+            "acquired": self.acquired,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "throttle_seconds_total": self.throttle_seconds_total,
+            "throttled_responses": self.throttled_responses,
+        }
+
+
+class RateLimiter:
+    """Набор token bucket'ов: по одному на хост и на OAuth токен
+
+    Запрос ждет токен во всех подходящих bucket'ах. Ответ 429 (и Retry-After)
+    снижает скорость обоих, успешные ответы постепенно ее восстанавливают.
+    Bucket'ы токенов хранятся по хешу токена, в памяти держатся
+    `max_token_buckets` последних.
+    """
+
+    def __init__(
+        self,
+        host_rate: float = 10.0,
+        host_burst: float = 10.0,
+        token_rate: Optional[float] = 2.0,
+        token_burst: float = 2.0,
+        min_rate: float = 0.2,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05,
+        max_throttle_retries: int = 3,
+        max_token_buckets: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self._host_rate = host_rate
+        self._host_burst = host_burst
+        self._token_rate = token_rate
+        self._token_burst = token_burst
+        self._min_rate = min_rate
+        self._decrease_factor = decrease_factor
+        self._increase_step = increase_step
+        self.max_throttle_retries = max_throttle_retries
+        self._max_token_buckets = max_token_buckets
+        self._clock = clock
+        self._sleep = sleep
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._token_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.stats = RateLimiterStats()
+
+    def _bucket(
+        self,
+        buckets: Dict[str, TokenBucket],
+        key: str,
+        rate: float,
+        burst: float
+    ) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(
+                rate=rate,
+                capacity=burst,
+                min_rate=min(self._min_rate, rate),
+                decrease_factor=self._decrease_factor,
+                increase_step=self._increase_step,
+                clock=self._clock,
+                sleep=self._sleep
+            )
+            buckets[key] = bucket
+        return bucket
+
+    def _token_bucket(self, token: str) -> TokenBucket:
+        """Bucket токена по его хешу, давно не использованные вытесняются"""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        bucket = self._bucket(self._token_buckets, key, self._token_rate, self._token_burst)
+        self._token_buckets.move_to_end(key)
+        while len(self._token_buckets) > self._max_token_buckets:
+            self._token_buckets.popitem(last=False)
+        return bucket
+
+    def buckets_for(self, host: str, token: Optional[str] = None) -> List[TokenBucket]:
+        """Bucket'ы, через которые проходит запрос"""
+        buckets = [self._bucket(self._host_buckets, host, self._host_rate, self._host_burst)]
+        if token and self._token_rate:
+            buckets.append(self._token_bucket(token))
+        return buckets
+
+    def now(self) -> float:
+        """Текущее время по часам ограничителя (для `sent_at` в on_throttled)"""
+        return self._clock()
+
+    async def acquire(self, host: str, token: Optional[str] = None) -> float:
+        """Дождаться разрешения на запрос; вернуть время ожидания"""
+        self.stats.queue_depth += 1
+        self.stats.peak_queue_depth = max(self.stats.peak_queue_depth, self.stats.queue_depth)
+        waited = 0.0
+        try:
+            for bucket in self.buckets_for(host, token):
+                waited += await bucket.acquire()
+        finally:
+            self.stats.queue_depth -= 1
+        self.stats.acquired += 1
+        self.stats.throttle_seconds_total += waited
+        return waited
+
+    def on_throttled(
+        self,
+        host: str,
+        token: Optional[str] = None,
+        retry_after: Optional[float] = None,
+        sent_at: Optional[float] = None
+    ) -> None:
+        """Учесть ответ 429 на запрос, отправленный в `sent_at` (см. now)"""
+        self.stats.throttled_responses += 1
+        for bucket in self.buckets_for(host, token):
+            bucket.throttle(retry_after, sent_at)
+
+    def on_success(self, host: str, token: Optional[str] = None) -> None:
+        """Учесть успешный ответ"""
+        for bucket in self.buckets_for(host, token):
+            bucket.recover()
+
+    def rates(self) -> Dict[str, float]:
+        """Текущая скорость по хостам"""
+        return {host: bucket.rate for host, bucket in self._host_buckets.items()}
+
+
+def rate_limit_key(url: str, headers: Dict[str, str]) -> Tuple[str, Optional[str]]:
+    """Хост и OAuth токен запроса для выбора bucket'ов"""
+    host = urlsplit(url).netloc.lower()
+    token = None
+    for name, value in headers.items():
+        if name.lower() == "authorization":
+            token = value
+            break
+    return host, token
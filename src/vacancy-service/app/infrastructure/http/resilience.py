@@ -0,0 +1,395 @@
+"""
+Повторы запросов с jitter и circuit breaker для HTTP клиента
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, TypeVar, Union
+import httpx
+from app.infrastructure.http.decorators import HttpClientDecorator
+from app.infrastructure.http.interfaces import ConditionalResponse, IHttpClient
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Запрос отклонен без обращения к серверу: circuit breaker разомкнут"""
+
+
+def is_transient_error(exc: BaseException, retry_statuses: FrozenSet[int]) -> bool:
+    """Является ли ошибка временной (сеть, таймаут или статус из списка)"""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in retry_statuses
+    return isinstance(exc, httpx.TransportError)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Правила повторов
+
+    Повторяются только идемпотентные методы; POST повторяется, только если
+    его явно добавить в `idempotent_methods`.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    idempotent_methods: FrozenSet[str] = frozenset({"GET", "PUT", "DELETE"})
+    retry_statuses: FrozenSet[int] = frozenset({500, 502, 503, 504})
+
+    def backoff(self, attempt: int) -> float:
+        """Пауза перед повтором: экспонента с full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class RetryBudget:
+    """Бюджет повторов: не больше `ratio` повторов на один исходный запрос
+
+    Каждый исходный запрос пополняет баланс на `ratio`, каждый повтор тратит
+    единицу. `min_balance` позволяет повторять редкие запросы при малой
+    нагрузке. Так повторы не умножают нагрузку на упавший сервер.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_balance: float = 10.0, max_balance: float = 100.0):
+        self._ratio = ratio
+        self._max_balance = max_balance
+        self._balance = min_balance
+
+    def deposit(self) -> None:
+        """Учесть исходный запрос"""
+        self._balance = min(self._max_balance, self._balance + self._ratio)
+
+    def try_withdraw(self) -> bool:
+        """Разрешить повтор, если бюджет не исчерпан"""
+        if self._balance < 1:
+            return False
+        self._balance -= 1
+        return True
+
+
+@dataclass
+class RetryStats:
+    """Счетчики повторов"""
+
+    calls: int = 0
+    retries: int = 0
+    budget_exhausted: int = 0
+    gave_up: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Текущие значения счетчиков"""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "budget_exhausted": self.budget_exhausted,
+            "gave_up": self.gave_up,
+        }
+
+
+class RetryingHttpClient(HttpClientDecorator):
+    """Повторяет идемпотентные запросы при временных ошибках"""
+
+    def __init__(
+        self,
+        inner: IHttpClient,
+        policy: Optional[RetryPolicy] = None,
+        budget: Optional[RetryBudget] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        super().__init__(inner)
+        self._policy = policy or RetryPolicy()
+        self._budget = budget or RetryBudget()
+        self._sleep = sleep
+        self.stats = RetryStats()
+
+    async def _call(self, method: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Выполнить запрос с повторами по политике"""
+        self.stats.calls += 1
+        self._budget.deposit()
+        retryable = method in self._policy.idempotent_methods
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except Exception as exc:
+                attempt += 1
+                if (
+                    not retryable
+                    or attempt >= self._policy.max_attempts
+                    or not is_transient_error(exc, self._policy.retry_statuses)
+                ):
+                    if retryable and attempt > 1:
+                        self.stats.gave_up += 1
+                    raise
+                if not self._budget.try_withdraw():
+                    self.stats.budget_exhausted += 1
+                    raise
+                self.stats.retries += 1
+            await self._sleep(self._policy.backoff(attempt - 1))
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """GET запрос с повторами"""
+        return await self._call(
+            "GET", lambda: super(RetryingHttpClient, self).get(url, params, headers, timeout, raw)
+        )
+
+    async def get_conditional(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        """Условный GET запрос с повторами"""
+        return await self._call(
+            "GET",
+            lambda: super(RetryingHttpClient, self).get_conditional(
+                url, params, headers, timeout, etag, last_modified, raw
+            )
+        )
+
+    async def post(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """POST запрос (повторяется, только если разрешено политикой)"""
+        return await self._call(
+            "POST",
+            lambda: super(RetryingHttpClient, self).post(url, json, data, headers, timeout, raw)
+        )
+
+    async def put(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """PUT запрос с повторами"""
+        return await self._call(
+            "PUT",
+            lambda: super(RetryingHttpClient, self).put(url, json, data, headers, timeout, raw)
+        )
+
+    async def delete(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """DELETE запрос с повторами"""
+        return await self._call(
+            "DELETE", lambda: super(RetryingHttpClient, self).delete(url, headers, timeout, raw)
+        )
+
+
+class CircuitState(str, Enum):
+    """Состояние circuit breaker"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreakerStats:
+    """Счетчики circuit breaker"""
+
+    rejected: int = 0
+    opened: int = 0
+    probes: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Текущие значения счетчиков"""
+        return {"rejected": self.rejected, "opened": self.opened, "probes": self.probes}
+
+
+class CircuitBreakerHttpClient(HttpClientDecorator):
+    """Размыкает цепь после серии временных ошибок и отклоняет запросы сразу
+
+    В состоянии OPEN запросы отклоняются CircuitOpenError без обращения к
+    серверу. По истечении `reset_timeout` пропускается `half_open_max_calls`
+    пробных запросов с коротким таймаутом `probe_timeout`, остальные так же
+    отклоняются сразу. Успешная проба замыкает цепь, ошибка снова размыкает.
+    """
+
+    def __init__(
+        self,
+        inner: IHttpClient,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        half_open_max_calls: int = 1,
+        probe_timeout: float = 2.0,
+        failure_statuses: FrozenSet[int] = frozenset({500, 502, 503, 504}),
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(inner)
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._half_open_max_calls = half_open_max_calls
+        self._probe_timeout = probe_timeout
+        self._failure_statuses = failure_statuses
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.stats = CircuitBreakerStats()
+
+    @property
+    def state(self) -> CircuitState:
+        """Текущее состояние с учетом истекшего reset_timeout"""
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._failures = 0
+        self.stats.opened += 1
+
+    def _reject(self) -> CircuitOpenError:
+        self.stats.rejected += 1
+        return CircuitOpenError("Circuit breaker is open")
+
+    async def _call(
+        self,
+        timeout: Optional[float],
+        call: Callable[[Optional[float]], Awaitable[T]]
+    ) -> T:
+        """Выполнить запрос через circuit breaker"""
+        state = self.state
+        if state == CircuitState.OPEN:
+            raise self._reject()
+
+        probe = state == CircuitState.HALF_OPEN
+        if probe:
+            if self._probes_in_flight >= self._half_open_max_calls:
+                raise self._reject()
+            self._probes_in_flight += 1
+            self.stats.probes += 1
+            timeout = min(timeout, self._probe_timeout) if timeout else self._probe_timeout
+
+        try:
+            result = await call(timeout)
+        except Exception as exc:
+            if is_transient_error(exc, self._failure_statuses):
+                self._failures += 1
+                if probe or self._failures >= self._failure_threshold:
+                    self._open()
+            else:
+                # Сервер ответил (например 4xx) - он доступен
+                self._on_success(probe)
+            raise
+        else:
+            self._on_success(probe)
+            return result
+        finally:
+            if probe:
+                self._probes_in_flight -= 1
+
+    def _on_success(self, probe: bool) -> None:
+        self._failures = 0
+        if probe:
+            self._state = CircuitState.CLOSED
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """GET запрос через circuit breaker"""
+        return await self._call(
+            timeout,
+            lambda t: super(CircuitBreakerHttpClient, self).get(url, params, headers, t, raw)
+        )
+
+    async def get_conditional(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        """Условный GET запрос через circuit breaker"""
+        return await self._call(
+            timeout,
+            lambda t: super(CircuitBreakerHttpClient, self).get_conditional(
+                url, params, headers, t, etag, last_modified, raw
+            )
+        )
+
+    async def post(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """POST запрос через circuit breaker"""
+        return await self._call(
+            timeout,
+            lambda t: super(CircuitBreakerHttpClient, self).post(url, json, data, headers, t, raw)
+        )
+
+    async def put(
+        self,
+        url: str,
+        json: Optional[Dict[str, Any]] = None,
+        data: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """PUT запрос через circuit breaker"""
+        return await self._call(
+            timeout,
+            lambda t: super(CircuitBreakerHttpClient, self).put(url, json, data, headers, t, raw)
+        )
+
+    async def delete(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        """DELETE запрос через circuit breaker"""
+        return await self._call(
+            timeout,
+            lambda t: super(CircuitBreakerHttpClient, self).delete(url, headers, t, raw)
+        )
@@ -0,0 +1,199 @@
+"""
+Время фаз HTTP запросов: гистограммы по маршрутам и экспорт для Prometheus
+"""
+import re
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+TraceCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def route_label(method: str, path: str) -> str:
+    """Метка маршрута: метод и путь, в котором числовые id заменены на {id}
+
+    `/vacancies/123` и `/vacancies/456` попадают в одну гистограмму.
+    """
+    return f"{method} {_NUMERIC_SEGMENT.sub('/{id}', path) or '/'}"
+
+
+def combine_traces(*callbacks: Optional[TraceCallback]) -> Optional[TraceCallback]:
+    """Объединить несколько trace-обработчиков httpcore в один"""
+    active = [callback for callback in callbacks if callback is not None]
+    if len(active) <= 1:
+        return active[0] if active else None
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        for callback in active:
+            await callback(event_name, info)
+
+    return trace
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Добавить замер"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Накопленные счетчики корзин (le, count), последняя - +Inf"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((repr(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка квантиля по верхней границе корзины"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class RequestTimer:
+    """Засекает фазы одного запроса по событиям trace-расширения httpcore
+
+    pool_wait - от отправки до первого события соединения, connect и tls -
+    установка соединения, ttfb - от отправки заголовков до получения
+    заголовков ответа, download - чтение тела, total - весь запрос.
+    """
+
+    def __init__(self, timings: "PhaseTimings", route: str):
+        self._timings = timings
+        self.route = route
+        self._started = time.perf_counter()
+        self._marks: Dict[str, float] = {}
+        self._acquired = False
+
+    def _observe(self, phase: str, started: Optional[float], finished: float) -> None:
+        if started is not None:
+            self._timings.observe(self.route, phase, finished - started)
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """Обработчик событий httpcore"""
+        now = time.perf_counter()
+        step, _, status = event_name.rpartition(".")
+        step = step.rpartition(".")[2]
+        if not self._acquired and (
+            step == "connect_tcp" or (step == "send_request_headers" and status == "started")
+        ):
+            self._acquired = True
+            self._timings.observe(self.route, "pool_wait", now - self._started)
+
+        if status == "started":
+            self._marks[step] = now
+        elif status != "complete":
+            return
+        elif step == "connect_tcp":
+            self._observe("connect", self._marks.get(step), now)
+        elif step == "start_tls":
+            self._observe("tls", self._marks.get(step), now)
+        elif step == "receive_response_headers":
+            self._observe("ttfb", self._marks.get("send_request_headers"), now)
+        elif step == "receive_response_body":
+            self._observe("download", self._marks.get(step), now)
+            self._observe("total", self._started, now)
+
+
+class PhaseTimings:
+    """Гистограммы времени фаз запросов по маршрутам
+
+    Клиенты без PhaseTimings не создают таймеров и не подключают trace, так
+    что выключенный сбор стоит одну проверку на None.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        metric_name: str = "http_client_phase_seconds"
+    ):
+        self._buckets = tuple(buckets)
+        self._metric_name = metric_name
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def start(self, method: str, path: str) -> RequestTimer:
+        """Таймер для нового запроса"""
+        return RequestTimer(self, route_label(method, path))
+
+    def observe(self, route: str, phase: str, seconds: float) -> None:
+        """Записать длительность фазы"""
+        histogram = self._histograms.get((route, phase))
+        if histogram is None:
+            histogram = self._histograms[(route, phase)] = Histogram(self._buckets)
+        histogram.observe(seconds)
+
+    def histogram(self, route: str, phase: str) -> Optional[Histogram]:
+        """Гистограмма фазы маршрута (None, если замеров не было)"""
+        return self._histograms.get((route, phase))
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Число замеров, среднее и p50/p95/p99 по маршрутам и фазам"""
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (route, phase), histogram in sorted(self._histograms.items()):
+            result.setdefault(route, {})[phase] = {
+                "count": histogram.count,
+                "avg": histogram.sum / histogram.count,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+        return result
+
+    def render_prometheus(self) -> str:
+        """Гистограммы в текстовом формате Prometheus"""
+        name = self._metric_name
+        lines = [
+            f"# HELP {name} Duration of HTTP client request phases.",
+            f"# TYPE {name} histogram",
+        ]
+        for (route, phase), histogram in sorted(self._histograms.items()):
+            labels = f'route="{_escape(route)}",phase="{phase}"'
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Сбросить все гистограммы"""
+        self._histograms.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Глобальный реестр
+_timings: Optional[PhaseTimings] = None
+
+
+def get_phase_timings() -> PhaseTimings:
+    """Получить глобальный реестр времени фаз"""
+    global _timings
+    if _timings is None:
+        _timings = PhaseTimings()
+    return _timings
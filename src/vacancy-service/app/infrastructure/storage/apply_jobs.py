@@ -0,0 +1,131 @@
+"""
+Очередь откликов и дневные лимиты пользователей в SQLite
+"""
+import json
+from datetime import date
+from typing import Dict, Iterable, List
+from app.domain.interfaces import IApplyJobStore
+from app.domain.models import ApplyJob
+from app.infrastructure.storage.sqlite import SqliteDatabase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS apply_jobs (
+    job_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    vacancy_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (user_id, vacancy_id)
+);
+CREATE TABLE IF NOT EXISTS applied_vacancies (
+    user_id INTEGER NOT NULL,
+    vacancy_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, vacancy_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS apply_quota (
+    user_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (day, user_id)
+) WITHOUT ROWID;
+"""
+
+# Поля, которые хранятся в отдельных колонках
+_COLUMNS = {"job_id", "user_id", "vacancy_id"}
+
+
+class SqliteApplyJobStore(IApplyJobStore):
+    """Ожидающие отклики в SQLite, по строке на отклик
+
+    Отклик удаляется из очереди только после отправки, так что отклики,
+    прерванные остановкой сервиса, после перезапуска отправляются снова.
+    Отправленные отклики запоминаются в applied_vacancies: повторная
+    постановка той же вакансии пользователю пропускается.
+    """
+
+    def __init__(self, path: str = "apply_jobs.sqlite3"):
+        self._database = SqliteDatabase(path, _SCHEMA)
+        self._db = self._database.connection
+
+    def _insert(self, jobs: List[ApplyJob]) -> List[ApplyJob]:
+        accepted = []
+        for job in jobs:
+            applied = self._db.execute(
+                "SELECT 1 FROM applied_vacancies WHERE user_id = ? AND vacancy_id = ?",
+                (job.user_id, job.vacancy_id)
+            ).fetchone()
+            if applied:
+                continue
+            cursor = self._db.execute(
+                "INSERT INTO apply_jobs (user_id, vacancy_id, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id, vacancy_id) DO NOTHING",
+                (job.user_id, job.vacancy_id, job.model_dump_json(exclude=_COLUMNS))
+            )
+            if cursor.rowcount:
+                accepted.append(job.model_copy(update={"job_id": cursor.lastrowid}))
+        return accepted
+
+    async def add(self, jobs: Iterable[ApplyJob]) -> List[ApplyJob]:
+        """Поставить отклики в очередь (ожидающие и отправленные пропускаются)"""
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        return await self._database.run(self._database.transaction, self._insert, jobs)
+
+    async def pending(self) -> List[ApplyJob]:
+        """Все ожидающие отклики в порядке постановки"""
+        rows = await self._database.run(
+            lambda: self._db.execute(
+                "SELECT job_id, user_id, vacancy_id, data FROM apply_jobs ORDER BY job_id"
+            ).fetchall()
+        )
+        return [
+            ApplyJob(job_id=job_id, user_id=user_id, vacancy_id=vacancy_id, **json.loads(data))
+            for job_id, user_id, vacancy_id, data in rows
+        ]
+
+    async def update(self, job: ApplyJob) -> None:
+        """Сохранить изменения отклика"""
+        await self._database.run(
+            self._db.execute,
+            "UPDATE apply_jobs SET data = ? WHERE job_id = ?",
+            (job.model_dump_json(exclude=_COLUMNS), job.job_id)
+        )
+
+    def _complete(self, job: ApplyJob, day: date) -> None:
+        self._db.execute("DELETE FROM apply_jobs WHERE job_id = ?", (job.job_id,))
+        self._db.execute(
+            "INSERT INTO applied_vacancies (user_id, vacancy_id) VALUES (?, ?) "
+            "ON CONFLICT (user_id, vacancy_id) DO NOTHING",
+            (job.user_id, job.vacancy_id)
+        )
+        self._db.execute(
+            "INSERT INTO apply_quota (user_id, day, used) VALUES (?, ?, 1) "
+            "ON CONFLICT (day, user_id) DO UPDATE SET used = used + 1",
+            (job.user_id, day.isoformat())
+        )
+
+    async def complete(self, job: ApplyJob, day: date) -> None:
+        """Перенести отправленный отклик в отправленные и учесть его в лимите за день"""
+        await self._database.run(self._database.transaction, self._complete, job, day)
+
+    async def remove(self, job: ApplyJob) -> None:
+        """Удалить отклик без учета в лимите"""
+        await self._database.run(
+            self._db.execute, "DELETE FROM apply_jobs WHERE job_id = ?", (job.job_id,)
+        )
+
+    def _used(self, day: date) -> Dict[int, int]:
+        # Счетчики прошлых дней больше не нужны
+        self._db.execute("DELETE FROM apply_quota WHERE day < ?", (day.isoformat(),))
+        rows = self._db.execute(
+            "SELECT user_id, used FROM apply_quota WHERE day = ?", (day.isoformat(),)
+        )
+        return dict(rows.fetchall())
+
+    async def used_quota(self, day: date) -> Dict[int, int]:
+        """Число отправленных за день откликов по пользователям"""
+        return await self._database.run(self._used, day)
+
+    async def close(self) -> None:
+        """Закрыть базу"""
+        await self._database.close()
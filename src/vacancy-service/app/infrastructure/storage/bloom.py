@@ -0,0 +1,75 @@
+"""
+Фильтр Блума для идентификаторов
+"""
+import hashlib
+import math
+from typing import Union
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(value: int) -> int:
+    """Перемешивание splitmix64: равномерные биты для последовательных id"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def _as_int(value: Union[int, str]) -> int:
+    """Число для хеширования: числовой id как число, иначе 64 бита blake2b"""
+    if isinstance(value, int):
+        return value
+    if value.isascii() and value.isdigit():
+        return int(value)
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+
+class BloomFilter:
+    """Вероятностное множество id (int или str): без ложноотрицательных ответов
+
+    Числовая строка и то же число - один элемент. Размер подбирается под `capacity` элементов с долей ложноположительных
+    ответов `false_positive_rate`. Позиции битов получаются двойным
+    хешированием одного 64-битного хеша.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        capacity = max(1, capacity)
+        bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.size = max(8, bits)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: Union[int, str]):
+        hashed = _mix64(_as_int(value))
+        first = hashed & 0xFFFFFFFF
+        second = (hashed >> 32) | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, value: Union[int, str]) -> None:
+        """Добавить элемент"""
+        bits = self._bits
+        for position in self._positions(value):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: Union[int, str]) -> bool:
+        bits = self._bits
+        for position in self._positions(value):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def saturated(self) -> bool:
+        """Элементов больше расчетного, доля ложных ответов выше заданной"""
+        return self.count > self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        """Размер битового массива в байтах"""
+        return len(self._bits)
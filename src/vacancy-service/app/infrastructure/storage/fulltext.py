@@ -0,0 +1,171 @@
+"""
+Полнотекстовый индекс вакансий на SQLite FTS5
+"""
+import html
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.domain.interfaces import IVacancySearchIndex
+from app.infrastructure.storage.sqlite import SqliteDatabase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vacancy_documents (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    skills TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS vacancy_fts USING fts5(
+    name, description, skills,
+    content='vacancy_documents', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS vacancy_documents_ai AFTER INSERT ON vacancy_documents BEGIN
+    INSERT INTO vacancy_fts (rowid, name, description, skills)
+    VALUES (new.id, new.name, new.description, new.skills);
+END;
+CREATE TRIGGER IF NOT EXISTS vacancy_documents_ad AFTER DELETE ON vacancy_documents BEGIN
+    INSERT INTO vacancy_fts (vacancy_fts, rowid, name, description, skills)
+    VALUES ('delete', old.id, old.name, old.description, old.skills);
+END;
+CREATE TRIGGER IF NOT EXISTS vacancy_documents_au AFTER UPDATE ON vacancy_documents BEGIN
+    INSERT INTO vacancy_fts (vacancy_fts, rowid, name, description, skills)
+    VALUES ('delete', old.id, old.name, old.description, old.skills);
+    INSERT INTO vacancy_fts (rowid, name, description, skills)
+    VALUES (new.id, new.name, new.description, new.skills);
+END;
+"""
+
+_TAG = re.compile(r"<[^>]+>")
+_QUERY_TERM = re.compile(r'(-?)(?:"([^"]*)"|(\S+))')
+
+# Веса колонок для bm25: совпадение в названии важнее, чем в описании
+_WEIGHTS = (10.0, 1.0, 5.0)
+
+
+def strip_html(value: Optional[str]) -> str:
+    """Текст описания hh.ru без HTML разметки"""
+    if not value:
+        return ""
+    return html.unescape(_TAG.sub(" ", value))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Перевести пользовательский запрос в выражение FTS5 MATCH
+
+    Слова и фразы в кавычках должны встречаться все, `-слово` и `-"фраза"`
+    исключают вакансии, `слово*` ищет по префиксу. None - в запросе нет ни
+    одного обязательного слова.
+    """
+    required: List[str] = []
+    excluded: List[str] = []
+    for minus, phrase, word in _QUERY_TERM.findall(query):
+        text = phrase if phrase else word
+        prefix = not phrase and text.endswith("*")
+        text = text.rstrip("*").strip()
+        if not text:
+            continue
+        term = '"' + text.replace('"', '""') + '"' + ("*" if prefix else "")
+        (excluded if minus else required).append(term)
+    if not required:
+        return None
+    expression = "(" + " AND ".join(required) + ")"
+    for term in excluded:
+        expression += f" NOT {term}"
+    return expression
+
+
+def _document(vacancy: Dict[str, Any]) -> Tuple[int, str, str, str]:
+    """Документ индекса: числовой id hh.ru становится rowid FTS5"""
+    snippet = vacancy.get("snippet") or {}
+    description = strip_html(vacancy.get("description")) or " ".join(
+        part for part in (snippet.get("requirement"), snippet.get("responsibility")) if part
+    )
+    skills = " ".join(skill.get("name", "") for skill in vacancy.get("key_skills") or [])
+    return int(vacancy["id"]), vacancy.get("name") or "", description, skills
+
+
+class SqliteVacancySearchIndex(IVacancySearchIndex):
+    """Полнотекстовый индекс по названию, описанию и ключевым навыкам
+
+    Документы хранятся в обычной таблице, FTS5 индекс поддерживается
+    триггерами, так что переиндексация вакансии - это один upsert. Описание
+    индексируется без HTML; у вакансий из поиска, где описания нет,
+    индексируется сниппет. Результаты ранжируются bm25 с большим весом
+    названия и навыков. id вакансий hh.ru числовые и хранятся как rowid,
+    наружу они отдаются строками, как во всем домене.
+    """
+
+    def __init__(self, path: str = "vacancy_search.sqlite3"):
+        self._database = SqliteDatabase(path, _SCHEMA)
+        self._db = self._database.connection
+
+    def _upsert(self, documents: List[Tuple[int, str, str, str]]) -> None:
+        self._db.executemany(
+            "INSERT INTO vacancy_documents (id, name, description, skills) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+            "description = excluded.description, skills = excluded.skills "
+            "WHERE name != excluded.name OR description != excluded.description "
+            "OR skills != excluded.skills",
+            documents
+        )
+
+    async def index(self, vacancies: Iterable[Dict[str, Any]]) -> int:
+        """Добавить или обновить вакансии (неизмененные не переиндексируются)"""
+        documents = [_document(vacancy) for vacancy in vacancies]
+        if documents:
+            await self._database.run(self._database.transaction, self._upsert, documents)
+        return len(documents)
+
+    def _select(self, match: str, vacancy_ids: Optional[List[int]], limit: int) -> List[int]:
+        sql = "SELECT rowid FROM vacancy_fts WHERE vacancy_fts MATCH ?"
+        args: List[Any] = [match]
+        if vacancy_ids is not None:
+            # Унарный плюс не дает планировщику перебирать id через FTS5 по одному:
+            # сначала выполняется MATCH, затем фильтр по списку
+            sql += " AND +rowid IN (SELECT value FROM json_each(?))"
+            args.append(json.dumps(vacancy_ids))
+        sql += " ORDER BY bm25(vacancy_fts, ?, ?, ?) LIMIT ?"
+        args.extend((*_WEIGHTS, limit))
+        return [row[0] for row in self._db.execute(sql, args)]
+
+    async def search(
+        self,
+        query: str,
+        vacancy_ids: Optional[Iterable[str]] = None,
+        limit: int = 50
+    ) -> List[str]:
+        """id вакансий по запросу, лучшие совпадения первыми"""
+        match = build_match_query(query)
+        if match is None:
+            return []
+        ids = None if vacancy_ids is None else [int(vacancy_id) for vacancy_id in vacancy_ids]
+        found = await self._database.run(self._select, match, ids, limit)
+        return [str(vacancy_id) for vacancy_id in found]
+
+    async def remove(self, vacancy_ids: Iterable[str]) -> None:
+        """Удалить вакансии из индекса"""
+        ids = json.dumps([int(vacancy_id) for vacancy_id in vacancy_ids])
+        await self._database.run(
+            self._database.transaction,
+            self._db.execute,
+            "DELETE FROM vacancy_documents WHERE id IN (SELECT value FROM json_each(?))",
+            (ids,)
+        )
+
+    async def count(self) -> int:
+        """Число проиндексированных вакансий"""
+        row = await self._database.run(
+            lambda: self._db.execute("SELECT count(*) FROM vacancy_documents").fetchone()
+        )
+        return row[0]
+
+    async def optimize(self) -> None:
+        """Слить сегменты FTS5 индекса (после крупной загрузки)"""
+        await self._database.run(
+            self._db.execute, "INSERT INTO vacancy_fts (vacancy_fts) VALUES ('optimize')"
+        )
+
+    async def close(self) -> None:
+        """Закрыть базу"""
+        await self._database.close()
@@ -0,0 +1,186 @@
+"""
+Индекс просмотренных вакансий: фильтр Блума перед точным множеством в SQLite
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Set
+from app.domain.interfaces import ISeenVacancyIndex, VacancyMark
+from app.infrastructure.storage.bloom import BloomFilter
+from app.infrastructure.storage.sqlite import SqliteDatabase
+
+# Лимит параметров в одном запросе SQLite с запасом
+_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_vacancies (
+    user_id INTEGER NOT NULL,
+    vacancy_id INTEGER NOT NULL,
+    mark INTEGER NOT NULL,
+    PRIMARY KEY (user_id, vacancy_id)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class SeenIndexStats:
+    """Счетчики индекса просмотренных вакансий"""
+
+    checked: int = 0
+    bloom_negatives: int = 0
+    false_positives: int = 0
+    db_lookups: int = 0
+    filters_loaded: int = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Текущие значения счетчиков"""
+        return {
+            "checked": self.checked,
+            "bloom_negatives": self.bloom_negatives,
+            "false_positives": self.false_positives,
+            "db_lookups": self.db_lookups,
+            "filters_loaded": self.filters_loaded,
+        }
+
+
+class SqliteSeenVacancyIndex(ISeenVacancyIndex):
+    """Постоянный индекс отмеченных вакансий по пользователям
+
+    Точное множество хранится в SQLite (таблица WITHOUT ROWID, около 20 байт
+    на отметку), перед ним в памяти стоит фильтр Блума пользователя. Новые
+    вакансии отсеиваются фильтром без обращения к диску; в базу идут только
+    положительные ответы фильтра, одним запросом на пакет. Фильтр строится из
+    базы при первом обращении к пользователю и пересобирается вдвое большим,
+    когда переполняется; в памяти держатся фильтры `max_cached_users`
+    последних пользователей.
+
+    id вакансий - строки; числовые SQLite хранит числом (колонка INTEGER),
+    остальные - текстом.
+    """
+
+    def __init__(
+        self,
+        path: str = "seen_vacancies.sqlite3",
+        expected_per_user: int = 10_000,
+        false_positive_rate: float = 0.01,
+        max_cached_users: int = 1024
+    ):
+        self._database = SqliteDatabase(path, _SCHEMA)
+        self._db = self._database.connection
+        self._expected = expected_per_user
+        self._false_positive_rate = false_positive_rate
+        self._max_cached_users = max_cached_users
+        self._filters: "OrderedDict[int, BloomFilter]" = OrderedDict()
+        self.stats = SeenIndexStats()
+
+    def _load_ids(self, user_id: int) -> List[str]:
+        rows = self._db.execute(
+            "SELECT vacancy_id FROM seen_vacancies WHERE user_id = ?", (user_id,)
+        )
+        return [str(row[0]) for row in rows]
+
+    def _select_marked(self, user_id: int, vacancy_ids: Sequence[str], at_least: int) -> Set[str]:
+        found: Set[str] = set()
+        for start in range(0, len(vacancy_ids), _CHUNK):
+            chunk = vacancy_ids[start:start + _CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT vacancy_id FROM seen_vacancies "
+                f"WHERE user_id = ? AND mark >= ? AND vacancy_id IN ({placeholders})",
+                (user_id, at_least, *chunk)
+            )
+            found.update(str(row[0]) for row in rows)
+        return found
+
+    def _upsert(self, user_id: int, vacancy_ids: Sequence[str], mark: int) -> None:
+        self._db.executemany(
+            "INSERT INTO seen_vacancies (user_id, vacancy_id, mark) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id, vacancy_id) DO UPDATE SET mark = max(mark, excluded.mark)",
+            [(user_id, vacancy_id, mark) for vacancy_id in vacancy_ids]
+        )
+
+    async def _build_filter(self, user_id: int) -> BloomFilter:
+        ids = await self._database.run(self._load_ids, user_id)
+        bloom = BloomFilter(max(self._expected, 2 * len(ids)), self._false_positive_rate)
+        for vacancy_id in ids:
+            bloom.add(vacancy_id)
+        self.stats.filters_loaded += 1
+        return bloom
+
+    async def _filter_for(self, user_id: int) -> BloomFilter:
+        """Фильтр пользователя (строится из базы при первом обращении)"""
+        bloom = self._filters.get(user_id)
+        if bloom is not None:
+            self._filters.move_to_end(user_id)
+            return bloom
+        bloom = await self._build_filter(user_id)
+        # Пока фильтр строился, его мог построить параллельный вызов
+        bloom = self._filters.setdefault(user_id, bloom)
+        self._filters.move_to_end(user_id)
+        while len(self._filters) > self._max_cached_users:
+            self._filters.popitem(last=False)
+        return bloom
+
+    async def contains(
+        self,
+        user_id: int,
+        vacancy_id: str,
+        at_least: VacancyMark = VacancyMark.SEEN
+    ) -> bool:
+        """Есть ли у вакансии отметка не ниже `at_least`"""
+        return not await self.filter_unseen(user_id, (vacancy_id,), at_least)
+
+    async def filter_unseen(
+        self,
+        user_id: int,
+        vacancy_ids: Iterable[str],
+        at_least: VacancyMark = VacancyMark.SEEN
+    ) -> List[str]:
+        """Оставить вакансии без отметки `at_least` (порядок сохраняется)"""
+        ids = list(dict.fromkeys(vacancy_ids))
+        bloom = await self._filter_for(user_id)
+        candidates = [vacancy_id for vacancy_id in ids if vacancy_id in bloom]
+        self.stats.checked += len(ids)
+        self.stats.bloom_negatives += len(ids) - len(candidates)
+        if not candidates:
+            return ids
+        self.stats.db_lookups += 1
+        marked = await self._database.run(self._select_marked, user_id, candidates, int(at_least))
+        if at_least == VacancyMark.SEEN:
+            self.stats.false_positives += len(candidates) - len(marked)
+        return [vacancy_id for vacancy_id in ids if vacancy_id not in marked]
+
+    async def mark(
+        self,
+        user_id: int,
+        vacancy_ids: Iterable[str],
+        mark: VacancyMark = VacancyMark.SEEN
+    ) -> None:
+        """Отметить вакансии (отметка не понижается)"""
+        ids = list(dict.fromkeys(vacancy_ids))
+        if not ids:
+            return
+        await self._database.run(self._database.transaction, self._upsert, user_id, ids, int(mark))
+        bloom = self._filters.get(user_id)
+        if bloom is None:
+            return
+        for vacancy_id in ids:
+            bloom.add(vacancy_id)
+        if bloom.saturated:
+            self._filters[user_id] = await self._build_filter(user_id)
+
+    async def count(self, user_id: int) -> int:
+        """Число отмеченных вакансий пользователя"""
+        row = await self._database.run(
+            lambda: self._db.execute(
+                "SELECT count(*) FROM seen_vacancies WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        )
+        return row[0]
+
+    def memory_bytes(self) -> int:
+        """Размер фильтров Блума в памяти"""
+        return sum(bloom.nbytes for bloom in self._filters.values())
+
+    async def close(self) -> None:
+        """Закрыть базу"""
+        await self._database.close()
@@ -0,0 +1,44 @@
+"""
+Асинхронная обертка над соединением SQLite
+"""
+import asyncio
+import sqlite3
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SqliteDatabase:
+    """Одно соединение SQLite, запросы к которому выполняются в потоке
+
+    Запросы сериализуются asyncio.Lock, так что соединение не используется
+    из двух потоков одновременно. Журнал WAL: чтение не блокирует запись.
+    """
+
+    def __init__(self, path: str, schema: str = ""):
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        if schema:
+            self.connection.executescript(schema)
+        self._lock = asyncio.Lock()
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Выполнить функцию с запросами к базе в отдельном потоке"""
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    def transaction(self, func: Callable[..., T], *args: Any) -> T:
+        """Выполнить функцию в транзакции (вызывается внутри run)"""
+        self.connection.execute("BEGIN")
+        try:
+            result = func(*args)
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return result
+
+    async def close(self) -> None:
+        """Закрыть соединение"""
+        await self.run(self.connection.close)
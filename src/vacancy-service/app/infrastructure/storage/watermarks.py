@@ -0,0 +1,43 @@
+"""
+Хранение отметок сохраненных поисков в SQLite
+"""
+from typing import Optional
+from app.domain.interfaces import ISearchWatermarkStore
+from app.domain.models import SearchWatermark
+from app.infrastructure.storage.sqlite import SqliteDatabase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_watermarks (
+    search_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+class SqliteWatermarkStore(ISearchWatermarkStore):
+    """Отметки поисков в SQLite, по JSON-записи на поиск"""
+
+    def __init__(self, path: str = "search_watermarks.sqlite3"):
+        self._database = SqliteDatabase(path, _SCHEMA)
+
+    async def get(self, search_key: str) -> Optional[SearchWatermark]:
+        """Отметка поиска (None, если поиск еще не опрашивался)"""
+        row = await self._database.run(
+            lambda: self._database.connection.execute(
+                "SELECT data FROM search_watermarks WHERE search_key = ?", (search_key,)
+            ).fetchone()
+        )
+        return SearchWatermark.model_validate_json(row[0]) if row else None
+
+    async def save(self, watermark: SearchWatermark) -> None:
+        """Сохранить отметку"""
+        await self._database.run(
+            self._database.connection.execute,
+            "INSERT INTO search_watermarks (search_key, data) VALUES (?, ?) "
+            "ON CONFLICT (search_key) DO UPDATE SET data = excluded.data",
+            (watermark.search_key, watermark.model_dump_json())
+        )
+
+    async def close(self) -> None:
+        """Закрыть базу"""
+        await self._database.close()
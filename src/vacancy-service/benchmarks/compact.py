@@ -0,0 +1,89 @@
+"""
+Компактные вакансии (msgspec Struct) против dict из JSON: память, декодирование, GC
+
+Запуск из каталога vacancy-service:
+    python -m benchmarks.compact [--vacancies 10000] [--repeat 5]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from app.infrastructure.http.compact import decode_search_page
+from app.infrastructure.http.codecs import available_codecs
+from benchmarks.payloads import make_search_page
+
+
+def _pages(count: int, per_page: int = 100) -> List[bytes]:
+    """Тела ответов поиска, как их возвращает client.get(..., raw=True)"""
+    pages = []
+    for seed in range(-(-count // per_page)):
+        page = make_search_page(per_page=per_page, seed=seed)
+        pages.append(json.dumps(page, ensure_ascii=False).encode("utf-8"))
+    return pages
+
+
+def _decode_time(decode: Callable[[bytes], Any], pages: List[bytes], repeat: int) -> float:
+    """Лучшее время декодирования всех страниц, в миллисекундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for content in pages:
+            decode(content)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _retained(decode: Callable[[bytes], Any], pages: List[bytes]) -> Dict[str, float]:
+    """Память, которую занимают декодированные страницы, и время полной сборки GC"""
+    gc.collect()
+    tracemalloc.start()
+    kept = [decode(content) for content in pages]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    gc.collect()
+    collect_ms = (time.perf_counter() - started) * 1000
+    tracked = len(gc.get_objects())
+    del kept
+    gc.collect()
+    return {
+        "memory_mb": size / 1024 / 1024,
+        "gc_collect_ms": collect_ms,
+        "gc_tracked_objects": tracked - len(gc.get_objects()),
+    }
+
+
+def run(count: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    pages = _pages(count)
+    paths: Dict[str, Callable[[bytes], Any]] = {
+        f"dict:{name}": codec.loads for name, codec in available_codecs().items()
+    }
+    paths["compact:msgspec"] = decode_search_page
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, decode in paths.items():
+        row = {"decode_ms": _decode_time(decode, pages, repeat)}
+        row.update(_retained(decode, pages))
+        results[name] = row
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vacancies", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.vacancies} vacancies in pages of 100")
+    print(f"{'path':<18}{'decode ms':>11}{'memory MB':>11}{'gc ms':>9}{'gc objects':>12}")
+    for name, row in run(args.vacancies, args.repeat).items():
+        print(
+            f"{name:<18}{row['decode_ms']:>11.1f}{row['memory_mb']:>11.1f}"
+            f"{row['gc_collect_ms']:>9.1f}{row['gc_tracked_objects']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
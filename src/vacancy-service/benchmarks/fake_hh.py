@@ -0,0 +1,242 @@
+"""
+Локальная замена hh.ru API для нагрузочных тестов
+
+Отдает синтетические (или записанные) ответы `/vacancies` и
+`/vacancies/{id}` с настраиваемой задержкой, ошибками 429/5xx и медленной
+отдачей тела. Поддерживает keep-alive и ETag/If-None-Match.
+
+Запуск из каталога vacancy-service:
+    python -m benchmarks.fake_hh --port 8099 --latency lognormal:0.05:0.6 --rate-429 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from benchmarks.payloads import make_search_page, make_vacancy
+
+_VACANCY_PATH = re.compile(r"^/vacancies/(\d+)$")
+
+
+@dataclass
+class LatencyDistribution:
+    """Распределение задержки ответа
+
+    Формат строки: `fixed:0.05`, `uniform:0.01:0.2`, `lognormal:<медиана>:<sigma>`.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, value: str) -> "LatencyDistribution":
+        kind, *args = value.split(":")
+        numbers = [float(arg) for arg in args] + [0.0, 0.0]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution {kind!r}")
+        return cls(kind, numbers[0], numbers[1])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return self.a * math.exp(rng.gauss(0, self.b))
+        return self.a
+
+
+@dataclass
+class FakeHHConfig:
+    """Поведение сервера"""
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    slow_body_rate: float = 0.0
+    slow_body_chunk: int = 16 * 1024
+    slow_body_delay: float = 0.05
+    found: int = 2000
+    recorded_dir: Optional[Path] = None
+    seed: int = 0
+
+
+@lru_cache(maxsize=4096)
+def _search_body(page: int, per_page: int, found: int, seed: int) -> bytes:
+    return json.dumps(
+        make_search_page(page, per_page, found, seed=seed), ensure_ascii=False
+    ).encode("utf-8")
+
+
+@lru_cache(maxsize=65536)
+def _vacancy_body(vacancy_id: int) -> bytes:
+    return json.dumps(make_vacancy(vacancy_id, full=True), ensure_ascii=False).encode("utf-8")
+
+
+class FakeHHServer:
+    """Асинхронный HTTP/1.1 сервер, имитирующий hh.ru API"""
+
+    def __init__(self, config: Optional[FakeHHConfig] = None):
+        self._config = config or FakeHHConfig()
+        self._rng = random.Random(self._config.seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.requests_total = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Запустить сервер и вернуть порт"""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _recorded(self, path: str) -> Optional[bytes]:
+        """Записанный ответ: файл `<путь через _>.json` в recorded_dir"""
+        if self._config.recorded_dir is None:
+            return None
+        name = path.strip("/").replace("/", "_") or "index"
+        file = self._config.recorded_dir / f"{name}.json"
+        return file.read_bytes() if file.is_file() else None
+
+    def _route(self, target: str) -> Tuple[int, bytes]:
+        """Статус и тело ответа для пути запроса"""
+        parts = urlsplit(target)
+        recorded = self._recorded(parts.path)
+        if recorded is not None:
+            return 200, recorded
+        query = parse_qs(parts.query)
+        if parts.path == "/vacancies":
+            page = int(query.get("page", ["0"])[0])
+            per_page = min(100, int(query.get("per_page", ["20"])[0]))
+            text = query.get("text", [""])[0]
+            seed = int(hashlib.md5(text.encode()).hexdigest()[:6], 16)
+            return 200, _search_body(page, per_page, self._config.found, seed)
+        match = _VACANCY_PATH.match(parts.path)
+        if match:
+            return 200, _vacancy_body(int(match.group(1)))
+        return 404, b'{"errors":[{"type":"not_found"}]}'
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0") or 0)
+                if length:
+                    await reader.readexactly(length)
+                self.requests_total += 1
+                await self._respond(writer, target, headers)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, target: str, headers: Dict[str, str]) -> None:
+        config = self._config
+        await asyncio.sleep(config.latency.sample(self._rng))
+
+        roll = self._rng.random()
+        if roll < config.rate_429:
+            await self._write(writer, 429, b'{"errors":[{"type":"too_many_requests"}]}', {"Retry-After": "1"})
+            return
+        if roll < config.rate_429 + config.rate_5xx:
+            await self._write(writer, 503, b'{"errors":[{"type":"service_unavailable"}]}')
+            return
+
+        status, body = self._route(target)
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if status == 200 and headers.get("if-none-match") == etag:
+            await self._write(writer, 304, b"", {"ETag": etag})
+            return
+        slow = self._rng.random() < config.slow_body_rate
+        await self._write(writer, status, body, {"ETag": etag} if status == 200 else None, slow)
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: bytes,
+        extra_headers: Optional[Dict[str, str]] = None,
+        slow: bool = False
+    ) -> None:
+        reasons = {200: "OK", 304: "Not Modified", 404: "Not Found", 429: "Too Many Requests", 503: "Service Unavailable"}
+        head = [
+            f"HTTP/1.1 {status} {reasons.get(status, 'Unknown')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+        ]
+        head.extend(f"{name}: {value}" for name, value in (extra_headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if not slow:
+            writer.write(body)
+            await writer.drain()
+            return
+        chunk = self._config.slow_body_chunk
+        for start in range(0, len(body), chunk):
+            writer.write(body[start:start + chunk])
+            await writer.drain()
+            await asyncio.sleep(self._config.slow_body_delay)
+
+
+def parse_args(argv=None) -> Tuple[argparse.Namespace, FakeHHConfig]:
+    parser = argparse.ArgumentParser(description="Fake hh.ru API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", default="lognormal:0.05:0.5")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--slow-body-rate", type=float, default=0.0)
+    parser.add_argument("--slow-body-delay", type=float, default=0.05)
+    parser.add_argument("--found", type=int, default=2000)
+    parser.add_argument("--recorded-dir", type=Path, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    config = FakeHHConfig(
+        latency=LatencyDistribution.parse(args.latency),
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        slow_body_rate=args.slow_body_rate,
+        slow_body_delay=args.slow_body_delay,
+        found=args.found,
+        recorded_dir=args.recorded_dir,
+        seed=args.seed,
+    )
+    return args, config
+
+
+async def _main(argv=None) -> None:
+    args, config = parse_args(argv)
+    server = FakeHHServer(config)
+    port = await server.start(args.host, args.port)
+    print(f"fake hh.ru listening on http://{args.host}:{port}", flush=True)
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,134 @@
+"""
+Полнотекстовый поиск по локальному индексу вакансий против перебора в Python
+
+Запуск из каталога vacancy-service:
+    python -m benchmarks.fulltext [--vacancies 100000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from app.infrastructure.storage.fulltext import SqliteVacancySearchIndex, _document
+from benchmarks.payloads import make_vacancy
+
+QUERIES = [
+    ("keyword", "kubernetes"),
+    ("phrase", '"data engineer"'),
+    ("exclusion", "python -django -fastapi"),
+    ("prefix", "оптимиз*"),
+]
+
+
+def _naive_matcher(query: str) -> Callable[[str], bool]:
+    """Та же семантика запроса, что у индекса, через поиск подстрок"""
+    required: List[re.Pattern] = []
+    excluded: List[re.Pattern] = []
+    for minus, phrase, word in re.findall(r'(-?)(?:"([^"]*)"|(\S+))', query):
+        text = (phrase or word).lower()
+        if text.endswith("*"):
+            pattern = re.compile(r"\b" + re.escape(text.rstrip("*")))
+        else:
+            pattern = re.compile(r"\b" + re.escape(text) + r"\b")
+        (excluded if minus else required).append(pattern)
+    return lambda text: (
+        all(pattern.search(text) for pattern in required)
+        and not any(pattern.search(text) for pattern in excluded)
+    )
+
+
+def _median_ms(times: List[float]) -> float:
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+def _timed(func: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Медиана времени вызова в миллисекундах и результат последнего вызова"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return _median_ms(times), result
+
+
+async def _timed_async(func: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """Медиана времени асинхронного вызова в миллисекундах"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        times.append(time.perf_counter() - started)
+    return _median_ms(times)
+
+
+async def run(count: int, repeat: int, batch: int) -> Dict[str, Any]:
+    rng = random.Random(0)
+    vacancies = [make_vacancy(100000000 + index, full=True) for index in range(count)]
+    documents = {
+        vacancy["id"]: " ".join(_document(vacancy)[1:]).lower() for vacancy in vacancies
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fts.sqlite3")
+        index = SqliteVacancySearchIndex(path)
+        started = time.perf_counter()
+        for start in range(0, count, batch):
+            await index.index(vacancies[start:start + batch])
+        ingest = time.perf_counter() - started
+        await index.optimize()
+
+        user_ids = rng.sample(sorted(documents), min(1000, count))
+        report: Dict[str, Any] = {
+            "vacancies": count,
+            "ingest_s": round(ingest, 2),
+            "ingest_rows_per_s": round(count / ingest),
+            "db_mb": round(os.path.getsize(path) / 1024 / 1024, 1),
+            "queries": {},
+        }
+        for name, query in QUERIES:
+            matcher = _naive_matcher(query)
+            fts_ms = await _timed_async(lambda: index.search(query, limit=50), repeat)
+            fts_user_ms = await _timed_async(
+                lambda: index.search(query, vacancy_ids=user_ids, limit=50), repeat
+            )
+            naive_ms, matched = _timed(
+                lambda: [vacancy_id for vacancy_id, text in documents.items() if matcher(text)],
+                max(1, repeat // 10)
+            )
+            report["queries"][f"{name}: {query}"] = {
+                "matches": len(matched),
+                "fts_top50_ms": round(fts_ms, 2),
+                "fts_user_1000_ms": round(fts_user_ms, 2),
+                "python_scan_ms": round(naive_ms, 1),
+            }
+        await index.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vacancies", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=1000, help="вакансий на транзакцию при загрузке")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.vacancies, args.repeat, args.batch))
+    print(
+        f"{report['vacancies']} vacancies: ingest {report['ingest_s']} s "
+        f"({report['ingest_rows_per_s']} rows/s), database {report['db_mb']} MB"
+    )
+    print(f"{'query':<36}{'matches':>9}{'fts ms':>9}{'fts user':>10}{'scan ms':>10}")
+    for name, row in report["queries"].items():
+        print(
+            f"{name:<36}{row['matches']:>9}{row['fts_top50_ms']:>9.2f}"
+            f"{row['fts_user_1000_ms']:>10.2f}{row['python_scan_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
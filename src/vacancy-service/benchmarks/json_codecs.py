@@ -0,0 +1,60 @@
+"""
+Сравнение JSON кодеков на ответах hh.ru
+
+Запуск из каталога vacancy-service:
+    python -m benchmarks.json_codecs [--repeat 50]
+"""
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict
+from app.infrastructure.http.codecs import available_codecs
+from benchmarks.payloads import make_search_page, make_vacancy
+
+
+def _best_of(func: Callable[[], Any], repeat: int, number: int) -> float:
+    """Лучшее среднее время одного вызова за `repeat` серий"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def run(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Время loads/dumps по кодекам и типам ответов, в миллисекундах"""
+    payloads = {
+        "search_page_100": make_search_page(per_page=100),
+        "vacancy_card": make_vacancy(1, full=True),
+    }
+    encoded = {
+        name: json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        for name, payload in payloads.items()
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    for codec_name, codec in available_codecs().items():
+        for payload_name, payload in payloads.items():
+            content = encoded[payload_name]
+            number = 20 if payload_name.startswith("search") else 200
+            results[f"{codec_name}:{payload_name}"] = {
+                "size_kb": len(content) / 1024,
+                "loads_ms": _best_of(lambda: codec.loads(content), repeat, number) * 1000,
+                "dumps_ms": _best_of(lambda: codec.dumps(payload), repeat, number) * 1000,
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'codec:payload':<34}{'size KB':>10}{'loads ms':>12}{'dumps ms':>12}")
+    for name, row in run(args.repeat).items():
+        print(f"{name:<34}{row['size_kb']:>10.1f}{row['loads_ms']:>12.3f}{row['dumps_ms']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Нагрузочный прогон HTTP стека vacancy-service против локального fake hh.ru
+
+Запросы запускаются с постоянной целевой частотой (open loop), поэтому
+задержка включает ожидание в очередях клиента. Отчет: пропускная
+способность, p50/p95/p99, ошибки, память процесса и счетчики слоев.
+
+Запуск из каталога vacancy-service:
+    python -m benchmarks.load --rps 200 --duration 20 --cache --coalesce --retry
+    python -m benchmarks.load --url http://127.0.0.1:8099 --rps 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.infrastructure.http.cache import CachingHttpClient
+from app.infrastructure.http.client import HttpxClient
+from app.infrastructure.http.coalescing import CoalescingHttpClient
+from app.infrastructure.http.hedging import HedgingPolicy
+from app.infrastructure.http.interfaces import IHttpClient
+from app.infrastructure.http.pool import PoolConfig
+from app.infrastructure.http.rate_limit import RateLimiter
+from app.infrastructure.http.resilience import CircuitBreakerHttpClient, RetryingHttpClient
+from app.infrastructure.http.timing import PhaseTimings
+
+
+def build_stack(args: argparse.Namespace, base_url: str) -> Tuple[IHttpClient, Dict[str, Any]]:
+    """Собрать цепочку клиентов по флагам; вернуть клиент и объекты со stats"""
+    layers: Dict[str, Any] = {}
+    client = HttpxClient(
+        base_url,
+        pool_config=PoolConfig(
+            max_connections=args.max_connections,
+            max_keepalive_connections=args.max_keepalive
+        ),
+        rate_limiter=RateLimiter(host_rate=args.rate_limit, host_burst=args.rate_limit) if args.rate_limit else None,
+        hedging=HedgingPolicy() if args.hedge else None,
+        timings=PhaseTimings() if args.timings else None
+    )
+    layers["pool"] = client.metrics
+    if client.hedging is not None:
+        layers["hedging"] = client.hedging
+    if client.timings is not None:
+        layers["timings"] = client.timings
+    stack: IHttpClient = client
+    if args.breaker:
+        stack = layers["breaker"] = CircuitBreakerHttpClient(stack)
+    if args.retry:
+        stack = layers["retry"] = RetryingHttpClient(stack)
+    if args.coalesce:
+        stack = layers["coalescing"] = CoalescingHttpClient(stack)
+    if args.cache:
+        stack = layers["cache"] = CachingHttpClient(
+            stack, route_ttls={"/vacancies": args.cache_ttl}
+        )
+    return stack, layers
+
+
+def _request_for(rng: random.Random, args: argparse.Namespace) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Следующий запрос смеси: поиск или карточка вакансии"""
+    if rng.random() < args.search_share:
+        query = rng.randint(0, args.distinct_queries - 1)
+        return "/vacancies", {"text": f"query-{query}", "page": rng.randint(0, 4), "per_page": 100}
+    vacancy_id = 100000000 + int(rng.paretovariate(1.2) * 10) % args.distinct_vacancies
+    return f"/vacancies/{vacancy_id}", None
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def _rss_mb() -> float:
+    """Текущий RSS процесса (Linux) или пиковый, если /proc недоступен"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_load(args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    """Выполнить прогон и собрать отчет"""
+    client, layers = build_stack(args, base_url)
+    rng = random.Random(args.seed)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    tasks: List[asyncio.Task] = []
+
+    async def one(url: str, params: Optional[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            await client.get(url, params=params)
+        except Exception as exc:
+            errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+        else:
+            latencies.append(time.perf_counter() - started)
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    total = int(args.rps * args.duration)
+    for index in range(total):
+        delay = started + index / args.rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(*_request_for(rng, args))))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await client.close()
+
+    latencies.sort()
+    report: Dict[str, Any] = {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p95": round(_percentile(latencies, 95) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+            "max": round((latencies[-1] if latencies else 0.0) * 1000, 2),
+        },
+        "memory_mb": {
+            "rss_before": round(rss_before, 1),
+            "rss_after": round(_rss_mb(), 1),
+            "peak_rss": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+    }
+    report["layers"] = {
+        name: layer.snapshot() if hasattr(layer, "snapshot") else layer.stats.snapshot()
+        for name, layer in layers.items()
+        if layer is not None
+    }
+    return report
+
+
+def _start_fake_server(args: argparse.Namespace) -> Tuple[subprocess.Popen, str]:
+    """Запустить fake hh.ru в отдельном процессе, чтобы он не делил GIL с клиентом"""
+    command = [
+        sys.executable, "-m", "benchmarks.fake_hh",
+        "--port", str(args.server_port),
+        "--latency", args.latency,
+        "--rate-429", str(args.rate_429),
+        "--rate-5xx", str(args.rate_5xx),
+        "--slow-body-rate", str(args.slow_body_rate),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline().strip()
+    return process, line.rsplit(" ", 1)[-1]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="использовать уже запущенный сервер")
+    parser.add_argument("--server-port", type=int, default=0)
+    parser.add_argument("--latency", default="lognormal:0.05:0.5")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--slow-body-rate", type=float, default=0.0)
+    parser.add_argument("--rps", type=float, default=100.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--search-share", type=float, default=0.3)
+    parser.add_argument("--distinct-queries", type=int, default=50)
+    parser.add_argument("--distinct-vacancies", type=int, default=5000)
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--max-keepalive", type=int, default=20)
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--cache-ttl", type=float, default=30.0)
+    parser.add_argument("--coalesce", action="store_true")
+    parser.add_argument("--retry", action="store_true")
+    parser.add_argument("--breaker", action="store_true")
+    parser.add_argument("--hedge", action="store_true")
+    parser.add_argument("--timings", action="store_true", help="гистограммы времени фаз запросов")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="запросов в секунду на хост")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    process = None
+    base_url = args.url
+    if base_url is None:
+        process, base_url = _start_fake_server(args)
+    try:
+        report = asyncio.run(run_load(args, base_url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
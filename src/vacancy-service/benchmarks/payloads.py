@@ -0,0 +1,137 @@
+"""
+Синтетические ответы hh.ru API для бенчмарков
+"""
+import random
+from typing import Any, Dict, List, Optional
+
+AREAS = [("1", "Москва"), ("2", "Санкт-Петербург"), ("3", "Екатеринбург"), ("4", "Новосибирск"), ("88", "Казань")]
+SCHEDULES = [("fullDay", "Полный день"), ("remote", "Удаленная работа"), ("flexible", "Гибкий график"), ("shift", "Сменный график")]
+EMPLOYMENTS = [("full", "Полная занятость"), ("part", "Частичная занятость"), ("project", "Проектная работа")]
+EXPERIENCES = [("noExperience", "Нет опыта"), ("between1And3", "От 1 года до 3 лет"), ("between3And6", "От 3 до 6 лет"), ("moreThan6", "Более 6 лет")]
+CURRENCIES = ["RUR", "RUR", "RUR", "USD", "EUR", "KZT"]
+TITLES = ["Python разработчик", "Backend developer", "Senior Python Engineer", "Data Engineer", "Golang разработчик", "DevOps инженер", "QA Automation", "Frontend разработчик (React)"]
+SKILLS = ["Python", "Django", "FastAPI", "PostgreSQL", "Redis", "Docker", "Kubernetes", "asyncio", "SQLAlchemy", "RabbitMQ", "Git", "Linux", "Go", "React", "TypeScript", "Kafka"]
+WORDS = ("разработка сервисов высоконагруженных систем опыт работы знание умение команда продукт "
+         "проектирование архитектура тестирование микросервисы оптимизация запросов базы данных").split()
+
+
+def _pair(values, rng: random.Random) -> Dict[str, str]:
+    item_id, name = rng.choice(values)
+    return {"id": item_id, "name": name}
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_vacancy(
+    vacancy_id: int,
+    rng: Optional[random.Random] = None,
+    full: bool = False
+) -> Dict[str, Any]:
+    """Вакансия в формате hh.ru (краткая из поиска или полная карточка)"""
+    rng = rng or random.Random(vacancy_id)
+    area_id, area_name = rng.choice(AREAS)
+    salary_from = rng.choice([None, 80000, 120000, 150000, 200000, 250000])
+    salary = None
+    if rng.random() < 0.7:
+        spread = rng.choice([None, 50000, 100000])
+        salary = {
+            "from": salary_from,
+            "to": (salary_from or 100000) + spread if spread else None,
+            "currency": rng.choice(CURRENCIES),
+            "gross": rng.random() < 0.5,
+        }
+    employer_id = str(rng.randint(1000, 5000000))
+    vacancy = {
+        "id": str(vacancy_id),
+        "premium": False,
+        "name": rng.choice(TITLES),
+        "department": None,
+        "has_test": rng.random() < 0.1,
+        "response_letter_required": rng.random() < 0.2,
+        "area": {"id": area_id, "name": area_name, "url": f"https://api.hh.ru/areas/{area_id}"},
+        "salary": salary,
+        "type": {"id": "open", "name": "Открытая"},
+        "address": None,
+        "response_url": None,
+        "sort_point_distance": None,
+        "published_at": f"2025-09-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00+0300",
+        "created_at": "2025-09-01T10:00:00+0300",
+        "archived": False,
+        "apply_alternate_url": f"https://hh.ru/applicant/vacancy_response?vacancyId={vacancy_id}",
+        "insider_interview": None,
+        "url": f"https://api.hh.ru/vacancies/{vacancy_id}?host=hh.ru",
+        "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+        "relations": [],
+        "employer": {
+            "id": employer_id,
+            "name": f"Компания {employer_id}",
+            "url": f"https://api.hh.ru/employers/{employer_id}",
+            "alternate_url": f"https://hh.ru/employer/{employer_id}",
+            "logo_urls": {
+                "90": f"https://img.hhcdn.ru/employer-logo/{employer_id}_90.png",
+                "240": f"https://img.hhcdn.ru/employer-logo/{employer_id}_240.png",
+                "original": f"https://img.hhcdn.ru/employer-logo-original/{employer_id}.png",
+            },
+            "vacancies_url": f"https://api.hh.ru/vacancies?employer_id={employer_id}",
+            "accredited_it_employer": rng.random() < 0.3,
+            "trusted": True,
+        },
+        "snippet": {
+            "requirement": _text(rng, 25),
+            "responsibility": _text(rng, 25),
+        },
+        "contacts": None,
+        "schedule": _pair(SCHEDULES, rng),
+        "working_days": [],
+        "working_time_intervals": [],
+        "working_time_modes": [],
+        "accept_temporary": False,
+        "professional_roles": [{"id": "96", "name": "Программист, разработчик"}],
+        "accept_incomplete_resumes": False,
+        "experience": _pair(EXPERIENCES, rng),
+        "employment": _pair(EMPLOYMENTS, rng),
+        "adv_response_url": None,
+        "is_adv_vacancy": False,
+        "adv_context": None,
+    }
+    if full:
+        vacancy["description"] = "".join(
+            f"<p><strong>{_text(rng, 3)}</strong></p><ul>"
+            + "".join(f"<li>{_text(rng, 12)}</li>" for _ in range(6))
+            + "</ul>"
+            for _ in range(4)
+        )
+        vacancy["key_skills"] = [{"name": name} for name in rng.sample(SKILLS, rng.randint(3, 8))]
+    return vacancy
+
+
+def make_search_page(
+    page: int = 0,
+    per_page: int = 100,
+    found: int = 2000,
+    full: bool = False,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Страница поиска вакансий в формате hh.ru"""
+    rng = random.Random(seed * 100003 + page)
+    reachable = min(found, 2000)
+    pages = max(1, -(-reachable // per_page))
+    start = page * per_page
+    count = max(0, min(per_page, reachable - start))
+    items: List[Dict[str, Any]] = [
+        make_vacancy(100000000 + seed * 10000000 + start + index, rng, full) for index in range(count)
+    ]
+    return {
+        "items": items,
+        "found": found,
+        "pages": pages,
+        "page": page,
+        "per_page": per_page,
+        "clusters": None,
+        "arguments": None,
+        "fixes": None,
+        "suggests": None,
+        "alternate_url": f"https://hh.ru/search/vacancy?page={page}",
+    }
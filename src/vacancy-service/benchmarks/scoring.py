@@ -0,0 +1,73 @@
+"""
+Оценка вакансий по фильтрам пользователей: построчный цикл против NumPy
+
+Запуск из каталога vacancy-service:
+    python -m benchmarks.scoring [--vacancies 10000] [--users 1000] [--top-k 50]
+"""
+import argparse
+import random
+import time
+from typing import List
+from app.application.services.vacancy_scoring import (
+    NaiveVacancyScorer,
+    VacancyFeatures,
+    VectorizedVacancyScorer,
+)
+from app.domain.models import VacancyFilter
+from benchmarks.payloads import AREAS, EMPLOYMENTS, EXPERIENCES, SCHEDULES, SKILLS, WORDS, make_vacancy
+
+
+def make_filters(count: int, seed: int = 0) -> List[VacancyFilter]:
+    """Случайные, но правдоподобные фильтры пользователей"""
+    rng = random.Random(seed)
+    keywords = [skill.lower() for skill in SKILLS] + WORDS
+    return [
+        VacancyFilter(
+            user_id=user_id,
+            salary_min=rng.choice([None, None, 100000, 150000, 200000]),
+            allow_no_salary=rng.random() < 0.7,
+            areas=[area for area, _ in rng.sample(AREAS, rng.randint(0, 2))],
+            schedules=[schedule for schedule, _ in rng.sample(SCHEDULES, rng.randint(0, 2))],
+            experiences=[experience for experience, _ in rng.sample(EXPERIENCES, rng.randint(0, 2))],
+            employments=[employment for employment, _ in rng.sample(EMPLOYMENTS, rng.randint(0, 1))],
+            required_keywords=rng.sample(keywords, rng.randint(0, 1)),
+            excluded_keywords=rng.sample(keywords, rng.randint(0, 2)),
+            keywords=rng.sample(keywords, rng.randint(0, 5)),
+        )
+        for user_id in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vacancies", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--skip-naive", action="store_true", help="не запускать построчный цикл")
+    args = parser.parse_args()
+
+    vacancies = [make_vacancy(100000000 + index, full=True) for index in range(args.vacancies)]
+    filters = make_filters(args.users)
+
+    started = time.perf_counter()
+    features = [VacancyFeatures.from_vacancy(vacancy) for vacancy in vacancies]
+    extract = time.perf_counter() - started
+    print(f"{args.vacancies} vacancies x {args.users} users, top {args.top_k}")
+    print(f"feature extraction (shared):  {extract:8.3f} s")
+
+    started = time.perf_counter()
+    vectorized = VectorizedVacancyScorer().score_features(features, filters, args.top_k)
+    vectorized_time = time.perf_counter() - started
+    print(f"vectorized (NumPy):           {vectorized_time:8.3f} s")
+    if args.skip_naive:
+        return
+
+    started = time.perf_counter()
+    naive = NaiveVacancyScorer().score_features(features, filters, args.top_k)
+    naive_time = time.perf_counter() - started
+    print(f"naive loop:                   {naive_time:8.3f} s")
+    print(f"speedup: {naive_time / vectorized_time:.1f}x, results identical: {naive == vectorized}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Тестовые заглушки: часы и HTTP клиент
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Union
+from app.infrastructure.http.batch import iter_batch
+from app.infrastructure.http.interfaces import (
+    BatchResult,
+    ConditionalResponse,
+    IConditionalHttpClient,
+)
+
+
+class Clock:
+    """Ручные часы; sleep сдвигает их без ожидания"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeHttpClient(IConditionalHttpClient):
+    """HTTP клиент в памяти
+
+    Отвечает на GET словарем с URL и номером запроса, записывает запросы в
+    `calls`. `etag` - валидатор ответов: условный запрос с ним получает 304.
+    `errors` - исключения, которые по очереди получат следующие запросы.
+    `gate` - событие, которого запросы ждут перед ответом; `cancelled`
+    считает запросы, отмененные во время ожидания.
+    """
+
+    def __init__(self, etag: Optional[str] = None):
+        self.etag = etag
+        self.calls: List[Dict[str, Any]] = []
+        self.errors: List[Exception] = []
+        self.gate: Optional[asyncio.Event] = None
+        self.cancelled = 0
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False
+    ) -> Union[Dict[str, Any], bytes]:
+        response = await self.get_conditional(url, params, headers, timeout, raw=raw)
+        return response.data
+
+    def get_many(
+        self,
+        urls: Iterable[str],
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        concurrency: int = 10,
+        raw: bool = False
+    ) -> AsyncIterator[BatchResult]:
+        return iter_batch(
+            lambda url: self.get(url, params, headers, timeout, raw), urls, concurrency
+        )
+
+    async def get_conditional(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        raw: bool = False
+    ) -> ConditionalResponse:
+        self.calls.append({"url": url, "params": params, "timeout": timeout, "etag": etag})
+        if self.gate is not None:
+            try:
+                await self.gate.wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        if self.errors:
+            raise self.errors.pop(0)
+        if etag is not None and etag == self.etag:
+            return ConditionalResponse(not_modified=True, etag=self.etag)
+        data = {"url": url, "call": len(self.calls)}
+        return ConditionalResponse(
+            not_modified=False,
+            data=str(data).encode() if raw else data,
+            etag=self.etag
+        )
+
+    async def post(self, url, json=None, data=None, headers=None, timeout=None, raw=False):
+        raise NotImplementedError
+
+    async def put(self, url, json=None, data=None, headers=None, timeout=None, raw=False):
+        raise NotImplementedError
+
+    async def delete(self, url, headers=None, timeout=None, raw=False):
+        raise NotImplementedError
@@ -0,0 +1,159 @@
+"""
+Тесты планировщика откликов и очереди откликов в SQLite
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from app.application.services.apply_scheduler import MSK, ApplyScheduler, QuotaExceededError
+from app.domain.interfaces import VacancyMark
+from app.domain.models import ApplyJob
+from app.infrastructure.storage.apply_jobs import SqliteApplyJobStore
+from app.infrastructure.storage.seen_index import SqliteSeenVacancyIndex
+
+
+def make_job(user_id: int, vacancy_id: str, score: float = 0.0) -> ApplyJob:
+    return ApplyJob(user_id=user_id, vacancy_id=vacancy_id, resume_id="r1", score=score)
+
+
+class ApplySchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "jobs.sqlite3")
+        self.store = SqliteApplyJobStore(self.path)
+        self.sent = []
+        self.now = datetime(2025, 9, 1, 12, tzinfo=MSK)
+
+    async def asyncTearDown(self):
+        await self.store.close()
+
+    async def apply(self, job: ApplyJob) -> None:
+        self.sent.append((job.user_id, job.vacancy_id))
+
+    def scheduler(self, apply=None, **options) -> ApplyScheduler:
+        options.setdefault("workers", 1)
+        return ApplyScheduler(apply or self.apply, self.store, clock=lambda: self.now, **options)
+
+    async def run_until_idle(self, scheduler: ApplyScheduler) -> None:
+        await scheduler.start()
+        try:
+            await scheduler.join()
+        finally:
+            await scheduler.stop()
+
+    async def test_jobs_of_user_go_by_score(self):
+        await self.store.add([make_job(1, "10", 0.1), make_job(1, "20", 0.9), make_job(1, "30", 0.5)])
+
+        await self.run_until_idle(self.scheduler())
+
+        self.assertEqual(self.sent, [(1, "20"), (1, "30"), (1, "10")])
+
+    async def test_users_are_served_in_turn_by_weight(self):
+        await self.store.add(
+            [make_job(1, str(vacancy_id)) for vacancy_id in range(100, 106)]
+            + [make_job(2, str(vacancy_id)) for vacancy_id in range(200, 206)]
+            + [make_job(3, "300")]
+        )
+        scheduler = self.scheduler()
+        scheduler.set_user(1, weight=2.0)
+
+        await self.run_until_idle(scheduler)
+
+        # Пользователь с весом 2 получает две отправки на одну у остальных,
+        # а единственный отклик третьего не ждет очередей первых двух
+        first = [user_id for user_id, _ in self.sent[:6]]
+        self.assertEqual(first.count(1), 3)
+        self.assertIn(3, first)
+        first = [user_id for user_id, _ in self.sent[:9]]
+        self.assertEqual((first.count(1), first.count(2)), (5, 3))
+        self.assertEqual(len(self.sent), 13)
+
+    async def test_daily_limit_holds_jobs_until_next_day(self):
+        await self.store.add([make_job(1, str(vacancy_id)) for vacancy_id in range(5)] + [make_job(2, "9")])
+        def limited(user_limit: int) -> ApplyScheduler:
+            scheduler = self.scheduler(daily_limit=2)
+            scheduler.set_user(2, daily_limit=user_limit)
+            return scheduler
+
+        scheduler = limited(0)
+        await self.run_until_idle(scheduler)
+
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(scheduler.backlog(), {1: 3, 2: 1})
+
+        # После перезапуска в те же сутки использованный лимит берется из хранилища
+        await self.run_until_idle(limited(0))
+        self.assertEqual(len(self.sent), 2)
+
+        # Сутки по Москве начинаются в 21:00 UTC
+        self.now += timedelta(hours=12)
+        await self.run_until_idle(limited(1))
+        self.assertEqual([user_id for user_id, _ in self.sent], [1, 1, 1, 2, 1])
+
+    async def test_quota_rejected_by_hh_waits_for_next_day(self):
+        async def apply(job: ApplyJob) -> None:
+            if job.user_id == 1:
+                raise QuotaExceededError(job.user_id)
+            await self.apply(job)
+
+        await self.store.add([make_job(1, "1"), make_job(1, "2"), make_job(2, "3")])
+        scheduler = self.scheduler(apply)
+
+        await self.run_until_idle(scheduler)
+
+        self.assertEqual(self.sent, [(2, "3")])
+        self.assertEqual(scheduler.stats.quota_rejected, 1)
+        self.assertEqual(len(await self.store.pending()), 2)
+
+    async def test_restart_sends_only_unfinished_jobs(self):
+        started = asyncio.Event()
+
+        async def hang(job: ApplyJob) -> None:
+            if job.vacancy_id == "2":
+                started.set()
+                await asyncio.Event().wait()
+            await self.apply(job)
+
+        scheduler = self.scheduler(hang)
+        await scheduler.start()
+        await scheduler.submit([make_job(1, "1", 0.9), make_job(1, "2", 0.5), make_job(1, "3", 0.1)])
+        await started.wait()
+        await scheduler.stop()
+        await self.store.close()
+
+        self.store = SqliteApplyJobStore(self.path)
+        await self.run_until_idle(self.scheduler())
+
+        self.assertEqual(self.sent, [(1, "1"), (1, "2"), (1, "3")])
+        self.assertEqual(await self.store.pending(), [])
+
+    async def test_completed_job_is_not_submitted_again(self):
+        scheduler = ApplyScheduler(self.apply, self.store, workers=1)
+        await scheduler.start()
+        try:
+            self.assertEqual(len(await scheduler.submit([make_job(1, "100")])), 1)
+            await scheduler.join()
+
+            self.assertEqual(await scheduler.submit([make_job(1, "100")]), [])
+        finally:
+            await scheduler.stop()
+
+        self.assertEqual(self.sent, [(1, "100")])
+        self.assertEqual(scheduler.stats.duplicates, 1)
+        self.assertEqual(await self.store.pending(), [])
+
+    async def test_sent_job_is_marked_applied_in_seen_index(self):
+        seen = SqliteSeenVacancyIndex(os.path.join(os.path.dirname(self.path), "seen.sqlite3"))
+        self.addAsyncCleanup(seen.close)
+        await self.store.add([make_job(1, "100"), make_job(1, "draft-7")])
+
+        scheduler = self.scheduler(seen_index=seen)
+        await self.run_until_idle(scheduler)
+
+        self.assertEqual(scheduler.stats.store_errors, 0)
+        self.assertEqual(
+            await seen.filter_unseen(1, ["100", "draft-7", "200"], VacancyMark.APPLIED), ["200"]
+        )
@@ -0,0 +1,98 @@
+"""
+Тесты кеширующего HTTP клиента
+"""
+
+import unittest
+from app.infrastructure.http.cache import CachingHttpClient
+from tests.fakes import Clock, FakeHttpClient
+
+
+class CachingHttpClientTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.inner = FakeHttpClient()
+
+    def cache(self, **options) -> CachingHttpClient:
+        options.setdefault("route_ttls", {"/vacancies": 60.0})
+        return CachingHttpClient(self.inner, clock=self.clock, **options)
+
+    async def test_entry_is_served_until_ttl_expires(self):
+        cache = self.cache()
+
+        first = await cache.get("/vacancies/1")
+        self.clock.now += 59
+        cached = await cache.get("/vacancies/1")
+        self.clock.now += 1
+        expired = await cache.get("/vacancies/1")
+
+        self.assertEqual(first, cached)
+        self.assertEqual(expired["call"], 2)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 2))
+
+    async def test_routes_without_ttl_are_not_cached(self):
+        cache = self.cache()
+
+        await cache.get("/employers/1")
+        await cache.get("/employers/1")
+
+        self.assertEqual(len(self.inner.calls), 2)
+
+    async def test_stale_entry_is_revalidated_by_etag(self):
+        self.inner.etag = '"v1"'
+        cache = self.cache()
+
+        first = await cache.get("/vacancies/1")
+        self.clock.now += 60
+        revalidated = await cache.get("/vacancies/1")
+        fresh = await cache.get("/vacancies/1")
+
+        self.assertEqual(revalidated, first)
+        self.assertEqual(fresh, first)
+        self.assertEqual([call["etag"] for call in self.inner.calls], [None, '"v1"'])
+        self.assertEqual(cache.stats.revalidations_not_modified, 1)
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        cache = self.cache(max_entries=2)
+
+        await cache.get("/vacancies/a")
+        await cache.get("/vacancies/b")
+        await cache.get("/vacancies/a")
+        await cache.get("/vacancies/c")
+        await cache.get("/vacancies/a")
+        await cache.get("/vacancies/b")
+
+        self.assertEqual(
+            [call["url"] for call in self.inner.calls],
+            ["/vacancies/a", "/vacancies/b", "/vacancies/c", "/vacancies/b"],
+        )
+        self.assertEqual(cache.stats.evictions, 2)
+
+    async def test_cached_data_is_copied(self):
+        cache = self.cache()
+
+        (await cache.get("/vacancies/1"))["call"] = "changed"
+
+        self.assertEqual((await cache.get("/vacancies/1"))["call"], 1)
+
+    async def test_invalidate_removes_entries_of_path_with_vary_headers(self):
+        cache = self.cache(vary_headers=("Authorization",))
+        headers = {"Authorization": "Bearer token"}
+        await cache.get("/vacancies/1", params={"a": 1}, headers=headers)
+        await cache.get("/vacancies/1", raw=True)
+        await cache.get("/vacancies/2")
+
+        cache.invalidate("/vacancies/1")
+        await cache.get("/vacancies/1", params={"a": 1}, headers=headers)
+        await cache.get("/vacancies/1", raw=True)
+        await cache.get("/vacancies/2")
+
+        self.assertEqual(len(self.inner.calls), 5)
+
+    async def test_invalidate_without_url_clears_cache(self):
+        cache = self.cache()
+        await cache.get("/vacancies/1")
+
+        cache.invalidate()
+        await cache.get("/vacancies/1")
+
+        self.assertEqual(len(self.inner.calls), 2)
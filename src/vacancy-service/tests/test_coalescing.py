@@ -0,0 +1,85 @@
+"""
+Тесты объединения одинаковых одновременных запросов
+"""
+
+import asyncio
+import unittest
+import httpx
+from app.infrastructure.http.coalescing import CoalescingHttpClient
+from tests.fakes import FakeHttpClient
+
+
+class CoalescingHttpClientTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.inner = FakeHttpClient()
+        self.inner.gate = asyncio.Event()
+        self.client = CoalescingHttpClient(self.inner)
+
+    def start(self, url: str = "/vacancies", **params) -> "asyncio.Task":
+        return asyncio.ensure_future(self.client.get(url, params=params or None))
+
+    async def test_concurrent_requests_share_one_call(self):
+        tasks = [self.start(text="python"), self.start(text="python")]
+        await asyncio.sleep(0)
+
+        self.inner.gate.set()
+        first, second = await asyncio.gather(*tasks)
+
+        self.assertEqual(len(self.inner.calls), 1)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual((self.client.stats.leaders, self.client.stats.coalesced), (1, 1))
+
+    async def test_cancelling_one_waiter_keeps_request(self):
+        cancelled, waiting = self.start(), self.start()
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        self.inner.gate.set()
+
+        self.assertEqual((await waiting)["call"], 1)
+        self.assertTrue(cancelled.cancelled())
+        self.assertEqual(self.inner.cancelled, 0)
+
+    async def test_cancelling_last_waiter_cancels_request(self):
+        tasks = [self.start(), self.start()]
+        await asyncio.sleep(0)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.inner.cancelled, 1)
+        self.assertEqual(self.client.stats.abandoned, 1)
+
+        # Новый вызов не присоединяется к отмененному запросу
+        retry = self.start()
+        await asyncio.sleep(0)
+        self.inner.gate.set()
+        self.assertEqual((await retry)["call"], 2)
+
+    async def test_error_is_delivered_to_all_waiters(self):
+        self.inner.errors.append(httpx.ConnectError("down"))
+        tasks = [self.start(), self.start()]
+        await asyncio.sleep(0)
+
+        self.inner.gate.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertEqual(len(self.inner.calls), 1)
+        self.assertTrue(all(isinstance(result, httpx.ConnectError) for result in results))
+
+    async def test_conditional_requests_with_other_validators_are_separate(self):
+        tasks = [
+            asyncio.ensure_future(self.client.get_conditional("/vacancies", etag='"a"')),
+            asyncio.ensure_future(self.client.get_conditional("/vacancies", etag='"b"')),
+            asyncio.ensure_future(self.client.get_conditional("/vacancies", etag='"b"')),
+        ]
+        await asyncio.sleep(0)
+
+        self.inner.gate.set()
+        await asyncio.gather(*tasks)
+
+        self.assertEqual([call["etag"] for call in self.inner.calls], ['"a"', '"b"'])
@@ -0,0 +1,37 @@
+"""
+Тесты компактного декодирования ответов hh.ru на msgspec
+"""
+
+import json
+import unittest
+from app.application.services.vacancy_scoring import VacancyFeatures
+from benchmarks.payloads import make_vacancy
+
+try:
+    from app.infrastructure.http.compact import decode_search_page, decode_vacancy
+except ImportError:
+    decode_search_page = decode_vacancy = None
+
+
+@unittest.skipIf(decode_search_page is None, "msgspec is not installed")
+class CompactDecodeTest(unittest.TestCase):
+    def test_fractional_salary_does_not_reject_page(self):
+        items = [
+            {"id": "1", "salary": {"from": 100000.5, "to": None, "currency": "RUR"}},
+            {"id": "2", "salary": {"from": 120000, "to": 150000, "currency": "RUR"}},
+        ]
+
+        page = decode_search_page(json.dumps({"items": items, "found": 2}).encode())
+
+        self.assertEqual([vacancy.id for vacancy in page.items], ["1", "2"])
+        self.assertEqual(page.items[0].salary.lower, 100000.5)
+        self.assertEqual((page.items[1].salary.lower, page.items[1].salary.upper), (120000, 150000))
+
+    def test_features_match_full_vacancy(self):
+        for vacancy_id in range(100, 120):
+            vacancy = make_vacancy(vacancy_id, full=True)
+            with self.subTest(vacancy_id=vacancy_id):
+                compact = decode_vacancy(json.dumps(vacancy).encode())
+                self.assertEqual(
+                    VacancyFeatures.from_compact(compact), VacancyFeatures.from_vacancy(vacancy)
+                )
@@ -0,0 +1,119 @@
+"""
+Тесты потокового разбора элементов JSON ответа
+"""
+
+import json
+import unittest
+from typing import Any, List
+from app.infrastructure.http.json_stream import JsonItemsParser, iter_json_items
+
+PAGE = {
+    "found": 12345,
+    "items": [
+        {"id": "1", "name": "Разработчик Python", "salary": {"from": 150000.5, "to": None}},
+        {"id": "2", "name": 'Кавычки \\" и скобки ]}[{ в строке', "tags": ["a", "b"]},
+        {"id": "3", "name": "emoji \U0001F680", "nested": {"list": [[1, 2], {"x": True}]}},
+        12,
+        "строка",
+    ],
+    "pages": 7,
+    "arguments": None,
+}
+PAYLOAD = json.dumps(PAGE, ensure_ascii=False, indent=1).encode()
+
+
+def parse(chunks: List[bytes]) -> JsonItemsParser:
+    parser = JsonItemsParser()
+    parser.items: List[Any] = []
+    for chunk in chunks:
+        parser.items.extend(parser.feed(chunk))
+    parser.items.extend(parser.close())
+    return parser
+
+
+class JsonItemsParserTest(unittest.TestCase):
+    def assertParsed(self, parser: JsonItemsParser) -> None:
+        self.assertEqual(parser.items, PAGE["items"])
+        self.assertEqual(parser.meta, {"found": 12345, "pages": 7, "arguments": None})
+
+    def test_every_split_point(self):
+        # Граница чанка внутри строк, чисел, многобайтных символов и escape
+        for split in range(len(PAYLOAD) + 1):
+            with self.subTest(split=split):
+                self.assertParsed(parse([PAYLOAD[:split], PAYLOAD[split:]]))
+
+    def test_byte_by_byte(self):
+        self.assertParsed(parse([PAYLOAD[i:i + 1] for i in range(len(PAYLOAD))]))
+
+    def test_items_are_returned_as_soon_as_complete(self):
+        parser = JsonItemsParser()
+        second_item = PAYLOAD.index(b'"id": "2"')
+
+        items = parser.feed(PAYLOAD[:second_item])
+
+        self.assertEqual(items, PAGE["items"][:1])
+
+    def test_number_at_chunk_end_waits_for_more_data(self):
+        parser = JsonItemsParser()
+
+        self.assertEqual(parser.feed(b'{"items": [12'), [])
+        self.assertEqual(parser.feed(b'3, 4'), [123])
+        self.assertEqual(parser.feed(b"]}"), [4])
+        self.assertEqual(parser.close(), [])
+
+    def test_large_item_is_decoded_once(self):
+        payload = json.dumps({"items": [{"text": 'a\\"{[' * 2000, "list": list(range(2000))}]}).encode()
+        parser = JsonItemsParser()
+        calls = []
+        raw_decode = parser._decoder.raw_decode
+
+        def counting(text, pos):
+            calls.append(text[pos])
+            return raw_decode(text, pos)
+
+        parser._decoder.raw_decode = counting
+
+        items = []
+        for start in range(0, len(payload), 10):
+            items.extend(parser.feed(payload[start:start + 10]))
+        items.extend(parser.close())
+
+        self.assertEqual(items, json.loads(payload)["items"])
+        self.assertEqual(calls.count("{"), 1)
+
+    def test_truncated_stream_fails_on_close(self):
+        parser = JsonItemsParser()
+        parser.feed(PAYLOAD[:-10])
+
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_extra_data_fails_on_close(self):
+        parser = JsonItemsParser()
+        parser.feed(b'{"items": []} {}')
+
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_stream_must_be_object(self):
+        with self.assertRaises(ValueError):
+            JsonItemsParser().feed(b"[1, 2]")
+
+    def test_item_larger_than_buffer_limit_fails(self):
+        parser = JsonItemsParser(max_buffer=16)
+
+        with self.assertRaises(ValueError):
+            parser.feed(b'{"items": ["' + b"x" * 32)
+
+
+class IterJsonItemsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_items_and_meta(self):
+        async def chunks():
+            for start in range(0, len(PAYLOAD), 7):
+                yield PAYLOAD[start:start + 7]
+
+        meta = {}
+        items = [item async for item in iter_json_items(chunks(), meta=meta)]
+
+        self.assertEqual(items, PAGE["items"])
+        self.assertEqual(meta["found"], 12345)
@@ -0,0 +1,114 @@
+"""
+Тесты объединения поисков пользователей в запросы к hh.ru
+"""
+
+import unittest
+from typing import Any, Dict, List
+from app.application.services.query_planner import QueryPlanner, SearchFanIn
+from app.domain.interfaces import IVacancyScorer
+from app.domain.models import PollResult, SavedSearch
+
+
+def vacancy(vacancy_id: int, score: float = 1.0) -> Dict[str, Any]:
+    return {"id": str(vacancy_id), "score": score}
+
+
+class FakePoller:
+    """Опрос, возвращающий заданные вакансии: новые по отметке и все"""
+
+    def __init__(self):
+        self.new: Dict[str, List[Dict[str, Any]]] = {}
+        self.all: Dict[str, List[Dict[str, Any]]] = {}
+        self.failing = set()
+        self.polled: List[str] = []
+        self.fetched_all: List[str] = []
+        self.polls = 0
+
+    async def poll(self, params, headers=None, force_full=False) -> PollResult:
+        text = params["text"]
+        self.polled.append(text)
+        if text in self.failing:
+            raise RuntimeError(f"{text} is down")
+        # Первый опрос запроса - полная сверка
+        full = self.polled.count(text) == 1
+        items = self.all[text] if full else self.new.get(text, [])
+        return PollResult(search_key=text, items=items, full_resync=full)
+
+    async def fetch_all(self, params, headers=None) -> PollResult:
+        text = params["text"]
+        self.fetched_all.append(text)
+        return PollResult(search_key=text, items=self.all[text], full_resync=True)
+
+
+class FakeScorer(IVacancyScorer):
+    """Все вакансии подходят всем фильтрам, оценка - поле score вакансии"""
+
+    def score(self, vacancies, filters, top_k=50):
+        ranked = sorted(vacancies, key=lambda item: -item["score"])[:top_k]
+        return {
+            search_filter.user_id: [(item["id"], item["score"]) for item in ranked]
+            for search_filter in filters
+        }
+
+
+def search(user_id: int, text: str, **params) -> SavedSearch:
+    return SavedSearch(user_id=user_id, params={"text": text, **params})
+
+
+class QueryPlannerTest(unittest.TestCase):
+    def test_searches_differing_in_local_params_share_a_query(self):
+        plan = QueryPlanner().plan([
+            search(1, "python  developer", salary=100000),
+            search(2, "python developer", schedule=["remote"]),
+            search(3, "go developer"),
+        ])
+
+        self.assertEqual([len(query.searches) for query in plan], [2, 1])
+        self.assertEqual(plan[0].filters[0].salary_min, 100000)
+        self.assertEqual(plan[0].filters[1].schedules, ["remote"])
+
+
+class SearchFanInTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.poller = FakePoller()
+        self.fan_in = SearchFanIn(self.poller, scorer=FakeScorer())
+
+    async def test_new_subscriber_gets_vacancies_before_watermark(self):
+        self.poller.all["python"] = [vacancy(1), vacancy(2)]
+        await self.fan_in.run_cycle([search(1, "python")])
+
+        self.poller.new["python"] = [vacancy(3)]
+        self.poller.all["python"] = [vacancy(3), vacancy(1), vacancy(2)]
+        results = await self.fan_in.run_cycle([search(1, "python"), search(2, "python")])
+
+        self.assertEqual([item["id"] for item in results[1]], ["3"])
+        self.assertEqual(sorted(item["id"] for item in results[2]), ["1", "2", "3"])
+        self.assertEqual(self.poller.fetched_all, ["python"])
+
+        self.poller.new["python"] = []
+        await self.fan_in.run_cycle([search(1, "python"), search(2, "python")])
+        self.assertEqual(self.poller.fetched_all, ["python"])
+
+    async def test_failed_query_is_logged_and_keeps_new_subscribers_new(self):
+        self.poller.all["python"] = [vacancy(1)]
+        await self.fan_in.run_cycle([search(1, "python")])
+        self.poller.failing.add("python")
+
+        with self.assertLogs("app.application.services.query_planner", "ERROR") as logs:
+            results = await self.fan_in.run_cycle([search(1, "python"), search(2, "python")])
+
+        self.assertEqual(results, {1: [], 2: []})
+        self.assertIn("python is down", "\n".join(logs.output))
+        self.assertEqual(self.fan_in.stats.failed_queries, 1)
+
+        self.poller.failing.clear()
+        results = await self.fan_in.run_cycle([search(1, "python"), search(2, "python")])
+        self.assertEqual([item["id"] for item in results[2]], ["1"])
+
+    async def test_results_are_ranked_across_queries(self):
+        self.poller.all["python"] = [vacancy(1, 0.2), vacancy(2, 0.9)]
+        self.poller.all["django"] = [vacancy(3, 0.5), vacancy(2, 0.4)]
+
+        results = await self.fan_in.run_cycle([search(1, "python"), search(1, "django")])
+
+        self.assertEqual([item["id"] for item in results[1]], ["2", "3", "1"])
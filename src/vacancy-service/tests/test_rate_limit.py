@@ -0,0 +1,80 @@
+"""
+Тесты ограничителя частоты запросов
+"""
+
+import unittest
+from datetime import datetime, timezone
+from app.infrastructure.http.rate_limit import RateLimiter, TokenBucket, parse_retry_after
+from tests.fakes import Clock
+
+
+class TokenBucketTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.bucket = TokenBucket(
+            rate=8.0, capacity=8.0, min_rate=0.2, clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def test_burst_of_429_decreases_rate_once(self):
+        sent_at = self.clock()
+        self.clock.now += 0.5
+        for _ in range(10):
+            self.bucket.throttle(sent_at=sent_at)
+
+        self.assertEqual(self.bucket.rate, 4.0)
+
+    def test_429_after_decrease_decreases_again(self):
+        self.bucket.throttle(sent_at=self.clock())
+        self.clock.now += 1.0
+        self.bucket.throttle(sent_at=self.clock())
+
+        self.assertEqual(self.bucket.rate, 2.0)
+
+    async def test_retry_after_blocks_acquire(self):
+        self.bucket.throttle(retry_after=3.0)
+
+        waited = await self.bucket.acquire()
+
+        self.assertGreaterEqual(waited, 3.0)
+
+    def test_recover_is_additive_up_to_max_rate(self):
+        self.bucket.throttle()
+        for _ in range(200):
+            self.bucket.recover()
+
+        self.assertEqual(self.bucket.rate, 8.0)
+
+
+class RateLimiterTest(unittest.IsolatedAsyncioTestCase):
+    def test_concurrent_429_decrease_host_and_token_once(self):
+        clock = Clock()
+        limiter = RateLimiter(host_rate=8.0, token_rate=2.0, clock=clock, sleep=clock.sleep)
+        sent_at = limiter.now()
+        clock.now += 0.2
+        for _ in range(5):
+            limiter.on_throttled("api.hh.ru", "Bearer secret", sent_at=sent_at)
+
+        host, token = limiter.buckets_for("api.hh.ru", "Bearer secret")
+        self.assertEqual((host.rate, token.rate), (4.0, 1.0))
+        self.assertEqual(limiter.stats.throttled_responses, 5)
+
+    def test_token_buckets_are_hashed_and_evicted(self):
+        limiter = RateLimiter(max_token_buckets=2)
+        for token in ("Bearer a", "Bearer b", "Bearer c"):
+            limiter.buckets_for("api.hh.ru", token)
+
+        self.assertEqual(len(limiter._token_buckets), 2)
+        self.assertFalse(any("Bearer" in key for key in limiter._token_buckets))
+        self.assertIs(
+            limiter.buckets_for("api.hh.ru", "Bearer c")[1],
+            limiter.buckets_for("api.hh.ru", "Bearer c")[1],
+        )
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_seconds_and_http_date(self):
+        now = datetime(2025, 9, 1, 10, 0, 0, tzinfo=timezone.utc)
+
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertEqual(parse_retry_after("Mon, 01 Sep 2025 10:00:30 GMT", now), 30.0)
+        self.assertIsNone(parse_retry_after("soon"))
@@ -0,0 +1,124 @@
+"""
+Тесты повторов и circuit breaker
+"""
+
+import asyncio
+import unittest
+import httpx
+from app.infrastructure.http.resilience import (
+    CircuitBreakerHttpClient,
+    CircuitOpenError,
+    CircuitState,
+    RetryingHttpClient,
+    RetryPolicy,
+)
+from tests.fakes import Clock, FakeHttpClient
+
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.hh.ru/vacancies")
+    return httpx.HTTPStatusError(
+        str(status), request=request, response=httpx.Response(status, request=request)
+    )
+
+
+class CircuitBreakerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.inner = FakeHttpClient()
+        self.breaker = CircuitBreakerHttpClient(
+            self.inner, failure_threshold=2, reset_timeout=10.0, probe_timeout=1.0, clock=self.clock
+        )
+
+    async def open(self) -> None:
+        self.inner.errors += [httpx.ConnectError("down"), status_error(503)]
+        for _ in range(2):
+            with self.assertRaises(httpx.HTTPError):
+                await self.breaker.get("/vacancies")
+
+    async def test_opens_after_threshold_and_rejects_without_request(self):
+        await self.open()
+
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.get("/vacancies")
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        self.assertEqual(len(self.inner.calls), 2)
+        self.assertEqual(self.breaker.stats.rejected, 1)
+
+    async def test_client_errors_do_not_open(self):
+        self.inner.errors += [status_error(404), status_error(404)]
+
+        for _ in range(2):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await self.breaker.get("/vacancies")
+
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    async def test_successful_probe_closes(self):
+        await self.open()
+        self.clock.now += 10
+
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        await self.breaker.get("/vacancies", timeout=30.0)
+
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+        self.assertEqual(self.inner.calls[-1]["timeout"], 1.0)
+
+    async def test_failed_probe_opens_again(self):
+        await self.open()
+        self.clock.now += 10
+        self.inner.errors.append(httpx.ReadTimeout("slow"))
+
+        with self.assertRaises(httpx.ReadTimeout):
+            await self.breaker.get("/vacancies")
+
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        self.assertEqual(self.breaker.stats.opened, 2)
+
+    async def test_half_open_lets_one_probe_through(self):
+        await self.open()
+        self.clock.now += 10
+        self.inner.gate = asyncio.Event()
+
+        probe = asyncio.ensure_future(self.breaker.get("/vacancies"))
+        await asyncio.sleep(0)
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.get("/vacancies")
+        self.inner.gate.set()
+        await probe
+
+        self.assertEqual(self.breaker.stats.probes, 1)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+
+class RetryingHttpClientTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.inner = FakeHttpClient()
+        self.client = RetryingHttpClient(
+            self.inner, RetryPolicy(max_attempts=3), sleep=Clock().sleep
+        )
+
+    async def test_transient_errors_are_retried(self):
+        self.inner.errors += [httpx.ConnectError("down"), status_error(502)]
+
+        data = await self.client.get("/vacancies")
+
+        self.assertEqual(data["call"], 3)
+        self.assertEqual(self.client.stats.retries, 2)
+
+    async def test_gives_up_after_max_attempts(self):
+        self.inner.errors += [status_error(503)] * 3
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.client.get("/vacancies")
+
+        self.assertEqual(len(self.inner.calls), 3)
+        self.assertEqual(self.client.stats.gave_up, 1)
+
+    async def test_client_errors_are_not_retried(self):
+        self.inner.errors.append(status_error(400))
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.client.get("/vacancies")
+
+        self.assertEqual(len(self.inner.calls), 1)
@@ -0,0 +1,70 @@
+"""
+Тесты индекса просмотренных вакансий
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from app.domain.interfaces import VacancyMark
+from app.infrastructure.storage.bloom import BloomFilter
+from app.infrastructure.storage.seen_index import SqliteSeenVacancyIndex
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_numeric_string_and_number_are_one_element(self):
+        bloom = BloomFilter(100)
+        bloom.add("123456")
+        bloom.add("abc-1")
+
+        self.assertIn(123456, bloom)
+        self.assertIn("abc-1", bloom)
+
+
+class SeenVacancyIndexTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "seen.sqlite3")
+        self.index = SqliteSeenVacancyIndex(self.path, expected_per_user=100)
+
+    async def asyncTearDown(self):
+        await self.index.close()
+
+    async def reopen(self) -> None:
+        await self.index.close()
+        self.index = SqliteSeenVacancyIndex(self.path, expected_per_user=100)
+
+    async def test_filter_unseen_keeps_order_and_string_ids(self):
+        await self.index.mark(1, ["200", "x-7"])
+
+        unseen = await self.index.filter_unseen(1, ["300", "200", "x-7", "100", "300"])
+
+        self.assertEqual(unseen, ["300", "100"])
+        self.assertEqual(await self.index.filter_unseen(2, ["200"]), ["200"])
+
+    async def test_marks_only_go_up(self):
+        await self.index.mark(1, ["1", "2"], VacancyMark.APPLIED)
+        await self.index.mark(1, ["1"], VacancyMark.SEEN)
+
+        self.assertTrue(await self.index.contains(1, "1", VacancyMark.APPLIED))
+        self.assertFalse(await self.index.contains(1, "3"))
+        self.assertEqual(
+            await self.index.filter_unseen(1, ["1", "2", "3"], VacancyMark.APPLIED), ["3"]
+        )
+
+    async def test_marks_persist_across_restart(self):
+        await self.index.mark(1, ["100", "abc"])
+
+        await self.reopen()
+
+        self.assertEqual(await self.index.filter_unseen(1, ["100", "abc", "101"]), ["101"])
+        self.assertEqual(await self.index.count(1), 2)
+
+    async def test_rows_with_integer_ids_match_string_ids(self):
+        await self.index.close()
+        with sqlite3.connect(self.path) as db:
+            db.execute("INSERT INTO seen_vacancies VALUES (1, 100, 2)")
+        self.index = SqliteSeenVacancyIndex(self.path, expected_per_user=100)
+
+        self.assertTrue(await self.index.contains(1, "100", VacancyMark.APPLIED))
@@ -0,0 +1,94 @@
+"""
+Тесты оценки вакансий: векторизованная реализация совпадает с построчной
+"""
+
+import random
+import unittest
+from app.application.services.vacancy_scoring import (
+    NaiveVacancyScorer,
+    VacancyFeatures,
+    VectorizedVacancyScorer,
+    np,
+)
+from app.domain.models import VacancyFilter
+from benchmarks.payloads import make_vacancy
+from benchmarks.scoring import make_filters
+
+
+def vacancy(vacancy_id: int, name: str, salary_to=None, currency="RUR", schedule="remote"):
+    return {
+        "id": str(vacancy_id),
+        "name": name,
+        "salary": None if salary_to is None else {"from": None, "to": salary_to, "currency": currency},
+        "schedule": {"id": schedule},
+    }
+
+
+class NaiveVacancyScorerTest(unittest.TestCase):
+    def test_filters_and_ranking(self):
+        vacancies = [
+            vacancy(1, "Python developer", 150000),
+            vacancy(2, "Python Django developer", 300000),
+            vacancy(3, "Java developer", 400000),
+            vacancy(4, "Python developer", 150000, currency="USD"),
+            vacancy(5, "Python developer", schedule="fullDay"),
+            vacancy(6, "Python developer"),
+        ]
+        item = VacancyFilter(
+            user_id=7,
+            salary_min=100000,
+            schedules=["remote"],
+            required_keywords=["python"],
+            excluded_keywords=["java"],
+            keywords=["django", "developer"],
+        )
+
+        ranked = NaiveVacancyScorer().score(vacancies, [item])
+
+        # 2: оба слова и запас по зарплате 100%, 1: одно слово и 50%,
+        # 6: одно слово, без зарплаты
+        self.assertEqual(ranked, {7: [("2", 2.5), ("1", 1.75), ("6", 1.5)]})
+
+
+@unittest.skipUnless(np is not None, "numpy is not installed")
+class VectorizedVacancyScorerTest(unittest.TestCase):
+    def assertSameRanking(self, vacancies, filters, top_k, chunk_size=256):
+        features = [VacancyFeatures.from_vacancy(item) for item in vacancies]
+
+        naive = NaiveVacancyScorer().score_features(features, filters, top_k)
+        vectorized = VectorizedVacancyScorer(chunk_size).score_features(features, filters, top_k)
+
+        self.assertEqual(vectorized, naive)
+
+    def test_random_pages_match_naive(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                vacancies = [make_vacancy(1000 + index, rng, full=True) for index in range(300)]
+                self.assertSameRanking(vacancies, make_filters(60, seed), top_k=20, chunk_size=16)
+
+    def test_ties_keep_page_order(self):
+        # Одинаковые вакансии под разными id: порядок как на странице
+        vacancies = [dict(make_vacancy(1), id=str(vacancy_id)) for vacancy_id in (30, 10, 20)]
+
+        self.assertSameRanking(vacancies, [VacancyFilter(user_id=1)], top_k=3)
+
+    def test_fractional_salaries_and_unknown_currency(self):
+        vacancies = [
+            vacancy(1, "Python", 100000.4),
+            vacancy(2, "Python", 100000.6),
+            vacancy(3, "Python", 1500.5, currency="EUR"),
+            vacancy(4, "Python"),
+        ]
+        filters = [
+            VacancyFilter(user_id=1, salary_min=100000, allow_no_salary=False),
+            VacancyFilter(user_id=2, salary_min=1000, currency="EUR", keywords=["python"]),
+            VacancyFilter(user_id=3, salary_min=1000, currency="KZT"),
+        ]
+
+        self.assertSameRanking(vacancies, filters, top_k=10)
+
+    def test_empty_page(self):
+        self.assertEqual(
+            VectorizedVacancyScorer().score([], [VacancyFilter(user_id=1)]), {1: []}
+        )